@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import atexit
 import configparser
 import getpass
 import os
@@ -6,7 +7,6 @@ import platform
 import re
 import subprocess
 import sys
-import threading
 import time
 import webbrowser
 
@@ -18,7 +18,8 @@ from PyQt6.QtGui import QAction
 from PyQt6.QtWidgets import QSystemTrayIcon, QMenu, QApplication, QMessageBox
 
 import backend
-from services import Config
+import providers
+from services import Config, LIBRARY, STATS
 
 if os.name == "nt":
     import ctypes
@@ -26,13 +27,39 @@ if os.name == "nt":
     ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID("spotifylyrics.version1")
 
 
-class Communicate(QtCore.QObject):
-    signal = QtCore.pyqtSignal(str, str)
-
-
 class LyricsTextBrowserWidget(QtWidgets.QTextBrowser):
     wheelSignal = QtCore.pyqtSignal()
 
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.highlighted_block = -1
+
+    def highlight_block(self, number: int, highlight_format: QtGui.QTextCharFormat,
+                        line_format: QtGui.QTextCharFormat) -> None:
+        """
+        Moves the highlighting to another block by only changing the format of the
+        previous and the new block and scrolls it into view, two lines below the top.
+        """
+        if self.highlighted_block >= 0:
+            self.set_block_format(self.highlighted_block, line_format)
+        block = self.set_block_format(number, highlight_format)
+        if not block.isValid():
+            self.highlighted_block = -1
+            return
+        self.highlighted_block = number
+
+        scroll_block = self.document().findBlockByNumber(max(number - 2, 0))
+        top = self.document().documentLayout().blockBoundingRect(scroll_block).top()
+        self.verticalScrollBar().setValue(int(top))
+
+    def set_block_format(self, number: int, char_format: QtGui.QTextCharFormat) -> QtGui.QTextBlock:
+        block = self.document().findBlockByNumber(number)
+        if block.isValid():
+            cursor = QtGui.QTextCursor(block)
+            cursor.movePosition(QtGui.QTextCursor.MoveOperation.EndOfBlock, QtGui.QTextCursor.MoveMode.KeepAnchor)
+            cursor.setCharFormat(char_format)
+        return block
+
     def wheelEvent(self, e):
         try:
             modifiers = e.modifiers()
@@ -52,15 +79,231 @@ class LyricsTextBrowserWidget(QtWidgets.QTextBrowser):
             pass
 
 
+class Task(QtCore.QRunnable):
+    """Runs a function on the thread pool and emits the signal with its result, None if it failed."""
+
+    def __init__(self, signal, function, *args):
+        super().__init__()
+        self.signal = signal
+        self.function = function
+        self.args = args
+
+    def run(self):
+        result = None
+        try:
+            result = self.function(*self.args)
+        except Exception as error:
+            sentry_sdk.capture_exception(error)
+        self.signal.emit(result)
+
+
+class LyricsScheduler(QtCore.QObject):
+    """
+    Follows the player and shows the lyrics of the playing song, all from the GUI thread. The
+    title of the player is checked every second and the lyrics are fetched on the thread pool,
+    both deliver their results through signals. The current line of synced lyrics is moved by
+    a timer which fires when the next line starts, it is stopped while the window is hidden.
+    """
+    title_checked = QtCore.pyqtSignal(object)
+    lyrics_loaded = QtCore.pyqtSignal(object)
+    player_changed = QtCore.pyqtSignal()
+    info_changed = QtCore.pyqtSignal()
+
+    # How often the title of the player is checked in milliseconds
+    TITLE_INTERVAL = 1000
+
+    def __init__(self, ui):
+        super().__init__()
+        self.ui = ui
+        self.pool = QtCore.QThreadPool.globalInstance()
+        self.title_timer = QtCore.QTimer(self)
+        self.title_timer.setInterval(self.TITLE_INTERVAL)
+        self.title_timer.timeout.connect(self.check_title)
+        self.line_timer = QtCore.QTimer(self)
+        self.line_timer.setSingleShot(True)
+        self.line_timer.setTimerType(QtCore.Qt.TimerType.PreciseTimer)
+        self.line_timer.timeout.connect(self.update_line)
+        self.title_checked.connect(self.title_received)
+        self.lyrics_loaded.connect(self.show_lyrics)
+        self.player_changed.connect(self.check_title)
+        self.info_changed.connect(ui.refresh_info)
+
+        self.checking = False
+        self.followed = set()
+        self.visible = True
+        self.generation = 0
+        self.song_name = ""
+        self.started = 0.0
+        self.lyrics_metadata = None
+        self.header = ""
+        self.text = ""
+        self.timeline = None
+        self.clock = None
+        self.estimated = False
+        self.line = -1
+
+    def start(self):
+        self.title_timer.start()
+        self.check_title()
+
+    def check_title(self):
+        if not self.checking:
+            self.checking = True
+            self.pool.start(Task(self.title_checked, self.get_title, self.ui.get_current_streaming_service()))
+
+    def get_title(self, service: backend.StreamingService) -> str:
+        title = backend.get_window_title(service)
+        listener = backend.get_mpris_listener(service)
+        if listener is not None and listener not in self.followed:
+            # MPRIS players announce a new song right away, so it doesn't wait for the next check
+            self.followed.add(listener)
+            listener.add_callback(lambda _title: self.player_changed.emit())
+        return title
+
+    def title_received(self, song_name):
+        self.checking = False
+        if song_name is None:
+            return
+        if song_name in self.ui.get_current_streaming_service().get_not_playing_windows_title():
+            if self.estimated:
+                self.clock.update(playing=False)
+                self.line_timer.stop()
+        elif song_name != self.song_name:
+            self.load(song_name)
+        elif self.timeline is not None:
+            if self.estimated and not self.clock.playing:
+                self.clock.update(playing=True)
+            # Catches up with seeks and pauses of the player
+            self.update_line()
+
+    def load(self, song_name: str = None):
+        """Fetches the lyrics of the song, or the next lyrics of the current song without a name."""
+        ui = self.ui
+        self.generation += 1
+        self.lyrics_metadata = None
+        self.timeline = None
+        self.line_timer.stop()
+        ui.sync_adjustment_slider.setValue(0)
+        next_lyrics = song_name is None
+        if next_lyrics:
+            song_name = self.song_name
+        else:
+            self.song_name = song_name
+            self.started = time.time()
+            ui.song = backend.Song.get_from_string(song_name)
+            ui.lyrics = ""
+            if ui.info:
+                backend.info_loader.load(ui.song, self.info_changed.emit)
+            else:
+                backend.info_loader.cancel()
+        ui.refresh_lyrics(song_name, "Loading...")
+        self.pool.start(Task(self.lyrics_loaded, self.fetch, self.generation, ui.song, song_name, next_lyrics,
+                             ui.sync, ui.get_current_streaming_service()))
+
+    def fetch(self, generation: int, song: backend.Song, song_name: str, next_lyrics: bool, sync: bool,
+              service: backend.StreamingService) -> tuple:
+        try:
+            if next_lyrics:
+                lyrics_metadata = backend.next_lyrics(song=song, sync=sync)
+            else:
+                def show_late(late_metadata):
+                    # Found after the deadline, show_lyrics drops them if another song is shown by then
+                    self.lyrics_loaded.emit(self.compile(generation, song_name, late_metadata))
+
+                lyrics_metadata = backend.get_lyrics(song=song, sync=sync, deadline=Config.LYRICS_DEADLINE,
+                                                     late=show_late)
+                backend.prefetch_upcoming(service, song_name, sync=sync)
+        except Exception as error:
+            sentry_sdk.capture_exception(error)
+            lyrics_metadata = backend.LyricsMetadata("Error: Could not find lyrics.", "", "---", False)
+        return self.compile(generation, song_name, lyrics_metadata)
+
+    @staticmethod
+    def compile(generation: int, song_name: str, lyrics_metadata: backend.LyricsMetadata) -> tuple:
+        lrc = timeline = None
+        if lyrics_metadata.timed:
+            # Parsed here, so the GUI thread only has to show the lines
+            lrc = pylrc.parse(lyrics_metadata.lyrics)
+            timeline = backend.LyricsTimeline(lrc)
+        return generation, song_name, lyrics_metadata, lrc, timeline
+
+    def show_lyrics(self, result):
+        if result is None:
+            return
+        generation, song_name, lyrics_metadata, lrc, timeline = result
+        if generation != self.generation:
+            return
+        ui = self.ui
+        ui.lyrics = lyrics_metadata.lyrics
+        ui.timed = lyrics_metadata.timed
+        if not lyrics_metadata.url:
+            self.header = song_name
+        else:
+            style = ui.label_song_name.styleSheet()
+            if style == "":
+                color = "color: black"
+            else:
+                color = style
+            self.header = '''<style type="text/css">a {text-decoration: none; %s}</style><a href="%s">%s</a>''' \
+                          % (color, lyrics_metadata.url, song_name)
+        self.text = lyrics_metadata.lyrics
+        if lrc is not None:
+            if lrc.album:
+                ui.song.album = lrc.album
+            self.text = '\n'.join(e.text for e in lrc)
+            clock = ui.get_current_streaming_service().get_playback_clock()
+            self.estimated = clock is None
+            if self.estimated:
+                # The player doesn't report its position, so it is counted from the song change
+                clock = backend.PlaybackClock(time.time() - self.started)
+            self.clock = clock
+        self.lyrics_metadata = lyrics_metadata
+        self.timeline = timeline
+        self.render()
+
+    def render(self):
+        """Shows synced lyrics line by line while sync is on, otherwise the lyrics as text."""
+        ui = self.ui
+        if self.lyrics_metadata is None:
+            return
+        if self.timeline is not None and len(self.timeline) and ui.sync:
+            ui.sync_adjustment_slider.setVisible(True)
+            ui.refresh_timeline(self.header, self.lyrics_metadata.service_name, self.timeline.lines)
+            self.line = -1
+            self.update_line()
+        else:
+            self.line_timer.stop()
+            ui.sync_adjustment_slider.setVisible(False)
+            ui.refresh_lyrics(self.header, ui.add_service_name_to_lyrics(self.text, self.lyrics_metadata.service_name))
+
+    def update_line(self):
+        """Highlights the line sung now and sets the timer to the start of the next one."""
+        self.line_timer.stop()
+        if self.timeline is None or not len(self.timeline) or not self.ui.sync or not self.visible:
+            return
+        position = self.clock.get_position() + self.ui.sync_adjustment_slider.value()
+        index = self.timeline.get_index(position)
+        if index != self.line:
+            self.line = index
+            self.ui.highlight_line(index)
+        if self.clock.playing:
+            delay = (self.timeline.get_next_time(index) - position) / max(self.clock.rate, 0.01)
+            if delay != float("inf"):
+                self.line_timer.start(min(max(int(delay * 1000) + 1, 0), 3600000))
+
+    def set_visible(self, visible: bool):
+        if visible != self.visible:
+            self.visible = visible
+            self.update_line()
+
+
 BRACKETS = re.compile(r'\[.+?\]')
-HTML_TAGS = re.compile(r'<.+?>')
 
 
 class UiForm:
     sync = False
     ontop = False
     open_spotify = False
-    changed = False
     dark_theme = False
     info = False
     minimize_to_tray = False
@@ -73,8 +316,10 @@ class UiForm:
         self.lyrics = ""
         self.timed = False
         self.is_loading_settings = False
-        self.comm = Communicate()
-        self.comm.signal.connect(self.refresh_lyrics)
+        self.settings = backend.SettingsStore(Config.SETTINGS_DIR + "settings.ini")
+        self.shown_info = None
+        self.scheduler = LyricsScheduler(self)
+        self.timeline_first_block = 0
 
         FORM.setObjectName("Form")
         FORM.resize(550, 610)
@@ -142,11 +387,14 @@ class UiForm:
         self.tray_icon.setIcon(QtGui.QIcon(self.get_resource_path('icon.png')))
 
         show_action = QAction("Show", FORM)
+        status_action = QAction("Service Status", FORM)
         quit_action = QAction("Exit", FORM)
         show_action.triggered.connect(FORM.show)
+        status_action.triggered.connect(self.show_service_status)
         quit_action.triggered.connect(QApplication.quit)
         tray_menu = QMenu()
         tray_menu.addAction(show_action)
+        tray_menu.addAction(status_action)
         tray_menu.addAction(quit_action)
         self.tray_icon.setContextMenu(tray_menu)
         self.tray_icon.show()
@@ -172,6 +420,7 @@ class UiForm:
         self.sync_adjustment_slider.setToolTipDuration(5000)
         self.sync_adjustment_slider.setFixedWidth(25)
         self.sync_adjustment_slider.valueChanged.connect(self.changed_slider)
+        self.sync_adjustment_slider.valueChanged.connect(self.scheduler.update_line)
         self.sync_adjustment_slider.setValue(0)
         self.horizontal_layout_1.addWidget(self.sync_adjustment_slider)
         self.text_browser = LyricsTextBrowserWidget(FORM)
@@ -205,9 +454,9 @@ class UiForm:
 
         self.set_style()
         self.load_save_settings()
-        self.spotify()
-        self.start_thread()
         self.song = None
+        self.spotify()
+        self.scheduler.start()
 
     def changed_slider(self, value) -> None:
         self.sync_adjustment_slider.setToolTip("%d seconds shifted" % value)
@@ -223,21 +472,10 @@ class UiForm:
         if self.is_loading_settings:
             return
 
-        settings_file = Config.SETTINGS_DIR + "settings.ini"
-        section = "settings"
-
-        if not os.path.exists(settings_file):
-            directory = os.path.dirname(settings_file)
-            if not os.path.exists(directory):
-                os.makedirs(directory)
-
-        loaded_config = configparser.ConfigParser(strict=False)
+        section = self.settings.section
         if not save:
             self.is_loading_settings = True
-            try:
-                loaded_config.read(settings_file)
-            except configparser.MissingSectionHeaderError:
-                pass
+            loaded_config = self.settings.load()
 
             self.sync = loaded_config.getboolean(section, "syncedlyrics", fallback=False)
             self.ontop = loaded_config.getboolean(section, "alwaysontop", fallback=False)
@@ -247,6 +485,7 @@ class UiForm:
             self.minimize_to_tray = loaded_config.getboolean(section, "minimizetotray", fallback=False)
             self.font_size_box.setValue(loaded_config.getint(section, "fontsize", fallback=10))
             Config.LYRICS_DIR = loaded_config.get(section, "LyricsPath", fallback=Config.LYRICS_DIR)
+            Config.PROVIDERS = providers.parse_overrides(loaded_config.get(section, "Providers", fallback=""))
 
             streaming_service_name = loaded_config.get(section, "StreamingService", fallback=None)
             if streaming_service_name:
@@ -288,28 +527,30 @@ class UiForm:
             if self.minimize_to_tray:
                 self.options_combobox.setItemText(7, "Minimize to Tray (on)")
         else:
-            loaded_config.add_section(section)
-            loaded_config[section]["SyncedLyrics"] = str(self.sync)
-            loaded_config[section]["AlwaysOnTop"] = str(self.ontop)
-            loaded_config[section]["OpenSpotify"] = str(self.open_spotify)
-            loaded_config[section]["DarkTheme"] = str(self.dark_theme)
-            loaded_config[section]["Info"] = str(self.info)
-            loaded_config[section]["MinimizeToTray"] = str(self.minimize_to_tray)
-            loaded_config[section]["FontSize"] = str(self.font_size_box.value())
-            loaded_config[section]["StreamingService"] = str(self.get_current_streaming_service())
-            loaded_config[section]["FullScreen"] = str(FORM.isFullScreen())
-            loaded_config[section]["Maximized"] = str(FORM.isMaximized())
-            loaded_config[section]["X"] = str(FORM.pos().x())
-            loaded_config[section]["Y"] = str(FORM.pos().y())
-            loaded_config[section]["Width"] = str(FORM.width().real)
-            loaded_config[section]["Height"] = str(FORM.height().real)
+            values = {
+                "SyncedLyrics": self.sync,
+                "AlwaysOnTop": self.ontop,
+                "OpenSpotify": self.open_spotify,
+                "DarkTheme": self.dark_theme,
+                "Info": self.info,
+                "MinimizeToTray": self.minimize_to_tray,
+                "FontSize": self.font_size_box.value(),
+                "StreamingService": self.get_current_streaming_service(),
+                "FullScreen": FORM.isFullScreen(),
+                "Maximized": FORM.isMaximized(),
+                "X": FORM.pos().x(),
+                "Y": FORM.pos().y(),
+                "Width": FORM.width().real,
+                "Height": FORM.height().real,
+            }
             if self.disableErrorReporting:
-                loaded_config[section]["disableErrorReporting"] = str(self.disableErrorReporting)
+                values["disableErrorReporting"] = self.disableErrorReporting
             if Config.LYRICS_DIR != Config.DEFAULT_LYRICS_DIR:
-                loaded_config[section]["LyricsPath"] = Config.LYRICS_DIR
-
-            with open(settings_file, 'w+') as settings:
-                loaded_config.write(settings)
+                values["LyricsPath"] = Config.LYRICS_DIR
+            if Config.PROVIDERS:
+                values["Providers"] = providers.format_overrides(Config.PROVIDERS)
+            # Only kept in memory here, the store writes the file once the changes stop
+            self.settings.set(values)
         self.is_loading_settings = False
 
     def options_changed(self) -> None:
@@ -341,6 +582,7 @@ class UiForm:
             else:
                 self.options_combobox.setItemText(2, "Synced Lyrics (on)")
             self.sync = not self.sync
+            self.scheduler.render()
         elif current_index == 3:
             if self.ontop is False:
                 FORM.setWindowFlags(FORM.windowFlags() | QtCore.Qt.WindowType.WindowStaysOnTopHint)
@@ -497,6 +739,7 @@ class UiForm:
 
     def set_lyrics_with_alignment(self, lyrics):
         self.text_browser.clear()
+        self.text_browser.highlighted_block = -1
         for line in lyrics.splitlines():
             self.text_browser.append(line)
             self.text_browser.setAlignment(self.lyrics_text_align)
@@ -511,8 +754,12 @@ class UiForm:
         style = style.replace('p ', '')
         self.text_browser.setStyleSheet(f"{style}p font-size: {self.font_size_box.value() * 2}pt;")
         lyrics = self.text_browser.toPlainText()
+        highlighted_block = self.text_browser.highlighted_block
         self.set_lyrics_with_alignment(lyrics)
         self.current_line_style["font-size"] = f"{self.current_line_size_ratio * self.font_size_box.value()}pt"
+        if highlighted_block >= 0:
+            self.text_browser.highlight_block(highlighted_block, self.get_current_line_format(),
+                                              self.get_line_format())
         self.load_save_settings(save=True)
 
     def retranslate_ui(self, form):
@@ -556,103 +803,61 @@ class UiForm:
         return '''<span style="font-size:%spx; font-style:italic;">Lyrics loaded from: %s</span>\n\n%s''' % (
             (self.font_size_box.value() - 2) * 2, service_name, lyrics)
 
-    def display_lyrics(self, comm):
-        old_song_name = ""
-        while True:
-            song_name = backend.get_window_title(self.get_current_streaming_service())
-            if (old_song_name != song_name or self.changed) \
-                    and song_name not in self.get_current_streaming_service().get_not_playing_windows_title():
-                self.sync_adjustment_slider.setValue(0)
-                comm.signal.emit(song_name, "Loading...")
-                if not self.changed:
-                    old_song_name = song_name
-                    start = time.time()
-                    self.song = backend.Song.get_from_string(song_name)
-                    self.lyrics = ""
-                    if self.info:
-                        backend.load_info(self, self.song)
-                    lyrics_metadata = backend.get_lyrics(song=self.song, sync=self.sync)
-                else:
-                    lyrics_metadata = backend.next_lyrics(song=self.song, sync=self.sync)
-                    self.changed = False
-                self.lyrics = lyrics_metadata.lyrics
-                self.timed = lyrics_metadata.timed
-                if not lyrics_metadata.url:
-                    header = song_name
-                else:
-                    style = self.label_song_name.styleSheet()
-                    if style == "":
-                        color = "color: black"
-                    else:
-                        color = style
-                    header = '''<style type="text/css">a {text-decoration: none; %s}</style><a href="%s">%s</a>''' \
-                             % (color, lyrics_metadata.url, song_name)
-                lyrics_clean = lyrics_metadata.lyrics
-                if lyrics_metadata.timed:
-                    self.sync_adjustment_slider.setVisible(self.sync)
-                    lrc = pylrc.parse(lyrics_metadata.lyrics)
-                    if lrc.album:
-                        self.song.album = lrc.album
-                    lyrics_clean = '\n'.join(e.text for e in lrc)
-                    comm.signal.emit(header,
-                                     self.add_service_name_to_lyrics(lyrics_clean, lyrics_metadata.service_name))
-                    count = 0
-                    line_changed = True
-                    while self.sync and not self.changed:
-                        time_title_start = time.time()
-                        window_title = backend.get_window_title(self.get_current_streaming_service())
-                        time_title_end = time.time()
-                        if window_title in self.get_current_streaming_service().get_not_playing_windows_title():
-                            time.sleep(0.2)
-                            start += 0.2 + time_title_end - time_title_start
-                        elif song_name != window_title or not count + 1 < len(lrc):
-                            self.sync_adjustment_slider.setValue(0)
-                            break
-                        else:
-                            if lrc[count + 1].time - self.sync_adjustment_slider.value() <= time.time() - start:
-                                count += 1
-                                line_changed = True
-                            if line_changed:
-                                lrc[count - 1].text = HTML_TAGS.sub("", lrc[count - 1].text)
-                                lrc[count].text = \
-                                    f"<b style=\"{self.dict_to_style(self.current_line_style)}\">{lrc[count].text}</b>"
-                                if count - 2 > 0:
-                                    lrc[count - 3].text = HTML_TAGS.sub("", lrc[count - 3].text)
-                                    lrc[count - 2].text = "<a name=\"#scrollHere\">%s</a>" % lrc[count - 2].text
-                                bold_lyrics = '<style type="text/css">p {font-size: %spt}</style><p>%s</p>' % \
-                                              (
-                                                  self.font_size_box.value(),
-                                                  '<br>'.join(e.text for e in lrc)
-                                              )
-                                comm.signal.emit(
-                                    header,
-                                    self.add_service_name_to_lyrics(bold_lyrics, lyrics_metadata.service_name)
-                                )
-                                line_changed = False
-                                time.sleep(0.5)
-                            else:
-                                time.sleep(0.2)
-                else:
-                    self.sync_adjustment_slider.setVisible(False)
-                comm.signal.emit(
-                    header,
-                    self.add_service_name_to_lyrics(lyrics_clean, lyrics_metadata.service_name))
-            time.sleep(1)
-
-    def start_thread(self):
-        lyrics_thread = threading.Thread(target=self.display_lyrics, args=(self.comm,))
-        lyrics_thread.daemon = True
-        lyrics_thread.start()
-
     def refresh_lyrics(self, song_name, lyrics):
         _translate = QtCore.QCoreApplication.translate
-        if backend.get_window_title(self.get_current_streaming_service()):
+        if self.scheduler.song_name:
             self.label_song_name.setText(_translate("Form", song_name))
         self.set_lyrics_with_alignment(_translate("Form", lyrics))
-        self.text_browser.scrollToAnchor("#scrollHere")
         self.refresh_info()
 
+    def refresh_timeline(self, song_name, service_name, lines):
+        """Loads the synced lyrics once, the current line is then highlighted by highlight_line."""
+        _translate = QtCore.QCoreApplication.translate
+        if self.scheduler.song_name:
+            self.label_song_name.setText(_translate("Form", song_name))
+        self.set_lyrics_with_alignment(self.add_service_name_to_lyrics("", service_name))
+
+        self.timeline_first_block = self.text_browser.document().blockCount()
+        cursor = QtGui.QTextCursor(self.text_browser.document())
+        cursor.movePosition(QtGui.QTextCursor.MoveOperation.End)
+        block_format = QtGui.QTextBlockFormat()
+        block_format.setAlignment(self.lyrics_text_align)
+        line_format = self.get_line_format()
+        for line in lines:
+            cursor.insertBlock(block_format, line_format)
+            cursor.insertText(line, line_format)
+        self.refresh_info()
+
+    def highlight_line(self, index):
+        self.text_browser.highlight_block(self.timeline_first_block + index, self.get_current_line_format(),
+                                          self.get_line_format())
+
+    def get_line_format(self) -> QtGui.QTextCharFormat:
+        line_format = QtGui.QTextCharFormat()
+        line_format.setFontPointSize(self.font_size_box.value())
+        return line_format
+
+    def get_current_line_format(self) -> QtGui.QTextCharFormat:
+        current_line_format = self.get_line_format()
+        current_line_format.setFontWeight(QtGui.QFont.Weight.Bold)
+        current_line_format.setFontPointSize(self.current_line_size_ratio * self.font_size_box.value())
+        background_color = self.current_line_style.get("background-color")
+        if background_color:
+            current_line_format.setBackground(QtGui.QColor(background_color))
+        return current_line_format
+
+    def get_song_info(self):
+        if not self.song:
+            return None
+        return (self.song.name, self.song.artist, self.song.album, self.song.genre, self.song.year,
+                self.song.cycles_per_minute, self.song.beats_per_minute, tuple(self.song.dances))
+
     def refresh_info(self):
+        song_info = self.get_song_info()
+        if song_info == self.shown_info:
+            return
+        self.shown_info = song_info
+
         self.info_table.clearContents()
 
         if not self.song:
@@ -711,10 +916,18 @@ class UiForm:
     def change_lyrics(self):
         _translate = QtCore.QCoreApplication.translate
         if self.song:
-            self.changed = True
+            self.scheduler.load()
         else:
             self.text_browser.append(_translate("Form", "I'm sorry, Dave. I'm afraid I can't do that."))
 
+    def show_service_status(self):
+        status_dialog = QMessageBox()
+        status_dialog.setWindowIcon(FORM.windowIcon())
+        status_dialog.setIcon(QMessageBox.Icon.Information)
+        status_dialog.setWindowTitle("Service Status")
+        status_dialog.setText("<pre>%s</pre>" % STATS.format_status())
+        status_dialog.exec()
+
     def save_lyrics(self):
         if not self.song or not self.lyrics:
             return
@@ -727,30 +940,23 @@ class UiForm:
 
         new_lyrics_file_name = None
 
-        for lyrics_file_name in os.listdir(Config.LYRICS_DIR):
-            lyrics_file_name = os.path.join(Config.LYRICS_DIR, lyrics_file_name)
-            if os.path.isfile(lyrics_file_name):
-                file_parts = os.path.splitext(lyrics_file_name)
-                file_extension = file_parts[1].lower()
-                if file_extension in (".txt", ".lrc"):
-                    file_name = file_parts[0].lower()
-                    if name.lower() in file_name and artist.lower() in file_name:
-                        save_dialog = QMessageBox()
-                        save_dialog.setWindowIcon(FORM.windowIcon())
-                        save_dialog.setIcon(QMessageBox.Icon.Information)
-
-                        save_dialog.setText("You got already saved lyrics for the song %s by %s!" %
-                                            (self.song.name, self.song.artist))
-                        save_dialog.setInformativeText("Do you want overwrite them?")
-                        save_dialog.setWindowTitle("Lyrics already saved")
-                        save_dialog.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-
-                        save_anyway = save_dialog.exec()
-                        if save_anyway == QMessageBox.StandardButton.Yes:
-                            new_lyrics_file_name = file_parts[0]
-                            break
-                        else:
-                            return
+        saved_lyrics_file_name = LIBRARY.find(self.song.artist, self.song.name)
+        if saved_lyrics_file_name:
+            save_dialog = QMessageBox()
+            save_dialog.setWindowIcon(FORM.windowIcon())
+            save_dialog.setIcon(QMessageBox.Icon.Information)
+
+            save_dialog.setText("You got already saved lyrics for the song %s by %s!" %
+                                (self.song.name, self.song.artist))
+            save_dialog.setInformativeText("Do you want overwrite them?")
+            save_dialog.setWindowTitle("Lyrics already saved")
+            save_dialog.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+
+            save_anyway = save_dialog.exec()
+            if save_anyway == QMessageBox.StandardButton.Yes:
+                new_lyrics_file_name = os.path.splitext(saved_lyrics_file_name)[0]
+            else:
+                return
 
         if not new_lyrics_file_name:
             new_lyrics_file_name = os.path.join(Config.LYRICS_DIR, f"{artist} - {name}")
@@ -767,6 +973,7 @@ class UiForm:
 
         with open(lyrics_file_name, "w", encoding="utf-8") as lyrics_file:
             lyrics_file.write(text)
+        LIBRARY.add(lyrics_file_name)
 
     def spotify(self) -> None:
         if not self.open_spotify:
@@ -794,6 +1001,7 @@ class FormWidget(QtWidgets.QWidget):
 
     def closeEvent(self, event):
         UI.load_save_settings(save=True)
+        UI.settings.flush()
         if UI.minimize_to_tray:
             event.ignore()
             self.hide()
@@ -802,6 +1010,24 @@ class FormWidget(QtWidgets.QWidget):
         if reason == QtWidgets.QSystemTrayIcon.ActivationReason.DoubleClick:
             self.show()
 
+    def showEvent(self, event):
+        self.update_visibility()
+
+    def hideEvent(self, event):
+        self.update_visibility()
+
+    def changeEvent(self, event):
+        if event.type() == QtCore.QEvent.Type.WindowStateChange:
+            self.update_visibility()
+        super().changeEvent(event)
+
+    def update_visibility(self):
+        try:
+            UI.scheduler.set_visible(self.isVisible() and not self.isMinimized())
+        except NameError:
+            # Shown while the UI is still being set up
+            pass
+
     def moveEvent(self, a0: QtGui.QMoveEvent) -> None:
         try:
             UI.load_save_settings(save=True)
@@ -831,9 +1057,12 @@ if __name__ == "__main__":
         scope.set_tag("os", platform.system())
         scope.set_tag("os_version", platform.release())
         scope.set_tag("architecture", platform.machine())
+    atexit.register(STATS.save)
     APP = QtWidgets.QApplication(sys.argv)
     APP.setStyle("fusion")
     FORM = FormWidget()
     UI = UiForm()
     FORM.show()
+    APP.aboutToQuit.connect(UI.settings.flush)
+    APP.aboutToQuit.connect(backend.play_history.flush)
     sys.exit(APP.exec())
@@ -1,23 +1,191 @@
 # -*- coding: utf-8 -*-
+import bisect
+import configparser
+import json
 import os
+import pickle
 import re
 import shutil
 import sqlite3
 import subprocess
 import sys
+import tempfile
 import threading
 import time
 import webbrowser  # to open link on browser
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
+from concurrent.futures import (ThreadPoolExecutor, Future, as_completed, wait, CancelledError,
+                                TimeoutError as FutureTimeoutError)
 from typing import Tuple
 from urllib import request
 
+import pylrc
 import requests
-from diskcache import Cache
 
+import matching
 import services as s
 
-cache = Cache(os.path.join(s.Config.SETTINGS_DIR, 'cache'))
+
+class TieredCache:
+    """In-memory LRU in front of the disk cache, which is opened lazily if it is given as a directory."""
+
+    def __init__(self, disk, max_items: int, max_size: int):
+        if isinstance(disk, str):
+            self._directory = disk
+            self._disk = None
+        else:
+            self._directory = disk.directory
+            self._disk = disk
+        self.disk_lock = threading.Lock()
+        self.max_items = max_items
+        self.max_size = max_size
+        self.memory = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.stats = {"memory": {"hits": 0, "misses": 0}, "disk": {"hits": 0, "misses": 0}}
+        # Corrupt entries dropped from the disk cache
+        self.dropped = 0
+
+    @property
+    def disk(self):
+        if self._disk is None:
+            with self.disk_lock:
+                if self._disk is None:
+                    from cache_disk import open_cache
+
+                    self._disk = open_cache(self._directory, s.Config.DISK_CACHE_SIZE, s.Config.DISK_CACHE_EVICTION,
+                                            s.Config.DISK_CACHE_COMPRESS_LEVEL)
+        return self._disk
+
+    @disk.setter
+    def disk(self, disk):
+        self._disk = disk
+        if disk is not None:
+            self._directory = disk.directory
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                value, size, expire_time = entry
+                if expire_time is None or expire_time > time.time():
+                    self.memory.move_to_end(key)
+                    self.stats["memory"]["hits"] += 1
+                    return value
+                self.remove(key)
+            self.stats["memory"]["misses"] += 1
+
+        from cache_disk import CORRUPT_ERRORS
+        from diskcache import Timeout
+
+        try:
+            value, expire_time = self.disk.get(key, default=None, expire_time=True)
+        except CORRUPT_ERRORS as error:
+            print("Dropping corrupt cache entry %s: %r" % (key, error))
+            self.drop(key)
+            value = None
+        except (Timeout, PermissionError, sqlite3.OperationalError):
+            value = None
+        except sqlite3.DatabaseError:
+            self.repair()
+            value = None
+        with self.lock:
+            if value is None:
+                self.stats["disk"]["misses"] += 1
+                return default
+            self.stats["disk"]["hits"] += 1
+            self.add(key, value, expire_time)
+        return value
+
+    def set(self, key, value, expire: float = None):
+        from diskcache import Timeout
+
+        try:
+            self.disk.set(key, value, expire=expire)
+        except (Timeout, PermissionError, sqlite3.OperationalError):
+            pass
+        except sqlite3.DatabaseError:
+            self.repair()
+        with self.lock:
+            self.add(key, value, None if expire is None else time.time() + expire)
+
+    def add(self, key, value, expire_time):
+        self.remove(key)
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.max_size:
+            return
+        self.memory[key] = (value, size, expire_time)
+        self.size += size
+        while len(self.memory) > self.max_items or self.size > self.max_size:
+            self.remove(next(iter(self.memory)))
+
+    def remove(self, key):
+        entry = self.memory.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def clear_memory(self):
+        with self.lock:
+            self.memory.clear()
+            self.size = 0
+
+    def drop(self, key):
+        from diskcache import Timeout
+
+        try:
+            self.disk.delete(key)
+        except (Timeout, PermissionError, sqlite3.OperationalError):
+            return
+        with self.lock:
+            self.dropped += 1
+
+    def repair(self) -> int:
+        """Drops the entries which can't be read anymore and returns how many, a broken database is recreated."""
+        import warnings
+
+        from cache_disk import CORRUPT_ERRORS
+        from diskcache import Timeout
+
+        self.clear_memory()
+        dropped = self.dropped
+        try:
+            with warnings.catch_warnings():
+                # check reports what it fixes as warnings
+                warnings.simplefilter("ignore")
+                self.disk.check(fix=True)
+            for key in list(self.disk.iterkeys()):
+                try:
+                    self.disk.get(key)
+                except CORRUPT_ERRORS as error:
+                    print("Dropping corrupt cache entry %s: %r" % (key, error))
+                    self.drop(key)
+                except Exception as error:
+                    print("Keeping cache entry %s which can't be read: %r" % (key, error))
+        except (Timeout, sqlite3.OperationalError):
+            # Busy with another process, it is tried again when the next error occurs
+            pass
+        except sqlite3.DatabaseError:
+            with self.disk_lock:
+                if self._disk is not None:
+                    self._disk.close()
+                shutil.rmtree(self._directory, ignore_errors=True)
+                # Opened again when it is used next
+                self._disk = None
+            print("Cache recreated")
+        return self.dropped - dropped
+
+    def close(self):
+        self.clear_memory()
+        if self._disk is not None:
+            self._disk.close()
+
+
+cache = TieredCache(os.path.join(s.Config.SETTINGS_DIR, 'cache'), s.Config.MEMORY_CACHE_ITEMS,
+                    s.Config.MEMORY_CACHE_SIZE)
 
 if sys.platform == "win32":
     import win32process
@@ -25,10 +193,21 @@ if sys.platform == "win32":
     import win32gui
 elif sys.platform == "linux":
     import dbus
+
+    try:
+        import dbus.mainloop.glib
+        from gi.repository import GLib
+    except ImportError:
+        GLib = None
 elif sys.platform == "darwin":
     import applescript
 
 
+# Dashes between artist and song name which players use instead of a hyphen
+TITLE_DASHES = re.compile(r"\s+[\u2012-\u2015\u2212]\s+")
+TITLE_BRACKETS = re.compile(r" (?:\(.*?\)|\[.*?\])", re.DOTALL)
+
+
 class Song:
     name = ""
     artist = ""
@@ -47,7 +226,7 @@ class Song:
 
     @classmethod
     def get_from_string(cls, songstring: str):
-        song_name_parts = songstring.split(" - ")
+        song_name_parts = TITLE_DASHES.sub(" - ", songstring).split(" - ")
         artist = ""
         if len(song_name_parts) > 2:
             artist = song_name_parts[0]
@@ -57,9 +236,7 @@ class Song:
             name = song_name_parts[1]
         else:
             name = song_name_parts[0]
-        name = re.sub(r' \(.*?\)', '', name, flags=re.DOTALL)
-        name = re.sub(r' \[.*?\]', '', name, flags=re.DOTALL)
-        return cls(artist, name)
+        return cls(artist, TITLE_BRACKETS.sub('', name))
 
     def __str__(self):
         return "%s: %s (%d) \nGenre: %s\nAlbum: %s\n" \
@@ -92,6 +269,20 @@ class StreamingService:
     def get_not_playing_windows_title(self) -> Tuple:
         raise NotImplementedError
 
+    def get_playback_clock(self):
+        """Returns the clock of the player if it reports its position, otherwise None."""
+        listener = get_mpris_listener(self)
+        if listener:
+            return listener.clock
+        return None
+
+    def get_upcoming_titles(self) -> list:
+        """Returns the titles of the next songs in the queue of the player if it shares them."""
+        listener = get_mpris_listener(self)
+        if listener:
+            return listener.upcoming
+        return []
+
 
 class SpotifyStreamingService(StreamingService):
     def get_windows_executable_name(self) -> str:
@@ -176,81 +367,300 @@ class VlcMediaPlayer(StreamingService):
 # Accords
 SERVICES_LIST3 = [s._ultimateguitar, s._cifraclub, s._songsterr]
 
+# Album, year, genre, tempo and dances
+INFO_SERVICES = [s._tanzmusikonline, s._welchertanz]
+INFO_FIELDS = ("album", "year", "genre", "cycles_per_minute", "beats_per_minute", "dances")
+
 '''
 current_service is used to store the current index of the list.
 Useful to change the lyrics with the button "Next Lyric" if
 the service returned a wrong song
 '''
 CURRENT_SERVICE = -1
+SECONDS_IN_HOUR = 3600
+SECONDS_IN_DAY = 86400
 SECONDS_IN_WEEK = 604800
+SONG_INFO_EXPIRE = SECONDS_IN_WEEK
+# How long the result of a service is remembered, depending on whether it found lyrics, had none or failed
+SERVICE_RESULT_EXPIRE = {s.HIT: SECONDS_IN_WEEK, s.MISS: SECONDS_IN_DAY, s.ERROR: SECONDS_IN_HOUR}
 LyricsMetadata = namedtuple("LyricsMetadata", ["lyrics", "url", "service_name", "timed"])
 
+lookup_executor = None
+
+'''
+lookup_futures holds the lookups already started for lookup_song. They are kept until the song
+changes, so "Next Lyric" continues with the results that were already gathered. lookup_users
+counts the callers which wait for a lookup, it is only cancelled when none is left.
+'''
+lookup_song = None
+lookup_futures = {}
+lookup_users = {}
+lookup_lock = threading.Lock()
+
+
+def get_lookup_executor() -> ThreadPoolExecutor:
+    global lookup_executor
+    if lookup_executor is None:
+        lookup_executor = ThreadPoolExecutor(max_workers=s.Config.LOOKUP_WORKERS, thread_name_prefix="lookup")
+    return lookup_executor
+
+
+def submit_lookups(song: Song, services: list) -> list:
+    """Starts the lookups which aren't running yet, every caller has to release the returned ones."""
+    global lookup_song, lookup_futures, lookup_users
+    with lookup_lock:
+        if lookup_song is not song:
+            for future in lookup_futures.values():
+                future.cancel()
+            lookup_song = song
+            lookup_futures = {}
+            lookup_users = {}
+
+        futures = []
+        for service in services:
+            future = lookup_futures.get(service)
+            if future is None or future.cancelled():
+                future = get_lookup_executor().submit(lookup_service, song, service)
+                lookup_futures[service] = future
+            lookup_users[future] = lookup_users.get(future, 0) + 1
+            futures.append(future)
+        return futures
+
+
+def release_lookups(futures: list):
+    """Cancels the lookups which are still queued and which no other caller waits for."""
+    with lookup_lock:
+        for future in futures:
+            users = lookup_users.pop(future, 0) - 1
+            if users > 0:
+                lookup_users[future] = users
+            else:
+                future.cancel()
+
+
+class LookupCancelled(Exception):
+    """Another song is looked up now, so the lookups of this one were stopped."""
+
+
+def get_lookup_result(song: Song, service, future):
+    try:
+        return future.result()
+    except CancelledError:
+        if lookup_song is not song:
+            raise LookupCancelled()
+        # Cancelled by the last other caller in between, the lookup is done right here then
+        return lookup_service(song, service)
+
+
+def lookup_services_sequentially(song: Song, services: list):
+    for service in services:
+        yield lookup_service(song, service)
 
-def cache_lyrics(func):
-    def recreate_cache():
-        global cache
-        cache_dir = cache.directory
-        cache.close()
-        shutil.rmtree(cache_dir)
-        cache = Cache(cache_dir)
-        print("Cache recreated")
 
+def get_hedge_delay(service) -> float:
+    """How long a service may take before the next one is asked too, its p95 if it is known."""
+    return min(s.STATS.get_percentile(service.__name__, 0.95), s.Config.HEDGE_MAX_DELAY)
+
+
+def lookup_services_hedged(song: Song, services: list):
+    """Sequential lookups which also start the next service once one takes longer than usual."""
+    futures = []
+    started = []
+
+    def start_next():
+        futures.extend(submit_lookups(song, [services[len(futures)]]))
+        started.append(time.time())
+
+    try:
+        for i, service in enumerate(services):
+            if i == len(futures):
+                start_next()
+            future = futures[i]
+            while not future.done():
+                if len(futures) < len(services):
+                    hedge_time = started[-1] + get_hedge_delay(services[len(futures) - 1])
+                    if time.time() >= hedge_time:
+                        start_next()
+                        continue
+                    wait([future], timeout=hedge_time - time.time())
+                else:
+                    wait([future])
+            yield get_lookup_result(song, service, future)
+    finally:
+        release_lookups(futures)
+
+
+def lookup_services(song: Song, services: list):
+    """Yields the result of every service in the order of the list, in parallel mode as soon as it is known."""
+    if not s.Config.PARALLEL_LOOKUPS:
+        if s.Config.HEDGED_LOOKUPS:
+            yield from lookup_services_hedged(song, services)
+        else:
+            yield from lookup_services_sequentially(song, services)
+        return
+
+    futures = submit_lookups(song, services)
+    try:
+        for service, future in zip(services, futures):
+            yield get_lookup_result(song, service, future)
+    finally:
+        release_lookups(futures)
+
+
+def lookup_current_services(song: Song, services: list):
+    """lookup_services, which stops before the next result once get_lyrics was called for another song."""
+    results = lookup_services(song, services)
+    try:
+        while True:
+            if resolving_song is not song:
+                raise LookupCancelled()
+            try:
+                result = next(results)
+            except StopIteration:
+                return
+            yield result
+    finally:
+        results.close()
+
+
+def lookup_services_finished(song: Song, services: list):
+    """Yields the results of the services which already answered for the song and None for the others."""
+    for service in services:
+        if not service.cached:
+            yield service(song)
+            continue
+        try:
+            service_result = cache.get("service:%s:%s" % (service.__name__, get_song_key(song)))
+        except (PermissionError, ValueError, sqlite3.DatabaseError):
+            service_result = None
+        yield service_result[1] if service_result is not None else None
+
+
+def repair_cache():
+    dropped = cache.repair()
+    if dropped:
+        print("Dropped %d corrupt cache entries" % dropped)
+
+
+# Applied to the artist and the name of a song in this order, before they are normalized
+SONG_KEY_RULES = (
+    (re.compile(r"[\u2012-\u2015\u2212]"), "-"),
+    (re.compile(r"\s*(?:\(.*?\)|\[.*?\])", re.DOTALL), ""),
+    # Featured artists, only a "feat." or "ft." with names after it, so it keeps "Little Feat"
+    (re.compile(r"\s+(?:feat\.|ft\.|featuring\s)\s*\S.*$", re.IGNORECASE), ""),
+    # Versions with the same lyrics, like "- 2011 Remaster", "- Radio Edit" or "- Live at Wembley"
+    (re.compile(r"\s+-\s+[^-]*\b(?:remaster(?:ed)?|edit|version|mono|stereo|live|explicit|bonus track)\b.*$",
+                re.IGNORECASE), ""),
+)
+
+
+# The raw "artist-name" titles seen with their key, the least recently used are dropped first
+song_key_aliases = OrderedDict()
+song_key_lock = threading.Lock()
+
+
+def canonicalize(text: str) -> str:
+    for pattern, replacement in SONG_KEY_RULES:
+        text = pattern.sub(replacement, text)
+    return matching.normalize(text)
+
+
+def get_song_key(song: Song) -> str:
+    """Key of the song in the caches, the same for variants like "Song - 2011 Remaster" or "SONG (feat. X)"."""
+    raw = "%s-%s" % (song.artist, song.name)
+    with song_key_lock:
+        key = song_key_aliases.get(raw)
+        if key is not None:
+            song_key_aliases.move_to_end(raw)
+            return key
+    # Names which are only brackets or versions are kept as they are
+    name = canonicalize(song.name) or matching.normalize(song.name) or song.name
+    key = "%s-%s" % (canonicalize(song.artist), name)
+    with song_key_lock:
+        song_key_aliases[raw] = key
+        while len(song_key_aliases) > s.Config.SONG_KEY_ALIASES:
+            song_key_aliases.popitem(last=False)
+    return key
+
+
+def cache_lyrics(func):
     def wrapper(*args, **kwargs):
         song = args[0]
         sync = kwargs.get("sync", False)
         ignore_cache = kwargs.get("ignore_cache", False)
 
-        clean_song_name = '{}-{}'.format(song.artist, song.name)
+        clean_song_name = get_song_key(song)
         if not ignore_cache:
             try:
                 lyrics_metadata = cache.get(clean_song_name)
             except (PermissionError, ValueError, sqlite3.DatabaseError):
-                recreate_cache()
+                repair_cache()
                 lyrics_metadata = None
             if not lyrics_metadata or not lyrics_metadata.lyrics:
                 lyrics_metadata = func(*args, **kwargs)
                 try:
-                    cache.set(clean_song_name, lyrics_metadata, expire=SECONDS_IN_WEEK)
+                    cache.set(clean_song_name, lyrics_metadata, expire=get_lyrics_expire(lyrics_metadata))
                 except (PermissionError, ValueError, sqlite3.DatabaseError):
-                    recreate_cache()
+                    repair_cache()
             return lyrics_metadata
         else:
             lyrics_metadata = func(*args, **kwargs)
             try:
-                cache.set(clean_song_name, lyrics_metadata, expire=SECONDS_IN_WEEK)
+                cache.set(clean_song_name, lyrics_metadata, expire=get_lyrics_expire(lyrics_metadata))
             except (PermissionError, ValueError, sqlite3.DatabaseError):
-                recreate_cache()
+                repair_cache()
             return lyrics_metadata
 
     return wrapper
 
 
-@cache_lyrics
-def load_lyrics(song: Song, **kwargs):
-    sync = kwargs.get("sync", False)
-    global CURRENT_SERVICE
+def get_lyrics_expire(lyrics_metadata: LyricsMetadata) -> int:
+    if lyrics_metadata.url:
+        return SERVICE_RESULT_EXPIRE[s.HIT]
+    return SERVICE_RESULT_EXPIRE[s.MISS]
+
+
+def lookup_service(song: Song, service):
+    """Calls the service for the song and records if it found lyrics, had none or failed."""
+    if not service.cached:
+        return service(song)
+
+    key = "service:%s:%s" % (service.__name__, get_song_key(song))
+    try:
+        service_result = cache.get(key)
+    except (PermissionError, ValueError, sqlite3.DatabaseError):
+        service_result = None
+    if service_result is not None:
+        return service_result[1]
+
+    status, result = service.lookup(song)
+    if status == s.SKIPPED:
+        return result
+    try:
+        cache.set(key, (status, result), expire=SERVICE_RESULT_EXPIRE[status])
+    except (PermissionError, ValueError, sqlite3.DatabaseError):
+        repair_cache()
+    return result
 
-    if sync:
-        if s._local not in s.SERVICES_LIST1:
-            s.SERVICES_LIST1.insert(0, s._local)
-    else:
-        if s._local not in s.SERVICES_LIST2:
-            s.SERVICES_LIST2.insert(0, s._local)
+
+def find_lyrics(song: Song, sync: bool, current_service: int, lookup=None) -> Tuple[LyricsMetadata, int]:
+    """Asks the services after current_service and returns the lyrics and the index of the one which found them."""
+    lookup = lookup or lookup_services
 
     timed = False
     lyrics = ""
     service_name = "---"
     url = ""
-    if not CURRENT_SERVICE < (len(s.SERVICES_LIST1) + len(s.SERVICES_LIST2) - 1):
-        CURRENT_SERVICE = -1
+    if not current_service < (len(s.SERVICES_LIST1) + len(s.SERVICES_LIST2) - 1):
+        current_service = -1
 
-    if sync and CURRENT_SERVICE + 1 < len(s.SERVICES_LIST1):
+    if sync and current_service + 1 < len(s.SERVICES_LIST1):
         temp_lyrics = []
-        for i in range(CURRENT_SERVICE + 1, len(s.SERVICES_LIST1)):
-            result = s.SERVICES_LIST1[i](song)
+        results = lookup(song, s.SERVICES_LIST1[current_service + 1:])
+        for i, result in enumerate(results, current_service + 1):
             if result:
                 lyrics, url, service_name, timed = result
-                CURRENT_SERVICE = i
+                current_service = i
                 if timed:
                     break
                 else:
@@ -258,37 +668,465 @@ def load_lyrics(song: Song, **kwargs):
         if not timed and temp_lyrics and temp_lyrics[0]:
             lyrics, url, service_name, timed = temp_lyrics
 
-    current_not_synced_service = CURRENT_SERVICE - len(s.SERVICES_LIST1)
+    current_not_synced_service = current_service - len(s.SERVICES_LIST1)
     current_not_synced_service = -1 if current_not_synced_service < -1 else current_not_synced_service
-    if sync and not lyrics or not sync or CURRENT_SERVICE > (len(s.SERVICES_LIST1) - 1):
-        for i in range(current_not_synced_service + 1, len(s.SERVICES_LIST2)):
-            result = s.SERVICES_LIST2[i](song)  # Can return 4 values if _local was inserted
+    if sync and not lyrics or not sync or current_service > (len(s.SERVICES_LIST1) - 1):
+        results = lookup(song, s.SERVICES_LIST2[current_not_synced_service + 1:])
+        for i, result in enumerate(results, current_not_synced_service + 1):
             if result:
-                lyrics, url, service_name = result
+                lyrics, url, service_name = result[:3]  # The local lyrics return 4 values
                 lyrics = lyrics.replace("&amp;", "&").replace("`", "'").strip()
-                CURRENT_SERVICE = i + len(s.SERVICES_LIST1)
+                current_service = i + len(s.SERVICES_LIST1)
                 break
 
     if not lyrics:
         lyrics = "Error: Could not find lyrics."
     # return "Error: Could not find lyrics."  if the for loop doesn't find any lyrics
-    return LyricsMetadata(lyrics, url, service_name, timed)
+    return LyricsMetadata(lyrics, url, service_name, timed), current_service
+
+
+@cache_lyrics
+def load_lyrics(song: Song, **kwargs):
+    sync = kwargs.get("sync", False)
+    global CURRENT_SERVICE
 
+    lyrics_metadata, CURRENT_SERVICE = find_lyrics(song, sync, CURRENT_SERVICE)
+    return lyrics_metadata
 
-def load_info(window, song: Song):
-    def complete(function):
-        function(song)
-        window.refresh_info()
 
-    threading.Thread(target=complete, args=(s._tanzmusikonline,)).start()
-    threading.Thread(target=complete, args=(s._welchertanz,)).start()
+@cache_lyrics
+def fetch_lyrics(song: Song, **kwargs) -> LyricsMetadata:
+    """Like load_lyrics, but from the first service and without touching the "Next Lyric" state."""
+    return find_lyrics(song, kwargs.get("sync", False), -1, lookup_services_sequentially)[0]
 
 
-def get_lyrics(song: Song, sync=False):
-    global CURRENT_SERVICE
+def is_cached(song: Song) -> bool:
+    try:
+        lyrics_metadata = cache.get(get_song_key(song))
+    except (PermissionError, ValueError, sqlite3.DatabaseError):
+        return False
+    return bool(lyrics_metadata and lyrics_metadata.lyrics)
+
+
+def save_lyrics_file(song: Song, lyrics_metadata: LyricsMetadata) -> str:
+    """Writes the lyrics to Config.LYRICS_DIR unless the song has saved lyrics already, returns the new path."""
+    if not lyrics_metadata.url or s.LIBRARY.find(song.artist, song.name):
+        return ""
+    if not os.path.exists(s.Config.LYRICS_DIR):
+        os.makedirs(s.Config.LYRICS_DIR)
+
+    extension = ".lrc" if lyrics_metadata.timed else ".txt"
+    lyrics_file_name = os.path.join(s.Config.LYRICS_DIR, s.LocalLibrary.get_key(song.artist, song.name) + extension)
+    with open(lyrics_file_name, "w", encoding="UTF-8") as lyrics_file:
+        lyrics_file.write(lyrics_metadata.lyrics)
+    s.LIBRARY.add(lyrics_file_name)
+    return lyrics_file_name
+
+
+def prefetch_lyrics(songs: list, sync: bool = True, workers: int = None, save: bool = False, report=print) -> dict:
+    """Resolves the lyrics of the songs which aren't cached yet and returns how many had which outcome."""
+    counts = {"found": 0, "not found": 0, "skipped": 0, "error": 0}
+    pending = []
+    for song in songs:
+        if is_cached(song):
+            counts["skipped"] += 1
+        else:
+            pending.append(song)
+    if counts["skipped"]:
+        report("Skipping %d songs which are cached already" % counts["skipped"])
+
+    def fetch(song):
+        lyrics_metadata = fetch_lyrics(song, sync=sync)
+        if save:
+            save_lyrics_file(song, lyrics_metadata)
+        return lyrics_metadata
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=workers or s.Config.LOOKUP_WORKERS) as executor:
+        futures = {executor.submit(fetch, song): song for song in pending}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                song = futures[future]
+                try:
+                    lyrics_metadata = future.result()
+                except Exception as error:
+                    counts["error"] += 1
+                    result = "error: %s" % error
+                else:
+                    if lyrics_metadata.url:
+                        counts["found"] += 1
+                        result = lyrics_metadata.service_name
+                    else:
+                        counts["not found"] += 1
+                        result = "not found"
+                rate = done / max(time.time() - start, 1e-6)
+                report("[%d/%d] %s - %s: %s (%.2f songs/s)" % (done, len(pending), song.artist, song.name,
+                                                                result, rate))
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            raise
+    return counts
+
+
+class Debouncer:
+    """Calls the function on its own thread once Config.SETTINGS_SAVE_DELAY seconds passed without a new schedule."""
+
+    def __init__(self, function):
+        self.function = function
+        self.deadline = None
+        self.thread = None
+        self.condition = threading.Condition()
+
+    def schedule(self):
+        with self.condition:
+            self.deadline = time.monotonic() + s.Config.SETTINGS_SAVE_DELAY
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="debouncer", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def cancel(self):
+        with self.condition:
+            self.deadline = None
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.deadline is None or time.monotonic() < self.deadline:
+                    self.condition.wait(None if self.deadline is None else self.deadline - time.monotonic())
+                self.deadline = None
+            self.function()
+
+
+class PlayHistory:
+    """Remembers which song followed which, to guess the next songs for players which don't share their queue."""
+
+    def __init__(self, history_file: str, max_items: int):
+        self.history_file = history_file
+        self.max_items = max_items
+        self.transitions = []
+        self.last_title = ""
+        self.loaded = False
+        self.saver = Debouncer(self.flush)
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    def load(self):
+        self.loaded = True
+        try:
+            with open(self.history_file, encoding="UTF-8") as history_file:
+                self.transitions = json.load(history_file)
+        except (OSError, ValueError):
+            self.transitions = []
+
+    def flush(self):
+        with self.lock:
+            self.saver.cancel()
+            if not self.dirty:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
+                with open(self.history_file, "w", encoding="UTF-8") as history_file:
+                    json.dump(self.transitions, history_file)
+                self.dirty = False
+            except OSError as error:
+                print(error)
+
+    def played(self, title: str):
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            if self.last_title and title != self.last_title:
+                self.transitions.append([self.last_title, title])
+                del self.transitions[:-self.max_items]
+                self.dirty = True
+                self.saver.schedule()
+            self.last_title = title
+
+    def get_next(self, title: str, count: int) -> list:
+        """Follows the most recent songs which were played after the song."""
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            following = {}
+            for previous, next_title in self.transitions:
+                following[previous] = next_title
+        titles = []
+        while len(titles) < count and title in following:
+            title = following[title]
+            if title in titles:
+                break
+            titles.append(title)
+        return titles
+
+
+class LyricsPrefetcher:
+    """Fetches the lyrics of songs into the cache in the background with a bandwidth limit."""
+
+    def __init__(self, max_in_flight: int, bandwidth: int):
+        self.max_in_flight = max_in_flight
+        self.bandwidth_limit = s.BandwidthLimit(bandwidth) if bandwidth else None
+        self.executor = None
+        self.in_flight = set()
+        self.lock = threading.Lock()
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="prefetch")
+        return self.executor
+
+    def prefetch(self, songs: list, sync: bool = False) -> list:
+        """Starts fetching the songs which aren't cached yet and returns the started ones."""
+        started = []
+        with self.lock:
+            free = self.max_in_flight - len(self.in_flight)
+        for song in songs:
+            if len(started) >= free:
+                break
+            key = get_song_key(song)
+            with self.lock:
+                if key in self.in_flight:
+                    continue
+            if is_cached(song):
+                continue
+            with self.lock:
+                self.in_flight.add(key)
+            self.get_executor().submit(self.fetch, song, key, sync)
+            started.append(song)
+        return started
+
+    def fetch(self, song: Song, key: str, sync: bool):
+        try:
+            with s.SESSIONS.limit_bandwidth(self.bandwidth_limit):
+                fetch_lyrics(song, sync=sync)
+        finally:
+            with self.lock:
+                self.in_flight.discard(key)
+
+    def is_idle(self) -> bool:
+        with self.lock:
+            return not self.in_flight
+
+
+play_history = PlayHistory(os.path.join(s.Config.SETTINGS_DIR, "history.json"), s.Config.HISTORY_SIZE)
+prefetcher = LyricsPrefetcher(s.Config.PREFETCH_IN_FLIGHT, s.Config.PREFETCH_BANDWIDTH)
+
+
+def prefetch_upcoming(service: StreamingService, song_name: str, sync=False) -> list:
+    """Records the song change and prefetches the lyrics of the songs which are probably played next."""
+    play_history.played(song_name)
+    if not s.Config.PREFETCH_UPCOMING:
+        return []
+    titles = service.get_upcoming_titles() or play_history.get_next(song_name, s.Config.PREFETCH_TRACKS)
+    songs = [Song.get_from_string(title) for title in titles[:s.Config.PREFETCH_TRACKS]]
+    return prefetcher.prefetch(songs, sync)
+
+
+class SettingsStore:
+    """The settings of the app, written to the file Config.SETTINGS_SAVE_DELAY seconds after the last change."""
+
+    def __init__(self, settings_file: str, section: str = "settings"):
+        self.settings_file = settings_file
+        self.section = section
+        self.config = configparser.ConfigParser(strict=False)
+        self.config.add_section(section)
+        # One thread for all changes, moving the window changes the settings for every step
+        self.saver = Debouncer(self.flush)
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    def load(self) -> configparser.ConfigParser:
+        with self.lock:
+            self.config = configparser.ConfigParser(strict=False)
+            try:
+                self.config.read(self.settings_file)
+            except configparser.Error:
+                pass
+            if not self.config.has_section(self.section):
+                self.config.add_section(self.section)
+            self.dirty = False
+            return self.config
+
+    def set(self, values: dict):
+        """Replaces the settings with the values and saves them after the delay if they changed."""
+        values = {self.config.optionxform(key): str(value) for key, value in values.items()}
+        with self.lock:
+            if dict(self.config.items(self.section, raw=True)) == values:
+                return
+            self.config.remove_section(self.section)
+            self.config.add_section(self.section)
+            for key, value in values.items():
+                self.config.set(self.section, key, value)
+            self.dirty = True
+            self.saver.schedule()
+
+    def flush(self):
+        with self.lock:
+            self.saver.cancel()
+            if not self.dirty:
+                return
+            directory = os.path.dirname(os.path.abspath(self.settings_file))
+            temp_path = None
+            try:
+                os.makedirs(directory, exist_ok=True)
+                temp_file, temp_path = tempfile.mkstemp(prefix=".settings-", suffix=".tmp", dir=directory)
+                with os.fdopen(temp_file, "w") as settings:
+                    self.config.write(settings)
+                    settings.flush()
+                    os.fsync(settings.fileno())
+                os.replace(temp_path, self.settings_file)
+                self.dirty = False
+            except OSError as error:
+                print("Could not save settings: %s" % error)
+                if temp_path and os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+
+def get_song_info(song: Song) -> dict:
+    return {field: getattr(song, field) for field in INFO_FIELDS}
+
+
+def set_song_info(song: Song, info: dict):
+    """Fills in the info the song doesn't have yet."""
+    for field, value in info.items():
+        if field == "dances":
+            song.dances.extend(dance for dance in value if dance not in song.dances)
+        elif getattr(song, field) == getattr(Song, field):
+            setattr(song, field, value)
+
+
+class InfoLoader:
+    """Completes the info of the playing song in the background and cancels the lookups of the previous one."""
+
+    def __init__(self, services: list):
+        self.services = services
+        self.executor = None
+        self.cancel_event = threading.Event()
+        self.futures = []
+        self.lock = threading.Lock()
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=s.Config.INFO_WORKERS, thread_name_prefix="info")
+        return self.executor
+
+    def cancel(self):
+        with self.lock:
+            self.cancel_event.set()
+            for future in self.futures:
+                future.cancel()
+            self.futures = []
+
+    def load(self, song: Song, callback=None) -> Future:
+        """Loads the info of the song in the background, the future's result are the lookups which were started."""
+        self.cancel()
+        with self.lock:
+            cancel_event = self.cancel_event = threading.Event()
+            future = self.get_executor().submit(self.start, song, callback, cancel_event)
+            self.futures = [future]
+        return future
+
+    def start(self, song: Song, callback, cancel_event: threading.Event) -> list:
+        key = "info:%s" % get_song_key(song)
+        try:
+            info = cache.get(key)
+        except (PermissionError, ValueError, sqlite3.DatabaseError):
+            info = None
+        if cancel_event.is_set():
+            return []
+        if info is not None:
+            set_song_info(song, info)
+            if callback:
+                callback()
+            return []
+
+        with self.lock:
+            if cancel_event.is_set():
+                return []
+            futures = [self.get_executor().submit(service, song, cancel_event) for service in self.services]
+            self.futures.extend(futures)
+
+        def completed(_future):
+            if cancel_event.is_set():
+                return
+            if all(future.done() for future in futures) and all(future.result() for future in futures):
+                try:
+                    cache.set(key, get_song_info(song), expire=SONG_INFO_EXPIRE)
+                except (PermissionError, ValueError, sqlite3.DatabaseError):
+                    pass
+            if callback:
+                callback()
+
+        for future in futures:
+            future.add_done_callback(completed)
+        return futures
+
+
+info_loader = InfoLoader(INFO_SERVICES)
+
+
+resolve_executor = None
+resolving_song = None
+# The service which found the lyrics of resolving_song in the background
+resolved_service = -1
+
+
+def get_resolve_executor() -> ThreadPoolExecutor:
+    global resolve_executor
+    if resolve_executor is None:
+        resolve_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="resolve")
+    return resolve_executor
+
+
+@cache_lyrics
+def resolve_lyrics(song: Song, **kwargs) -> LyricsMetadata:
+    """load_lyrics with a deadline, which may finish in the background."""
+    global resolved_service
+    lyrics_metadata, current_service = find_lyrics(song, kwargs.get("sync", False), -1, lookup_current_services)
+    if resolving_song is song:
+        resolved_service = current_service
+    return lyrics_metadata
+
+
+def get_lyrics(song: Song, sync=False, deadline: float = None, late=None):
+    """Returns the lyrics of the song, with a deadline the best ones found until then."""
+    global CURRENT_SERVICE, resolving_song, resolved_service
     CURRENT_SERVICE = -1
+    resolving_song = song
+    resolved_service = -1
+    if s.Config.ADAPTIVE_ORDER:
+        # Only reordered for a new song, so "Next Lyric" keeps going through the same order
+        with lookup_lock:
+            s.order_services()
 
-    return load_lyrics(song, sync=sync)
+    if deadline is None:
+        return load_lyrics(song, sync=sync)
+
+    future = get_resolve_executor().submit(resolve_lyrics, song, sync=sync)
+    try:
+        lyrics_metadata = future.result(timeout=deadline)
+        # "Next Lyric" may have moved on from the -1 already
+        if resolving_song is song and CURRENT_SERVICE == -1:
+            CURRENT_SERVICE = resolved_service
+        return lyrics_metadata
+    except (FutureTimeoutError, LookupCancelled):
+        lyrics_metadata, current_service = find_lyrics(song, sync, -1, lookup_services_finished)
+        if resolving_song is song:
+            CURRENT_SERVICE = current_service
+
+    def resolved(_future):
+        global CURRENT_SERVICE
+        # Lyrics found after the deadline replace the fallback, unless "Next Lyric" moved on from it
+        if late is None or resolving_song is not song or CURRENT_SERVICE != current_service \
+                or future.exception() or future.result() == lyrics_metadata:
+            return
+        CURRENT_SERVICE = resolved_service
+        late(future.result())
+
+    future.add_done_callback(resolved)
+    return lyrics_metadata
 
 
 def next_lyrics(song: Song, sync=False):
@@ -302,6 +1140,26 @@ def load_chords(song: Song):
             webbrowser.open(url)
 
 
+class LyricsTimeline:
+    """The times and texts of the lines of synced lyrics, compiled once per song."""
+
+    def __init__(self, lrc: pylrc.classes.Lyrics):
+        self.times = [line.time for line in lrc]
+        self.lines = [line.text for line in lrc]
+
+    def __len__(self):
+        return len(self.lines)
+
+    def get_index(self, position: float) -> int:
+        """Returns the index of the line sung at the position, the first line before it starts."""
+        return max(bisect.bisect_right(self.times, position) - 1, 0)
+
+    def get_next_time(self, index: int) -> float:
+        if index + 1 < len(self.times):
+            return self.times[index + 1]
+        return float("inf")
+
+
 spids = []
 
 
@@ -318,6 +1176,212 @@ def update_spids(windows_executable: str):
             print("Cannot access the name of the process")
 
 
+# linux only
+def get_mpris_title(metadata) -> str:
+    artists = metadata.get("xesam:artist", [])
+    title = str(metadata.get("xesam:title", ""))
+    if artists and title:
+        return "%s - %s" % (artists[0], title)
+    return title
+
+
+class PlaybackClock:
+    """Position in the current song in seconds, extrapolated between the reports of the player."""
+
+    def __init__(self, position: float = 0.0, playing: bool = True):
+        self.position = position
+        self.rate = 1.0
+        self.playing = playing
+        self.updated = time.time()
+        self.lock = threading.Lock()
+
+    def get_position(self) -> float:
+        with self.lock:
+            return self._get_position()
+
+    def _get_position(self) -> float:
+        if self.playing:
+            return self.position + (time.time() - self.updated) * self.rate
+        return self.position
+
+    def update(self, position: float = None, rate: float = None, playing: bool = None):
+        with self.lock:
+            self.position = self._get_position() if position is None else position
+            self.updated = time.time()
+            if rate is not None:
+                self.rate = rate
+            if playing is not None:
+                self.playing = playing
+
+
+class MprisListener:
+    """Follows the track and the position of a MPRIS player from its signals instead of polling."""
+    PATH = "/org/mpris/MediaPlayer2"
+    PLAYER_INTERFACE = "org.mpris.MediaPlayer2.Player"
+    TRACKLIST_INTERFACE = "org.mpris.MediaPlayer2.TrackList"
+    PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+
+    def __init__(self, player_name: str, address=None):
+        self.bus_name = "org.mpris.MediaPlayer2.%s" % player_name
+        self.address = address
+        self.owner = ""
+        self.title = ""
+        self.track_id = ""
+        self.upcoming = []
+        self.clock = PlaybackClock(playing=False)
+        self.track_changed = threading.Event()
+        self.callbacks = []
+        self.bus = None
+        self.loop = None
+
+    @property
+    def connected(self) -> bool:
+        return self.loop is not None and self.loop.is_running()
+
+    def start(self):
+        dbus.mainloop.glib.threads_init()
+        mainloop = dbus.mainloop.glib.DBusGMainLoop()
+        if self.address:
+            self.bus = dbus.bus.BusConnection(self.address, mainloop=mainloop)
+        else:
+            self.bus = dbus.bus.BusConnection(dbus.bus.BusConnection.TYPE_SESSION, mainloop=mainloop)
+        self.bus.add_signal_receiver(self.properties_changed, signal_name="PropertiesChanged",
+                                     dbus_interface=self.PROPERTIES_INTERFACE, bus_name=self.bus_name,
+                                     path=self.PATH)
+        self.bus.add_signal_receiver(self.seeked, signal_name="Seeked", dbus_interface=self.PLAYER_INTERFACE,
+                                     bus_name=self.bus_name, path=self.PATH)
+        for signal_name in ("TrackListReplaced", "TrackAdded", "TrackRemoved"):
+            self.bus.add_signal_receiver(self.load_tracks, signal_name=signal_name,
+                                         dbus_interface=self.TRACKLIST_INTERFACE, bus_name=self.bus_name,
+                                         path=self.PATH)
+        self.bus.watch_name_owner(self.bus_name, self.owner_changed)
+
+        self.loop = GLib.MainLoop()
+        threading.Thread(target=self.loop.run, name="mpris", daemon=True).start()
+
+    def stop(self):
+        if self.loop:
+            self.loop.quit()
+            self.loop = None
+        if self.bus:
+            self.bus.close()
+            self.bus = None
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def wait_for_change(self, timeout: float) -> bool:
+        changed = self.track_changed.wait(timeout)
+        self.track_changed.clear()
+        return changed
+
+    def set_title(self, title: str):
+        if title != self.title:
+            self.title = title
+            self.track_changed.set()
+            for callback in self.callbacks:
+                callback(title)
+
+    def owner_changed(self, owner: str):
+        self.owner = owner
+        if owner:
+            self.bus.call_async(owner, self.PATH, self.PROPERTIES_INTERFACE, "GetAll", "s",
+                                (self.PLAYER_INTERFACE,), self.properties_loaded, self.properties_failed)
+        else:
+            self.clock.update(position=0.0, playing=False)
+            self.upcoming = []
+            self.set_title("")
+
+    def load_position(self):
+        # The position isn't part of PropertiesChanged, so it is requested after a track change
+        self.bus.call_async(self.owner, self.PATH, self.PROPERTIES_INTERFACE, "Get", "ss",
+                            (self.PLAYER_INTERFACE, "Position"), self.seeked, self.properties_failed)
+
+    def load_tracks(self, *args):
+        # Only players which implement the optional TrackList interface share their queue
+        self.bus.call_async(self.owner, self.PATH, self.PROPERTIES_INTERFACE, "Get", "ss",
+                            (self.TRACKLIST_INTERFACE, "Tracks"), self.tracks_loaded, self.tracks_failed)
+
+    def tracks_loaded(self, tracks):
+        tracks = [str(track) for track in tracks]
+        if self.track_id not in tracks:
+            self.upcoming = []
+            return
+        following = tracks[tracks.index(self.track_id) + 1:][:s.Config.PREFETCH_TRACKS]
+        if not following:
+            self.upcoming = []
+            return
+        self.bus.call_async(self.owner, self.PATH, self.TRACKLIST_INTERFACE, "GetTracksMetadata", "ao",
+                            (following,), self.tracks_metadata_loaded, self.tracks_failed)
+
+    def tracks_metadata_loaded(self, tracks_metadata):
+        titles = (get_mpris_title(metadata) for metadata in tracks_metadata)
+        self.upcoming = [title for title in titles if title]
+
+    def tracks_failed(self, error):
+        self.upcoming = []
+
+    def properties_loaded(self, properties):
+        self.properties_changed(self.PLAYER_INTERFACE, properties, [])
+
+    def properties_failed(self, error):
+        print(error)
+
+    def properties_changed(self, interface, changed, invalidated):
+        if interface != self.PLAYER_INTERFACE:
+            return
+        if "PlaybackStatus" in changed:
+            self.clock.update(playing=changed["PlaybackStatus"] == "Playing")
+        if "Rate" in changed:
+            self.clock.update(rate=float(changed["Rate"]))
+        if "Position" in changed:
+            self.seeked(changed["Position"])
+        if "Metadata" in changed:
+            title = get_mpris_title(changed["Metadata"])
+            self.track_id = str(changed["Metadata"].get("mpris:trackid", ""))
+            self.load_tracks()
+            if "Position" not in changed:
+                if title != self.title:
+                    self.clock.update(position=0.0)
+                self.load_position()
+            self.set_title(title)
+
+    def seeked(self, position):
+        self.clock.update(position=int(position) / 1000000)
+
+
+mpris_listeners = {}
+
+
+def get_mpris_listener(service: StreamingService):
+    """Returns the running listener for the service or None if it can't be followed over MPRIS."""
+    if sys.platform != "linux" or GLib is None:
+        return None
+    player_name = service.get_linux_session_object_name()
+    if not player_name:
+        return None
+    listener = mpris_listeners.get(player_name)
+    if listener is None:
+        listener = MprisListener(player_name)
+        try:
+            listener.start()
+        except dbus.exceptions.DBusException as error:
+            print(error)
+        mpris_listeners[player_name] = listener
+    if listener.connected:
+        return listener
+    return None
+
+
+def wait_for_song_change(service: StreamingService, timeout: float):
+    """Sleeps for timeout seconds, but returns early if the player reported a new song."""
+    listener = get_mpris_listener(service)
+    if listener:
+        listener.wait_for_change(timeout)
+    else:
+        time.sleep(timeout)
+
+
 def get_window_title(service: StreamingService) -> str:
     window_name = ''
     if sys.platform == "win32":
@@ -362,6 +1426,8 @@ def get_window_title(service: StreamingService) -> str:
             window_name = r.out
         except Exception as error:
             print(error)
+    elif get_mpris_listener(service):
+        window_name = get_mpris_listener(service).title
     else:
         try:
             session = dbus.SessionBus()
@@ -383,8 +1449,6 @@ def get_window_title(service: StreamingService) -> str:
                             break
             except Exception as error:
                 print(error)
-    if "—" in window_name:
-        window_name = window_name.replace("—", "-")
     return window_name
 
 
@@ -437,7 +1501,7 @@ def main():
             if song_name not in service.get_not_playing_windows_title():
                 old_song_name = song_name
                 clear()
-        time.sleep(1)
+        wait_for_song_change(service, 1)
 
 
 if __name__ == '__main__':
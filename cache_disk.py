@@ -0,0 +1,35 @@
+"""
+Disk storage of the lyrics cache. Entries are pickled and compressed with zlib, which shrinks
+lyrics to about half or less, and the cache is bounded in size with an eviction policy.
+diskcache keeps the entries in SQLite, so the app and prefetch.py can share the same directory.
+"""
+import pickle
+import zlib
+
+from diskcache import Cache, Disk, UNKNOWN
+
+# Errors of single entries which are damaged, they are dropped instead of the cache. Others, like
+# classes which were moved, are bugs and are raised.
+CORRUPT_ERRORS = (zlib.error, pickle.UnpicklingError, EOFError)
+
+
+class CompressedDisk(Disk):
+    compress_level = 6
+
+    def store(self, value, read, key=UNKNOWN):
+        if not read:
+            value = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), self.compress_level)
+        return super().store(value, read, key=key)
+
+    def fetch(self, mode, filename, value, read):
+        data = super().fetch(mode, filename, value, read)
+        # Entries of caches written without compression come back unpickled already
+        if not read and isinstance(data, bytes):
+            data = pickle.loads(zlib.decompress(data))
+        return data
+
+
+def open_cache(directory: str, size_limit: int, eviction_policy: str, compress_level: int) -> Cache:
+    # The level isn't passed as a disk_ setting, diskcache would store it and hand it to every Disk opening the cache
+    disk = type(CompressedDisk.__name__, (CompressedDisk,), {"compress_level": compress_level})
+    return Cache(directory, size_limit=size_limit, eviction_policy=eviction_policy, disk=disk)
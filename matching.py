@@ -0,0 +1,75 @@
+"""
+Picks the search result of a lyrics provider which fits a song best, so only its page has to
+be fetched. Titles are normalized (accents, case, punctuation) and compared word by word, and
+versions the song doesn't ask for, like live or karaoke versions, are ranked lower.
+"""
+import difflib
+import re
+
+# Words of versions with other lyrics or none, unless the song itself is such a version
+VERSION_WORDS = {"live", "remix", "rmx", "mix", "karaoke", "instrumental", "acoustic", "unplugged", "cover",
+                 "demo", "nightcore", "sped", "slowed", "reverb", "medley", "mashup", "tribute"}
+VERSION_PENALTY = 0.3
+# For every other word in the title, so the exact title wins over longer ones
+EXTRA_WORD_PENALTY = 0.02
+# Words which are similar enough count in part, like "color" and "colour"
+SIMILAR_WORD_RATIO = 0.8
+# Results below are not the song
+MIN_SCORE = 0.75
+
+APOSTROPHES = re.compile(r"['`´’]")
+NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase ASCII words separated by single spaces."""
+    from unidecode import unidecode
+
+    text = unidecode(text).lower().replace("&", " and ")
+    text = APOSTROPHES.sub("", text)
+    return NON_WORD.sub(" ", text).strip()
+
+
+def get_words(text: str) -> list:
+    return normalize(text).split()
+
+
+def get_word_similarity(word: str, words: set) -> float:
+    if word in words:
+        return 1.0
+    ratio = max((difflib.SequenceMatcher(None, word, other).ratio() for other in words), default=0.0)
+    return ratio if ratio >= SIMILAR_WORD_RATIO else 0.0
+
+
+def get_coverage(words: list, title_words: set) -> float:
+    """How much of the words is in the title, 1 if there are none."""
+    if not words:
+        return 1.0
+    return sum(get_word_similarity(word, title_words) for word in words) / len(words)
+
+
+def score(song, title: str) -> float:
+    """How well the title of a search result fits the song, 1 for exactly its artist and name."""
+    name_words = get_words(song.name)
+    artist_words = get_words(song.artist)
+    title_words = set(get_words(title))
+    if not name_words or not title_words:
+        return 0.0
+
+    extra_words = title_words - set(name_words) - set(artist_words)
+    version_words = extra_words & VERSION_WORDS
+    return (0.6 * get_coverage(name_words, title_words) + 0.4 * get_coverage(artist_words, title_words)
+            - VERSION_PENALTY * len(version_words) - EXTRA_WORD_PENALTY * len(extra_words - version_words))
+
+
+def rank(song, candidates, get_title=str, min_score: float = MIN_SCORE) -> list:
+    """The candidates which fit the song, the best first. get_title returns the title of a candidate."""
+    scored = [(score(song, get_title(candidate)), i, candidate) for i, candidate in enumerate(candidates)]
+    return [candidate for candidate_score, _i, candidate in sorted(scored, key=lambda entry: (-entry[0], entry[1]))
+            if candidate_score >= min_score]
+
+
+def best(song, candidates, get_title=str, min_score: float = MIN_SCORE):
+    """The candidate which fits the song best, None if none fits."""
+    ranked = rank(song, candidates, get_title, min_score)
+    return ranked[0] if ranked else None
@@ -0,0 +1,81 @@
+"""
+Fetches the lyrics of many songs ahead of time into the cache, e.g. to warm a whole library overnight.
+
+    python prefetch.py songs.txt --workers 8 --host-concurrency 2 --host-rate 1 --save
+
+The songs file contains one "Artist - Title" per line. With --status it shows which lyrics
+services work and how fast they are instead.
+"""
+import argparse
+import os
+import sys
+
+import backend
+import providers
+import services
+
+
+def read_songs(songs_file) -> list:
+    songs = []
+    for line in songs_file:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            songs.append(backend.Song.get_from_string(line))
+    return songs
+
+
+def load_settings():
+    """Uses the lyrics directory and the providers of the settings of the app."""
+    settings = backend.SettingsStore(os.path.join(services.Config.SETTINGS_DIR, "settings.ini"))
+    loaded_config = settings.load()
+    services.Config.LYRICS_DIR = loaded_config.get(settings.section, "LyricsPath", fallback=services.Config.LYRICS_DIR)
+    services.Config.PROVIDERS = providers.parse_overrides(loaded_config.get(settings.section, "Providers", fallback=""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch the lyrics of the songs in a file into the cache.")
+    parser.add_argument("songs", type=argparse.FileType("r", encoding="UTF-8"), nargs="?",
+                        help='file with one "Artist - Title" per line, - for stdin')
+    parser.add_argument("--workers", type=int, default=services.Config.LOOKUP_WORKERS,
+                        help="songs fetched at the same time (default: %(default)s)")
+    parser.add_argument("--host-concurrency", type=int, default=2,
+                        help="requests to the same host at the same time (default: %(default)s)")
+    parser.add_argument("--host-rate", type=float, default=services.Config.HTTP_HOST_RATE,
+                        help="requests per second to the same host on average (default: %(default)s)")
+    parser.add_argument("--no-sync", dest="sync", action="store_false",
+                        help="don't prefer synced lyrics")
+    parser.add_argument("--save", action="store_true",
+                        help="also save the found lyrics to the lyrics directory")
+    parser.add_argument("--status", action="store_true",
+                        help="show the health and statistics of the lyrics services and exit")
+    args = parser.parse_args(argv)
+    # Before the services are loaded, which are only the providers switched on in the settings
+    load_settings()
+
+    if args.status:
+        print(services.STATS.format_status())
+        return 0
+    if args.songs is None:
+        parser.error("the songs file is required")
+
+    with args.songs:
+        songs = read_songs(args.songs)
+    services.Config.HTTP_HOST_CONCURRENCY = args.host_concurrency
+    services.Config.HTTP_HOST_RATE = args.host_rate
+
+    try:
+        counts = backend.prefetch_lyrics(songs, sync=args.sync, workers=args.workers, save=args.save)
+    except KeyboardInterrupt:
+        print("Interrupted, run again to continue")
+        return 1
+    finally:
+        backend.cache.close()
+        services.SESSIONS.close()
+        services.STATS.save()
+    print("Found: %d, not found: %d, skipped: %d, errors: %d" % (counts["found"], counts["not found"],
+                                                                 counts["skipped"], counts["error"]))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
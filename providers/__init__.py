@@ -0,0 +1,124 @@
+"""
+Registry of the lyrics providers. Every module of this package is a provider, more can be
+installed as packages with an entry point in the group "spotifylyrics.providers" which names
+the provider and its module.
+
+A provider module declares what it can do in a PROVIDER dict and defines its lookup function
+"_<name>" with services.lyrics_service. The keys of PROVIDER are:
+
+    synced      whether it has lyrics with timestamps, it is asked by synced lookups then
+    unsynced    whether it is asked by lookups without sync, by default if it isn't synced
+    hosts       the hosts it sends requests to
+    cost        seconds a lookup is expected to take, until its real latency was measured
+    order       position in the lists of services, the lowest first
+    pinned      stays in front when the services are ordered by their statistics
+    enabled     whether it is used if Config.PROVIDERS doesn't say otherwise
+    function    name of the lookup function, if it isn't "_<name>"
+
+The declarations are read from the source of the modules without importing them, so the
+modules of disabled providers are never imported.
+"""
+import ast
+import importlib
+import importlib.metadata
+import importlib.util
+import pkgutil
+import threading
+
+ENTRY_POINT_GROUP = "spotifylyrics.providers"
+
+
+class Provider:
+    def __init__(self, name: str, module: str, declaration: dict):
+        self.name = name
+        self.module = module
+        self.function = declaration.get("function", "_" + name)
+        self.synced = declaration.get("synced", False)
+        self.unsynced = declaration.get("unsynced", not self.synced)
+        self.hosts = tuple(declaration.get("hosts", ()))
+        self.cost = declaration.get("cost", 1.0)
+        self.order = declaration.get("order", 1000)
+        self.pinned = declaration.get("pinned", False)
+        self.enabled = declaration.get("enabled", True)
+
+    def load(self):
+        """Imports the module of the provider and returns its lookup function."""
+        service = getattr(importlib.import_module(self.module), self.function)
+        service.provider = self
+        return service
+
+    def __repr__(self):
+        return "Provider(%r)" % self.name
+
+
+modules = None
+declared = {}
+lock = threading.Lock()
+
+
+def get_entry_points() -> list:
+    entry_points = importlib.metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return list(entry_points.select(group=ENTRY_POINT_GROUP))
+    return list(entry_points.get(ENTRY_POINT_GROUP, []))
+
+
+def find_modules() -> dict:
+    """The module of every installed provider by its name, without importing them."""
+    global modules
+    with lock:
+        if modules is None:
+            modules = {info.name: "%s.%s" % (__name__, info.name) for info in pkgutil.iter_modules(__path__)}
+            for entry_point in get_entry_points():
+                modules.setdefault(entry_point.name, entry_point.value)
+        return modules
+
+
+def read_declaration(module: str) -> dict:
+    spec = importlib.util.find_spec(module)
+    source = spec.loader.get_source(module) if spec and spec.loader else None
+    if source is None:
+        # Frozen apps don't ship the sources, the module has to be imported then
+        return getattr(importlib.import_module(module), "PROVIDER", {})
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == "PROVIDER"
+                                                for target in node.targets):
+            return ast.literal_eval(node.value)
+    return {}
+
+
+def get_provider(name: str):
+    """The provider with the name, None if there is none."""
+    module = find_modules().get(name)
+    if module is None:
+        return None
+    with lock:
+        provider = declared.get(name)
+        if provider is None:
+            provider = Provider(name, module, read_declaration(module))
+            declared[name] = provider
+        return provider
+
+
+def get_enabled(overrides: dict) -> list:
+    """The enabled providers in their order, overrides switches providers on or off by name."""
+    enabled = []
+    for name in sorted(find_modules()):
+        if overrides.get(name) is False:
+            continue
+        provider = get_provider(name)
+        if overrides.get(name, provider.enabled):
+            enabled.append(provider)
+    return sorted(enabled, key=lambda provider: (provider.order, provider.name))
+
+
+def parse_overrides(text: str) -> dict:
+    """Reads overrides like "qq, -azapi", which switch on qq and switch off azapi."""
+    overrides = {}
+    for name in filter(None, (name.strip() for name in text.split(","))):
+        overrides[name.lstrip("-+").strip()] = not name.startswith("-")
+    return overrides
+
+
+def format_overrides(overrides: dict) -> str:
+    return ", ".join(name if enabled else "-" + name for name, enabled in sorted(overrides.items()))
@@ -0,0 +1,43 @@
+import requests
+
+import services
+
+PROVIDER = {
+    "hosts": ["duckduckgo.com", "www.google.com", "www.azlyrics.com"],
+    "cost": 8.0,
+    "order": 110,
+}
+
+
+@services.lyrics_service
+def _azapi(song):
+    from azapi import azapi
+
+    service = "Azapi"
+
+    api = azapi.AZlyrics('duckduckgo', accuracy=0.5, proxies=services.Config.PROXY)
+    api.get = lambda url, _proxies=None: services.SESSIONS.get(url)
+    api.head = lambda url, _proxies=None: services.SESSIONS.head(url)
+
+    if song.artist:
+        api.artist = song.artist
+        api.title = song.name
+
+        # Instead of the pauses of azapi, its hosts have slow rates in Config.HTTP_HOST_RATES
+        try:
+            songs = api.getSongs(sleep=0)
+        except requests.exceptions.RequestException:
+            api.search_engine = 'google'
+            songs = api.getSongs(sleep=0)
+
+        if song.name in songs:
+            result_song = songs[song.name]
+
+            song.album = result_song["album"]
+            if result_song["year"]:
+                song.year = int(result_song["year"])
+
+            lyrics = api.getLyrics(url=result_song["url"], sleep=0)
+
+            if isinstance(lyrics, str):
+                return lyrics, result_song["url"], service
@@ -0,0 +1,21 @@
+import services
+
+PROVIDER = {
+    "hosts": ["genius.com"],
+    "cost": 1.0,
+    "order": 90,
+}
+
+
+@services.lyrics_service
+def _genius(song):
+    service_name = "Genius"
+    url = "https://genius.com/%s-%s-lyrics" % (song.artist.replace(' ', '-'), song.name.replace(' ', '-'))
+    lyrics_page = services.SESSIONS.get(url)
+    lyrics_container = services.parse_html(lyrics_page.text, "div", {"class": "lyrics"}).find("div", {"class": "lyrics"})
+    if lyrics_container:
+        lyrics = lyrics_container.get_text()
+        # The title of the page names the artist, so the rest of the page doesn't have to be parsed
+        title = services.parse_html(lyrics_page.text, "title").text
+        if song.artist.lower().replace(" ", "") in title.lower().replace(" ", ""):
+            return lyrics, lyrics_page.url, service_name
@@ -0,0 +1,25 @@
+import os
+
+import services
+
+PROVIDER = {
+    "synced": True,
+    "unsynced": True,
+    "hosts": [],
+    "cost": 0.01,
+    "order": 0,
+    "pinned": True,
+}
+
+
+@services.lyrics_service(cached=False)
+def _local(song):
+    service_name = "Local"
+
+    file = services.LIBRARY.find(song.artist, song.name)
+    if file:
+        with open(file, "r", encoding="UTF-8") as lyrics_file:
+            lyrics = lyrics_file.read()
+        timed = os.path.splitext(file)[1].lower() == ".lrc"
+        url = f"file:///{os.path.abspath(file)}"
+        return lyrics, url, service_name, timed
@@ -0,0 +1,37 @@
+from urllib import parse
+
+import matching
+import services
+
+PROVIDER = {
+    "synced": True,
+    "hosts": ["www.lyricsify.com"],
+    "cost": 2.0,
+    "order": 40,
+}
+
+
+@services.lyrics_service
+def _lyricsify(song):
+    service_name = "Lyricsify"
+
+    search_url = "https://www.lyricsify.com/search?%s" % parse.urlencode({
+        "q": f"{song.artist} {song.name}"
+    })
+    search_results = services.SESSIONS.get(search_url)
+    soup = services.parse_html(search_results.text, "div", class_="sub")
+
+    result_container = soup.find("div", class_="sub")
+
+    if result_container:
+        result_links = [result.find("a") for result in result_container.find_all("div", class_="li")]
+        result_link = matching.best(song, result_links, lambda link: link.get_text())
+
+        if result_link:
+            url = f"https://www.lyricsify.com{result_link['href']}?download"
+            lyrics_page = services.SESSIONS.get(url)
+            soup = services.parse_html(lyrics_page.text, id="iframe_download")
+
+            download_link = soup.find(id="iframe_download")["src"]
+            lrc = services.SESSIONS.get(download_link, cookies=lyrics_page.cookies).text
+            return lrc, lyrics_page.url, service_name, True
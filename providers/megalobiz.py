@@ -0,0 +1,34 @@
+from urllib import parse
+
+import matching
+import services
+
+PROVIDER = {
+    "synced": True,
+    "hosts": ["www.megalobiz.com"],
+    "cost": 1.5,
+    "order": 20,
+}
+
+
+@services.lyrics_service
+def _megalobiz(song):
+    service_name = "Megalobiz"
+
+    search_url = "https://www.megalobiz.com/search/all?%s" % parse.urlencode({
+        "qry": f"{song.artist} {song.name}",
+        "display": "more"
+    })
+    search_results = services.SESSIONS.get(search_url)
+    soup = services.parse_html(search_results.text, id="list_entity_container")
+    result_links = soup.find(id="list_entity_container").find_all("a", class_="entity_name")
+
+    result_link = matching.best(song, result_links, lambda link: link.get_text())
+    if result_link:
+        url = f"https://www.megalobiz.com{result_link['href']}"
+        possible_text = services.SESSIONS.get(url)
+        soup = services.parse_html(possible_text.text, "div", class_="lyrics_details")
+
+        lrc = soup.find("div", class_="lyrics_details").span.get_text()
+
+        return lrc, possible_text.url, service_name, True
@@ -0,0 +1,37 @@
+import codecs
+import re
+
+import services
+
+PROVIDER = {
+    "hosts": ["www.musixmatch.com"],
+    "cost": 1.5,
+    "order": 60,
+}
+
+
+@services.lyrics_service
+def _musixmatch(song):
+    service_name = "Musixmatch"
+
+    search_url = "https://www.musixmatch.com/search/%s-%s" % (
+        song.artist.replace(' ', '-'), song.name.replace(' ', '-'))
+    header = {"User-Agent": "curl/7.9.8 (i686-pc-linux-gnu) libcurl 7.9.8 (OpenSSL 0.9.6b) (ipv6 enabled)"}
+    search_results = services.SESSIONS.get(search_url, headers=header)
+    props = services.find_script(search_results.text, "__mxmProps")
+    if props:
+        page = re.findall('"track_share_url":"([^"]*)', props)
+        if page:
+            url = codecs.decode(page[0], 'unicode-escape')
+            lyrics_page = services.SESSIONS.get(url, headers=header)
+            props = services.find_script(lyrics_page.text, "__mxmProps")
+            if props and '"body":"' in props:
+                lyrics = props.split('"body":"')[1].split('","language"')[0]
+                lyrics = lyrics.replace("\\n", "\n")
+                lyrics = lyrics.replace("\\", "")
+                album = services.parse_html(lyrics_page.text, class_="mxm-track-footer__album").find(
+                    class_="mxm-track-footer__album")
+                if album:
+                    song.album = album.find(class_="mui-cell__title").getText()
+                if lyrics.strip():
+                    return lyrics, lyrics_page.url, service_name
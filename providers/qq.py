@@ -0,0 +1,27 @@
+import services
+
+PROVIDER = {
+    "synced": True,
+    "hosts": ["c.y.qq.com"],
+    "cost": 1.5,
+    "order": 30,
+    # Needs the QQ crawler of spotify_lyric, which isn't in the requirements
+    "enabled": False,
+}
+
+
+@services.lyrics_service
+def _qq(song):
+    import spotify_lyric.crawlers.QQCrawler as QQCrawler
+    import spotify_lyric.model_traditional_conversion.langconv as langconv
+
+    qq = QQCrawler.QQCrawler()
+    sid = qq.getSongId(artist=song.artist, song=song.name)
+    url = qq.getLyticURI(sid)
+
+    lrc_string = ""
+    for line in services.SESSIONS.get(url).text.splitlines():
+        line_text = line.split(']')
+        lrc_string += "]".join(line_text[:-1]) + langconv.Converter('zh-hant').convert(line_text)
+
+    return lrc_string, url, qq.name, True
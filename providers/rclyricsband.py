@@ -0,0 +1,26 @@
+import matching
+import services
+
+PROVIDER = {
+    "synced": True,
+    "hosts": ["rclyricsband.com"],
+    "cost": 2.0,
+    "order": 50,
+}
+
+
+@services.lyrics_service
+def _rclyricsband(song):
+    service_name = "RC Lyrics Band"
+    search_results = services.SESSIONS.get("https://rclyricsband.com/", params={"s": "%s %s" % (song.artist, song.name)})
+    search_soup = services.parse_html(search_results.text, id="main")
+
+    title_links = [result.find(class_="elementor-post__title").find("a")
+                   for result in search_soup.find(id="main").find_all("article")]
+    title_link = matching.best(song, title_links, lambda link: link.get_text())
+    if title_link:
+        song_page = services.SESSIONS.get(title_link["href"])
+        song_page_soup = services.parse_html(song_page.text, "a")
+        lrc_download_button = song_page_soup.find(lambda tag: tag.name == "a" and "LRC Download" in tag.text)
+        lyrics = services.SESSIONS.get(lrc_download_button["href"]).text
+        return lyrics, song_page.url, service_name, True
@@ -0,0 +1,42 @@
+from urllib import parse
+
+import matching
+import services
+
+PROVIDER = {
+    "synced": True,
+    "hosts": ["www.rentanadviser.com"],
+    "cost": 2.0,
+    "order": 10,
+}
+
+
+@services.lyrics_service
+def _rentanadviser(song):
+    service_name = "RentAnAdviser"
+
+    search_url = "https://www.rentanadviser.com/en/subtitles/subtitles4songs.aspx?%s" % parse.urlencode({
+        "src": f"{song.artist} {song.name}"
+    })
+    search_results = services.SESSIONS.get(search_url)
+    soup = services.parse_html(search_results.text, id="tablecontainer")
+    result_links = soup.find(id="tablecontainer").find_all("a")
+
+    result_links = [link for link in result_links if link["href"] != "subtitles4songs.aspx"]
+    result_link = matching.best(song, result_links, lambda link: link.get_text())
+    if result_link:
+        url = f'https://www.rentanadviser.com/en/subtitles/{result_link["href"]}&type=lrc'
+        possible_text = services.SESSIONS.get(url)
+        soup = services.parse_html(possible_text.text, "input")
+
+        event_validation = soup.find(id="__EVENTVALIDATION")["value"]
+        view_state = soup.find(id="__VIEWSTATE")["value"]
+
+        lrc = services.SESSIONS.post(possible_text.url,
+                                     {"__EVENTTARGET": "ctl00$ContentPlaceHolder1$btnlyrics",
+                                      "__EVENTVALIDATION": event_validation,
+                                      "__VIEWSTATE": view_state},
+                                     headers={"referer": possible_text.url},
+                                     cookies=search_results.cookies)
+
+        return lrc.text, possible_text.url, service_name, True
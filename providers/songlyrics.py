@@ -0,0 +1,27 @@
+import services
+
+PROVIDER = {
+    "hosts": ["www.songlyrics.com"],
+    "cost": 1.0,
+    "order": 80,
+}
+
+
+@services.lyrics_service
+def _songlyrics(song):
+    service_name = "Songlyrics"
+    artistm = song.artist.replace(" ", "-")
+    songm = song.name.replace(" ", "-")
+    url = f"https://www.songlyrics.com/{artistm}/{songm}-lyrics"
+    lyrics_page = services.SESSIONS.get(url)
+    lyrics_container = services.parse_html(lyrics_page.text, id="songLyricsDiv").find(id="songLyricsDiv")
+    if lyrics_container:
+        lyrics = lyrics_container.get_text()
+        if "Sorry, we have no" not in lyrics and "We do not have" not in lyrics:
+            title = services.parse_html(lyrics_page.text, "div", class_="pagetitle").find("div", class_="pagetitle")
+            if title:
+                for info in title.find_all("p"):
+                    if "Album:" in info.get_text():
+                        song.album = info.find("a").get_text()
+                        break
+            return lyrics, lyrics_page.url, service_name
@@ -0,0 +1,33 @@
+import services
+
+PROVIDER = {
+    "hosts": ["songmeanings.com"],
+    "cost": 1.5,
+    "order": 70,
+}
+
+
+@services.lyrics_service
+def _songmeanings(song):
+    service_name = "Songmeanings"
+
+    search_url = "http://songmeanings.com/m/query/?q=%s %s" % (song.artist, song.name)
+    search_results = services.SESSIONS.get(search_url)
+    soup = services.parse_html(search_results.text, ["a", "ul"])
+    url = ""
+    for link in soup.find_all('a', href=True):
+        if "songmeanings.com/m/songs/view/" in link['href']:
+            url = f"https:{link['href']}"
+            break
+        elif "/m/songs/view/" in link['href']:
+            result = f"https://songmeanings.com{link['href']}"
+            lyrics_page = services.SESSIONS.get(result)
+            soup = services.parse_html(lyrics_page.text, "ul")
+            url = lyrics_page.url
+            break
+    lis = soup.find_all('ul', attrs={'data-inset': True})
+    if len(lis) > 1:
+        lyrics = lis[1].find_all('li')[1].getText()
+        # lyrics = lyrics.encode('cp437', errors='replace').decode('utf-8', errors='replace')
+        if "We are currently missing these lyrics." not in lyrics:
+            return lyrics, url, service_name
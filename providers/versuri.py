@@ -0,0 +1,28 @@
+import matching
+import services
+
+PROVIDER = {
+    "hosts": ["www.versuri.ro"],
+    "cost": 1.5,
+    "order": 100,
+}
+
+
+@services.lyrics_service
+def _versuri(song):
+    service_name = "Versuri"
+    search_url = "https://www.versuri.ro/q/%s+%s/" % \
+                 (song.artist.replace(" ", "+").lower(), song.name.replace(" ", "+").lower())
+    search_results = services.SESSIONS.get(search_url)
+    soup = services.parse_html(search_results.text, "a")
+    result_links = [link for link in soup.findAll('a') if "/versuri/" in link['href']]
+    result_link = matching.best(song, result_links, lambda link: link.getText())
+    if result_link:
+        url = "https://www.versuri.ro" + result_link['href']
+        lyrics_page = services.SESSIONS.get(url)
+        soup = services.parse_html(lyrics_page.text, "div", {"id": "pagecontent"})
+        content = soup.find_all('div', {'id': 'pagecontent'})[0]
+        lyrics = str(content)[str(content).find("</script><br/>") + 14:str(content).find("<br/><br/><center>")]
+        lyrics = lyrics.replace("<br/>", "")
+        if "nu există" not in lyrics:
+            return lyrics, lyrics_page.url, service_name
@@ -1,28 +1,38 @@
-import codecs
+import contextlib
+import email.utils
 import functools
+import importlib.util
 import json
 import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib import request, parse
 
 import pathvalidate
 import requests
-import unidecode  # to remove accents
-from azapi import azapi
-from bs4 import BeautifulSoup
-from sentry_sdk import capture_exception
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-try:
-    import spotify_lyric.crawlers.QQCrawler as QQCrawler
-    import spotify_lyric.model_traditional_conversion.langconv as langconv
-except ModuleNotFoundError:
-    pass
+import providers
 
-# With Sync.
-SERVICES_LIST1 = []
+# azapi, bs4, unidecode, sentry_sdk and the QQ crawler are imported when they are first used,
+# so loading this module doesn't slow down the start of the app
 
-# Without Sync.
-SERVICES_LIST2 = []
+# lxml is much faster than the parser of the standard library, but optional
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+# SERVICES_LIST1 with sync and SERVICES_LIST2 without are filled from the providers package
+# when they are first used, see load_services
+services_lock = threading.RLock()
+
+# Outcomes of a lookup
+HIT = "hit"
+MISS = "miss"
+ERROR = "error"
+# The service wasn't asked, because its circuit breaker is open
+SKIPPED = "skipped"
 
 
 class Config:
@@ -35,26 +45,690 @@ class Config:
     DEFAULT_LYRICS_DIR = os.path.join(SETTINGS_DIR, "lyrics")
     LYRICS_DIR = DEFAULT_LYRICS_DIR
 
+    # Query the lyrics services concurrently instead of one after another
+    PARALLEL_LOOKUPS = True
+    # Lyrics providers switched on or off by name, e.g. {"qq": True, "azapi": False}, the others keep their default
+    PROVIDERS = {}
+    LOOKUP_WORKERS = 6
+
+    # Connection pool per host, timeout as (connect, read) in seconds and retries of failed connections
+    HTTP_POOL_SIZE = 4
+    HTTP_TIMEOUT = (5, 15)
+    HTTP_RETRIES = 2
+    HTTP_BACKOFF = 0.5
+    # Maximum of concurrent requests to the same host, None for no limit
+    HTTP_HOST_CONCURRENCY = None
+    # Requests per second to the same host on average and in a burst, None for no limit, with rates for single hosts
+    HTTP_HOST_RATE = 2.0
+    HTTP_HOST_BURST = 4
+    # AZLyrics bans clients which are faster, azapi itself waits several seconds between its requests
+    HTTP_HOST_RATES = {"www.tanzmusik-online.de": 1.0, "tanzschule-woelbing.de": 1.0,
+                       "www.azlyrics.com": 0.2, "duckduckgo.com": 0.3, "www.google.com": 0.3}
+    HTTP_HOST_BURSTS = {"www.azlyrics.com": 1, "duckduckgo.com": 1, "www.google.com": 1}
+    # Pause of a host which answered 429 without Retry-After, doubled while it keeps doing so
+    HTTP_THROTTLE_BACKOFF = 5
+    # Longest wait for a throttled host, requests fail right away if it would take longer
+    HTTP_MAX_WAIT = 30
+
+    # Limits of the in-memory cache in front of the disk cache
+    MEMORY_CACHE_ITEMS = 256
+    MEMORY_CACHE_SIZE = 8 * 1024 * 1024
+    # Limit of the disk cache in bytes, which entries it evicts first when it is full and their zlib level
+    DISK_CACHE_SIZE = 64 * 1024 * 1024
+    DISK_CACHE_EVICTION = "least-recently-used"
+    DISK_CACHE_COMPRESS_LEVEL = 6
+    # Raw titles remembered with the cache key they stand for, so a title seen again isn't canonicalized again
+    SONG_KEY_ALIASES = 4096
+
+    # Seconds get_lyrics waits for the lyrics at most before it shows the best ones found so far
+    LYRICS_DEADLINE = 10
+    # Without parallel lookups the next service is asked too once a service takes longer than its p95
+    HEDGED_LOOKUPS = True
+    HEDGE_MAX_DELAY = 3
+
+    # Order the services by their expected lyrics found per second instead of the registration order
+    ADAPTIVE_ORDER = False
+    # How often the statistics of the services are written to disk at most, in seconds
+    STATS_SAVE_INTERVAL = 60
+    # Failed lookups in a row after which a service is skipped, and for how long at first and at most
+    BREAKER_THRESHOLD = 3
+    BREAKER_COOL_DOWN = 300
+    BREAKER_MAX_COOL_DOWN = 3600
+
+    # Info lookups of songs at once, pages fetched at once by an info service and how long indexes are kept
+    INFO_WORKERS = 2
+    INFO_PAGE_WORKERS = 4
+    INFO_INDEX_EXPIRE = 86400
+
+    # Seconds without changes after which the settings are written to disk
+    SETTINGS_SAVE_DELAY = 2
+
+    # Fetch the lyrics of the next songs in the background, with a limit of songs at once and bytes per second
+    PREFETCH_UPCOMING = True
+    PREFETCH_TRACKS = 2
+    PREFETCH_IN_FLIGHT = 1
+    PREFETCH_BANDWIDTH = 256 * 1024
+    # Song changes remembered to guess the next songs of players which don't share their queue
+    HISTORY_SIZE = 1000
+
 
 UA = "Mozilla/5.0 (Maemo; Linux armv7l; rv:10.0.1) Gecko/20100101 Firefox/10.0.1 Fennec/10.0.1"
 
 
-def lyrics_service(_func=None, *, synced=False, enabled=True):
+class BandwidthLimit:
+    """Spaces out downloads so on average they don't get more than rate bytes per second."""
+
+    def __init__(self, rate: int):
+        self.rate = rate
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    def consume(self, size: int):
+        with self.lock:
+            now = time.time()
+            self.next_time = max(self.next_time, now) + size / self.rate
+            delay = self.next_time - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Throttled(requests.exceptions.RequestException):
+    """The host asked for a pause which is longer than Config.HTTP_MAX_WAIT."""
+
+
+# Failed lookups which count against the circuit breaker, unlike pages that can't be parsed or invalid links on them
+NETWORK_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.HTTPError,
+                  requests.exceptions.ChunkedEncodingError, requests.exceptions.ContentDecodingError,
+                  requests.exceptions.TooManyRedirects, Throttled)
+
+
+def get_retry_after(response: requests.Response):
+    """Seconds until the request may be made again according to the Retry-After header, None without it."""
+    value = response.headers.get("Retry-After", "").strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class TokenBucket:
+    """Lets requests to a host through at rate per second with bursts of up to burst requests."""
+
+    def __init__(self, rate: float = None, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.strikes = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.paused_until - now
+            if delay > Config.HTTP_MAX_WAIT:
+                raise Throttled("Throttled for another %d s" % delay)
+            if self.rate:
+                self.tokens = min(self.tokens + (now - self.updated) * self.rate, self.burst) - 1
+                self.updated = now
+                delay = max(delay, -self.tokens / self.rate)
+        if delay > 0:
+            time.sleep(delay)
+
+    def throttle(self, retry_after: float = None):
+        """Pauses the host for retry_after seconds, or with an exponential backoff without it."""
+        with self.lock:
+            if retry_after is None:
+                retry_after = Config.HTTP_THROTTLE_BACKOFF * 2 ** self.strikes
+            self.strikes += 1
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+    def succeeded(self):
+        with self.lock:
+            self.strikes = 0
+
+
+class Sessions:
+    """One requests session per host, whose requests are rate limited."""
+
+    def __init__(self):
+        self.sessions = {}
+        self.semaphores = {}
+        self.buckets = {}
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def get_session(self, url: str) -> requests.Session:
+        host = parse.urlsplit(url).netloc
+        with self.lock:
+            session = self.sessions.get(host)
+            if session is None:
+                session = self.create_session()
+                self.sessions[host] = session
+            return session
+
+    @staticmethod
+    def create_session() -> requests.Session:
+        # 429 and 503 with Retry-After are left to request, which pauses the host with its bucket
+        retry = Retry(total=Config.HTTP_RETRIES, backoff_factor=Config.HTTP_BACKOFF,
+                      status_forcelist=(502, 504), respect_retry_after_header=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.HTTP_POOL_SIZE, max_retries=retry)
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.proxies.update(Config.PROXY)
+        session.headers["User-Agent"] = UA
+        return session
+
+    def get_semaphore(self, url: str):
+        if not Config.HTTP_HOST_CONCURRENCY:
+            return None
+        host = parse.urlsplit(url).netloc
+        with self.lock:
+            semaphore = self.semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(Config.HTTP_HOST_CONCURRENCY)
+                self.semaphores[host] = semaphore
+            return semaphore
+
+    def get_bucket(self, url: str) -> TokenBucket:
+        host = parse.urlsplit(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(Config.HTTP_HOST_RATES.get(host, Config.HTTP_HOST_RATE),
+                                     Config.HTTP_HOST_BURSTS.get(host, Config.HTTP_HOST_BURST))
+                self.buckets[host] = bucket
+            return bucket
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", Config.HTTP_TIMEOUT)
+        session = self.get_session(url)
+        semaphore = self.get_semaphore(url)
+        bucket = self.get_bucket(url)
+        limit = getattr(self.local, "bandwidth_limit", None)
+        for _ in range(Config.HTTP_RETRIES + 1):
+            bucket.acquire()
+            if limit:
+                limit.consume(0)
+            if semaphore is None:
+                response = session.request(method, url, **kwargs)
+            else:
+                with semaphore:
+                    response = session.request(method, url, **kwargs)
+            if limit:
+                limit.consume(len(response.content))
+            if response.status_code >= 500 or response.status_code == 429:
+                self.local.server_errors = self.get_server_errors() + 1
+            if response.status_code != 429 and not (response.status_code == 503 and "Retry-After" in response.headers):
+                bucket.succeeded()
+                return response
+            bucket.throttle(get_retry_after(response))
+        response.raise_for_status()
+        return response
+
+    def get_server_errors(self) -> int:
+        """How many responses the current thread got with a 5xx or 429 status."""
+        return getattr(self.local, "server_errors", 0)
+
+    @contextlib.contextmanager
+    def limit_bandwidth(self, limit: BandwidthLimit):
+        """Counts the requests of the current thread against the limit while in the with block."""
+        previous = getattr(self.local, "bandwidth_limit", None)
+        self.local.bandwidth_limit = limit
+        try:
+            yield
+        finally:
+            self.local.bandwidth_limit = previous
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        return self.request("HEAD", url, **kwargs)
+
+    def post(self, url: str, data=None, **kwargs) -> requests.Response:
+        return self.request("POST", url, data=data, **kwargs)
+
+    def close(self):
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions = {}
+            self.semaphores = {}
+            self.buckets = {}
+
+
+SESSIONS = Sessions()
+
+
+def capture_exception(error: Exception):
+    import sentry_sdk
+
+    sentry_sdk.capture_exception(error)
+
+
+def parse_html(markup, name=None, attrs=None, **kwargs):
+    """Parses a page with lxml if it is installed, with the arguments of find only the matching elements."""
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    if name is None and attrs is None and not kwargs:
+        return BeautifulSoup(markup, HTML_PARSER)
+    return BeautifulSoup(markup, HTML_PARSER, parse_only=SoupStrainer(name, attrs or {}, **kwargs))
+
+
+def find_script(markup: str, marker: str):
+    """Returns the content of the first script which contains the marker, without parsing the page."""
+    position = markup.find(marker)
+    while position != -1:
+        start = markup.rfind("<script", 0, position)
+        end = markup.find("</script>", position)
+        if start != -1 and end != -1:
+            start = markup.find(">", start) + 1
+            if 0 < start <= position and "</script>" not in markup[start:position]:
+                return markup[start:end]
+        position = markup.find(marker, position + len(marker))
+    return None
+
+
+class LocalLibrary:
+    """Index of the lyrics files in Config.LYRICS_DIR, listed again only when the directory changed."""
+    EXTENSIONS = (".txt", ".lrc")
+    LOOSE_PATTERNS = (
+        (re.compile(r"^\d+(?:\s*[.-]\s*|\s+)"), ""),
+        (re.compile(r"\s*(?:\(.*?\)|\[.*?\])"), ""),
+        (re.compile(r"\s+"), " "),
+    )
+    # Coarsest modification times of file systems in seconds (FAT), files written this close to a scan may be missed
+    MTIME_RESOLUTION = 2
+
+    def __init__(self, index_file: str):
+        self.index_file = index_file
+        self.directory = None
+        self.mtime = None
+        self.scanned = None
+        self.files = set()
+        self.index = {}
+        self.loose_index = {}
+        self.loaded = False
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def get_key(artist: str, name: str) -> str:
+        return "%s - %s" % (pathvalidate.sanitize_filename(artist), pathvalidate.sanitize_filename(name))
+
+    @classmethod
+    def get_loose_key(cls, key: str) -> str:
+        for pattern, replacement in cls.LOOSE_PATTERNS:
+            key = pattern.sub(replacement, key)
+        return key.strip()
+
+    def load(self):
+        self.loaded = True
+        try:
+            with open(self.index_file, "r", encoding="UTF-8") as index_file:
+                data = json.load(index_file)
+            self.directory = data["directory"]
+            self.mtime = data["mtime"]
+            self.scanned = data.get("scanned")
+            for file in data["files"]:
+                self.add_file(file)
+        except (OSError, ValueError, KeyError, TypeError):
+            self.directory = None
+            self.mtime = None
+            self.scanned = None
+            self.files = set()
+            self.index = {}
+            self.loose_index = {}
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+            with open(self.index_file, "w", encoding="UTF-8") as index_file:
+                json.dump({"directory": self.directory, "mtime": self.mtime, "scanned": self.scanned,
+                           "files": sorted(self.files)}, index_file)
+        except OSError as error:
+            print("Could not save lyrics index: %s" % error)
+
+    def add_file(self, file: str):
+        file_name, file_extension = os.path.splitext(file)
+        if file_extension.lower() in self.EXTENSIONS:
+            self.files.add(file)
+            self.index.setdefault(file_name.lower(), []).append(file)
+            self.loose_index.setdefault(self.get_loose_key(file_name.lower()), []).append(file)
+
+    def remove_file(self, file: str):
+        self.files.discard(file)
+        key = os.path.splitext(file)[0].lower()
+        for index, index_key in ((self.index, key), (self.loose_index, self.get_loose_key(key))):
+            files = index.get(index_key, [])
+            if file in files:
+                files.remove(file)
+            if not files:
+                index.pop(index_key, None)
+
+    def refresh(self):
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            directory = Config.LYRICS_DIR
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                mtime = None
+            if directory == self.directory and mtime == self.mtime and self.is_scanned_after(mtime):
+                return
+
+            if directory != self.directory:
+                self.files = set()
+                self.index = {}
+                self.loose_index = {}
+            files = set()
+            scanned = time.time()
+            if mtime is not None:
+                with os.scandir(directory) as entries:
+                    files = {entry.name for entry in entries if entry.is_file()}
+            for file in self.files - files:
+                self.remove_file(file)
+            for file in files - self.files:
+                self.add_file(file)
+            self.directory = directory
+            self.mtime = mtime
+            self.scanned = scanned
+            self.save()
+
+    def is_scanned_after(self, mtime: float) -> bool:
+        """Whether the last scan started after the change at mtime, so it listed every file up to then."""
+        return self.scanned is not None and (mtime is None or mtime < self.scanned - self.MTIME_RESOLUTION)
+
+    def add(self, path: str):
+        with self.lock:
+            self.refresh()
+            if os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.directory):
+                if os.path.basename(path) not in self.files:
+                    self.add_file(os.path.basename(path))
+                    self.save()
+
+    def find(self, artist: str, name: str) -> str:
+        """Returns the path of the lyrics file for the song, preferring synced lyrics."""
+        with self.lock:
+            self.refresh()
+            key = self.get_key(artist.lower(), name.lower())
+            files = self.index.get(key) or self.loose_index.get(self.get_loose_key(key))
+            if files:
+                file = sorted(files, key=lambda f: not f.lower().endswith(".lrc"))[0]
+                return os.path.join(self.directory, file)
+
+
+LIBRARY = LocalLibrary(os.path.join(Config.SETTINGS_DIR, "library.json"))
+
+
+class CircuitBreaker:
+    """Skips a service for a cool-down after Config.BREAKER_THRESHOLD failed lookups in a row."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, state: str = CLOSED, failures: int = 0, opened: float = 0.0, cool_down: float = 0.0):
+        self.state = state
+        self.failures = failures
+        self.opened = opened
+        self.cool_down = cool_down or Config.BREAKER_COOL_DOWN
+        self.probing = False
+
+    @classmethod
+    def from_dict(cls, values: dict):
+        breaker = cls(values.get("state", cls.CLOSED), values.get("failures", 0), values.get("opened", 0.0),
+                      values.get("cool_down", 0.0))
+        if breaker.state == cls.HALF_OPEN:
+            # The probe of the last run didn't finish
+            breaker.state = cls.OPEN
+        return breaker
+
+    def to_dict(self) -> dict:
+        return {"state": self.state, "failures": self.failures, "opened": self.opened, "cool_down": self.cool_down}
+
+    def get_remaining(self) -> float:
+        return max(self.opened + self.cool_down - time.time(), 0.0)
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and not self.get_remaining():
+            self.state = self.HALF_OPEN
+            self.probing = False
+        if self.state == self.HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+        return self.state == self.CLOSED
+
+    def record(self, status: str):
+        if status == ERROR:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                self.open(min(self.cool_down * 2, Config.BREAKER_MAX_COOL_DOWN))
+            elif self.state == self.CLOSED and self.failures >= Config.BREAKER_THRESHOLD:
+                self.open(Config.BREAKER_COOL_DOWN)
+        else:
+            self.state = self.CLOSED
+            self.failures = 0
+        self.probing = False
+
+    def open(self, cool_down: float):
+        self.state = self.OPEN
+        self.opened = time.time()
+        self.cool_down = cool_down
+
+
+class ServiceStats:
+    """Latency histogram and hit, miss and error counts of every lyrics service."""
+    # Upper bounds of the latency buckets in seconds, the last bucket is for everything slower
+    LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16)
+    # Assumed for services without measurements, so new services get tried
+    DEFAULT_LATENCY = 1.0
+
+    def __init__(self, stats_file: str):
+        self.stats_file = stats_file
+        self.services = {}
+        self.breakers = {}
+        self.loaded = False
+        self.saved = 0.0
+        self.dirty = False
+        self.lock = threading.RLock()
+
+    @classmethod
+    def create_entry(cls) -> dict:
+        return {HIT: 0, MISS: 0, ERROR: 0, "time": 0.0, "histogram": [0] * (len(cls.LATENCY_BUCKETS) + 1)}
+
+    def load(self):
+        self.loaded = True
+        try:
+            with open(self.stats_file, encoding="UTF-8") as stats_file:
+                services = json.load(stats_file)
+        except (OSError, ValueError):
+            return
+        for name, entry in services.items():
+            if len(entry.get("histogram", [])) == len(self.LATENCY_BUCKETS) + 1:
+                self.services[name] = entry
+                self.breakers[name] = CircuitBreaker.from_dict(entry.pop("breaker", {}))
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            services = {name: dict(entry, breaker=self.get_breaker(name).to_dict())
+                        for name, entry in self.services.items()}
+            try:
+                os.makedirs(os.path.dirname(self.stats_file), exist_ok=True)
+                with open(self.stats_file, "w", encoding="UTF-8") as stats_file:
+                    json.dump(services, stats_file)
+            except OSError as error:
+                print("Could not save service statistics: %s" % error)
+            self.dirty = False
+            self.saved = time.time()
+
+    def get_entry(self, name: str) -> dict:
+        if not self.loaded:
+            self.load()
+        return self.services.get(name) or self.create_entry()
+
+    def get_breaker(self, name: str) -> CircuitBreaker:
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            breaker = self.breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker()
+                self.breakers[name] = breaker
+            return breaker
+
+    def allow(self, name: str) -> bool:
+        """Whether the service should be asked or skipped because it failed too often."""
+        with self.lock:
+            return self.get_breaker(name).allow()
+
+    def record(self, name: str, status: str, duration: float):
+        with self.lock:
+            entry = self.get_entry(name)
+            self.services[name] = entry
+            self.get_breaker(name).record(status)
+            entry[status] += 1
+            entry["time"] += duration
+            bucket = next((i for i, bound in enumerate(self.LATENCY_BUCKETS) if duration <= bound),
+                          len(self.LATENCY_BUCKETS))
+            entry["histogram"][bucket] += 1
+            self.dirty = True
+            if time.time() - self.saved > Config.STATS_SAVE_INTERVAL:
+                self.save()
+
+    def get_count(self, name: str) -> int:
+        with self.lock:
+            entry = self.get_entry(name)
+            return entry[HIT] + entry[MISS] + entry[ERROR]
+
+    def get_hit_rate(self, name: str) -> float:
+        # Starts at 1/2 and moves towards the measured rate with every lookup
+        with self.lock:
+            return (self.get_entry(name)[HIT] + 1) / (self.get_count(name) + 2)
+
+    def get_mean_latency(self, name: str, default: float = None) -> float:
+        with self.lock:
+            count = self.get_count(name)
+            if not count:
+                return self.DEFAULT_LATENCY if default is None else default
+            return self.get_entry(name)["time"] / count
+
+    def get_percentile(self, name: str, percentile: float) -> float:
+        """Upper bound of the latency bucket which contains the percentile, inf if it is the slowest one."""
+        with self.lock:
+            count = self.get_count(name)
+            if not count:
+                return float("inf")
+            seen = 0
+            for bound, bucket_count in zip(self.LATENCY_BUCKETS + (float("inf"),), self.get_entry(name)["histogram"]):
+                seen += bucket_count
+                if seen >= percentile * count:
+                    return bound
+            return float("inf")
+
+    def get_score(self, name: str, default_latency: float = None) -> float:
+        """Expected lyrics found per second spent on the service."""
+        return self.get_hit_rate(name) / max(self.get_mean_latency(name, default_latency), 0.01)
+
+    def get_status(self) -> list:
+        """Health and statistics of every known service as rows of text for a table."""
+        rows = []
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            for name in sorted(set(self.services) | set(self.breakers)):
+                breaker = self.get_breaker(name)
+                state = breaker.state
+                if state == CircuitBreaker.OPEN:
+                    state = "%s (%d min left)" % (state, -(-breaker.get_remaining() // 60))
+                p95 = self.get_percentile(name, 0.95)
+                rows.append([name.strip("_"), state, str(self.get_count(name)),
+                             "%d%%" % round(self.get_entry(name)[HIT] * 100 / max(self.get_count(name), 1)),
+                             "%.2f s" % self.get_mean_latency(name),
+                             "> %d s" % self.LATENCY_BUCKETS[-1] if p95 == float("inf") else "%g s" % p95])
+        return rows
+
+    def format_status(self) -> str:
+        rows = [["Service", "State", "Lookups", "Found", "Mean", "p95"]] + self.get_status()
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows)
+
+
+# Saved at exit by the app and prefetch.py, which register it
+STATS = ServiceStats(os.path.join(Config.SETTINGS_DIR, "service_stats.json"))
+
+
+def load_services() -> tuple:
+    """Creates the service lists from the providers enabled in Config.PROVIDERS."""
+    global SERVICES_LIST1, SERVICES_LIST2
+    with services_lock:
+        if "SERVICES_LIST1" not in globals():
+            synced, unsynced = [], []
+            for provider in providers.get_enabled(Config.PROVIDERS):
+                service = provider.load()
+                if provider.synced:
+                    synced.append(service)
+                if provider.unsynced:
+                    unsynced.append(service)
+            SERVICES_LIST1, SERVICES_LIST2 = synced, unsynced
+        return SERVICES_LIST1, SERVICES_LIST2
+
+
+def __getattr__(name):
+    # The service lists and the lookup functions of the providers, like _genius, are loaded on first use
+    if name in ("SERVICES_LIST1", "SERVICES_LIST2"):
+        return load_services()[name == "SERVICES_LIST2"]
+    provider = providers.get_provider(name[1:]) if name.startswith("_") and not name.startswith("__") else None
+    if provider is None or provider.function != name:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    return provider.load()
+
+
+def order_services():
+    """Sorts both service lists by their score, the best first, pinned providers stay in front."""
+    for services in load_services():
+        services[:] = sorted(services, key=lambda service: (
+            not (service.provider and service.provider.pinned),
+            -STATS.get_score(service.__name__, service.provider.cost if service.provider else None)))
+
+
+def lyrics_service(_func=None, *, cached=True):
     def _decorator_lyrics_service(func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
+        def lookup(*args, **kwargs):
+            """Returns the status of the lookup (HIT, MISS, ERROR or SKIPPED) and the result of the service."""
+            if not STATS.allow(func.__name__):
+                return SKIPPED, None
+            start = time.perf_counter()
+            server_errors = SESSIONS.get_server_errors()
+            status, result = ERROR, None
             try:
-                return func(*args, **kwargs)
-            except requests.exceptions.RequestException as error:
+                result = func(*args, **kwargs)
+                status = HIT if result else MISS
+            except NETWORK_ERRORS as error:
                 print("%s: %s" % (func.__name__, error))
             except Exception as e:
+                # Parsing an error page of the site fails, any other page which can't be parsed has no lyrics
+                if SESSIONS.get_server_errors() == server_errors:
+                    status = MISS
                 capture_exception(e)
+            STATS.record(func.__name__, status, time.perf_counter() - start)
+            return status, result
 
-        if enabled:
-            if synced:
-                SERVICES_LIST1.append(wrapper)
-            else:
-                SERVICES_LIST2.append(wrapper)
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return lookup(*args, **kwargs)[1]
+
+        wrapper.lookup = lookup
+        wrapper.cached = cached
+        # Set when the service is loaded from the providers package
+        wrapper.provider = None
         return wrapper
 
     if _func is None:
@@ -63,294 +737,11 @@ def lyrics_service(_func=None, *, synced=False, enabled=True):
         return _decorator_lyrics_service(_func)
 
 
-@lyrics_service(synced=True)
-def _local(song):
-    service_name = "Local"
-
-    if os.path.isdir(Config.LYRICS_DIR):
-        path_song_name = pathvalidate.sanitize_filename(song.name.lower())
-        path_artist_name = pathvalidate.sanitize_filename(song.artist.lower())
-        for file in os.listdir(Config.LYRICS_DIR):
-            file = os.path.join(Config.LYRICS_DIR, file)
-            if os.path.isfile(file):
-                file_parts = os.path.splitext(file)
-                file_extension = file_parts[1].lower()
-                if file_extension in (".txt", ".lrc"):
-                    file_name = file_parts[0].lower()
-                    if path_song_name in file_name and path_artist_name in file_name:
-                        with open(file, "r", encoding="UTF-8") as lyrics_file:
-                            lyrics = lyrics_file.read()
-                        timed = file_extension == ".lrc"
-                        url = f"file:///{os.path.abspath(file)}"
-                        return lyrics, url, service_name, timed
-
-
-@lyrics_service(synced=True)
-def _rentanadviser(song):
-    service_name = "RentAnAdviser"
-
-    search_url = "https://www.rentanadviser.com/en/subtitles/subtitles4songs.aspx?%s" % parse.urlencode({
-        "src": f"{song.artist} {song.name}"
-    })
-    search_results = requests.get(search_url, proxies=Config.PROXY, headers={"User-Agent": UA})
-    soup = BeautifulSoup(search_results.text, 'html.parser')
-    result_links = soup.find(id="tablecontainer").find_all("a")
-
-    for result_link in result_links:
-        if result_link["href"] != "subtitles4songs.aspx":
-            lower_title = result_link.get_text().lower()
-            if song.artist.lower() in lower_title and song.name.lower() in lower_title:
-                url = f'https://www.rentanadviser.com/en/subtitles/{result_link["href"]}&type=lrc'
-                possible_text = requests.get(url, proxies=Config.PROXY, headers={"User-Agent": UA})
-                soup = BeautifulSoup(possible_text.text, 'html.parser')
-
-                event_validation = soup.find(id="__EVENTVALIDATION")["value"]
-                view_state = soup.find(id="__VIEWSTATE")["value"]
-
-                lrc = requests.post(possible_text.url,
-                                    {"__EVENTTARGET": "ctl00$ContentPlaceHolder1$btnlyrics",
-                                     "__EVENTVALIDATION": event_validation,
-                                     "__VIEWSTATE": view_state},
-                                    headers={"User-Agent": UA, "referer": possible_text.url},
-                                    proxies=Config.PROXY,
-                                    cookies=search_results.cookies)
-
-                return lrc.text, possible_text.url, service_name, True
-
-
-@lyrics_service(synced=True)
-def _megalobiz(song):
-    service_name = "Megalobiz"
-
-    search_url = "https://www.megalobiz.com/search/all?%s" % parse.urlencode({
-        "qry": f"{song.artist} {song.name}",
-        "display": "more"
-    })
-    search_results = requests.get(search_url, proxies=Config.PROXY)
-    soup = BeautifulSoup(search_results.text, 'html.parser')
-    result_links = soup.find(id="list_entity_container").find_all("a", class_="entity_name")
-
-    for result_link in result_links:
-        lower_title = result_link.get_text().lower()
-        if song.artist.lower() in lower_title and song.name.lower() in lower_title:
-            url = f"https://www.megalobiz.com{result_link['href']}"
-            possible_text = requests.get(url, proxies=Config.PROXY)
-            soup = BeautifulSoup(possible_text.text, 'html.parser')
-
-            lrc = soup.find("div", class_="lyrics_details").span.get_text()
-
-            return lrc, possible_text.url, service_name, True
-
-
-@lyrics_service(synced=True, enabled=False)
-def _qq(song):
-    qq = QQCrawler.QQCrawler()
-    sid = qq.getSongId(artist=song.artist, song=song.name)
-    url = qq.getLyticURI(sid)
-
-    lrc_string = ""
-    for line in requests.get(url, proxies=Config.PROXY).text.splitlines():
-        line_text = line.split(']')
-        lrc_string += "]".join(line_text[:-1]) + langconv.Converter('zh-hant').convert(line_text)
-
-    return lrc_string, url, qq.name, True
-
-
-@lyrics_service(synced=True)
-def _lyricsify(song):
-    service_name = "Lyricsify"
-
-    search_url = "https://www.lyricsify.com/search?%s" % parse.urlencode({
-        "q": f"{song.artist} {song.name}"
-    })
-    search_results = requests.get(search_url, proxies=Config.PROXY, headers={"User-Agent": UA})
-    soup = BeautifulSoup(search_results.text, 'html.parser')
-
-    result_container = soup.find("div", class_="sub")
-
-    if result_container:
-        result_list = result_container.find_all("div", class_="li")
-
-        if result_list:
-            for result in result_list:
-                result_link = result.find("a")
-                name = result_link.get_text().lower()
-                if song.artist.lower() in name and song.name.lower() in name:
-                    url = f"https://www.lyricsify.com{result_link['href']}?download"
-                    lyrics_page = requests.get(url, proxies=Config.PROXY, headers={"User-Agent": UA})
-                    soup = BeautifulSoup(lyrics_page.text, 'html.parser')
-
-                    download_link = soup.find(id="iframe_download")["src"]
-                    lrc = requests.get(download_link, proxies=Config.PROXY,
-                                       cookies=lyrics_page.cookies, headers={"User-Agent": UA}).text
-                    return lrc, lyrics_page.url, service_name, True
-
-
-@lyrics_service(synced=True)
-def _rclyricsband(song):
-    service_name = "RC Lyrics Band"
-    search_results = requests.get("https://rclyricsband.com/", params={"s": "%s %s" % (song.artist, song.name)},
-                                  proxies=Config.PROXY)
-    search_soup = BeautifulSoup(search_results.text, 'html.parser')
-
-    for result in search_soup.find(id="main").find_all("article"):
-        title_link = result.find(class_="elementor-post__title").find("a")
-        lower_title = title_link.get_text().lower()
-        if song.artist.lower() in lower_title and song.name.lower() in lower_title:
-            song_page = requests.get(title_link["href"])
-            song_page_soup = BeautifulSoup(song_page.text, 'html.parser')
-            lrc_download_button = song_page_soup.find(lambda tag: tag.name == "a" and "LRC Download" in tag.text)
-            lyrics = requests.get(lrc_download_button["href"]).text
-            return lyrics, song_page.url, service_name, True
-
-
-@lyrics_service
-def _musixmatch(song):
-    service_name = "Musixmatch"
-
-    def extract_mxm_props(soup_page):
-        scripts = soup_page.find_all("script")
-        for script in scripts:
-            if script and script.contents and "__mxmProps" in script.contents[0]:
-                return script.contents[0]
-
-    search_url = "https://www.musixmatch.com/search/%s-%s" % (
-        song.artist.replace(' ', '-'), song.name.replace(' ', '-'))
-    header = {"User-Agent": "curl/7.9.8 (i686-pc-linux-gnu) libcurl 7.9.8 (OpenSSL 0.9.6b) (ipv6 enabled)"}
-    search_results = requests.get(search_url, headers=header, proxies=Config.PROXY)
-    soup = BeautifulSoup(search_results.text, 'html.parser')
-    props = extract_mxm_props(soup)
-    if props:
-        page = re.findall('"track_share_url":"([^"]*)', props)
-        if page:
-            url = codecs.decode(page[0], 'unicode-escape')
-            lyrics_page = requests.get(url, headers=header, proxies=Config.PROXY)
-            soup = BeautifulSoup(lyrics_page.text, 'html.parser')
-            props = extract_mxm_props(soup)
-            if '"body":"' in props:
-                lyrics = props.split('"body":"')[1].split('","language"')[0]
-                lyrics = lyrics.replace("\\n", "\n")
-                lyrics = lyrics.replace("\\", "")
-                album = soup.find(class_="mxm-track-footer__album")
-                if album:
-                    song.album = album.find(class_="mui-cell__title").getText()
-                if lyrics.strip():
-                    return lyrics, lyrics_page.url, service_name
-
-
-@lyrics_service
-def _songmeanings(song):
-    service_name = "Songmeanings"
-
-    search_url = "http://songmeanings.com/m/query/?q=%s %s" % (song.artist, song.name)
-    search_results = requests.get(search_url, proxies=Config.PROXY)
-    soup = BeautifulSoup(search_results.text, 'html.parser')
-    url = ""
-    for link in soup.find_all('a', href=True):
-        if "songmeanings.com/m/songs/view/" in link['href']:
-            url = f"https:{link['href']}"
-            break
-        elif "/m/songs/view/" in link['href']:
-            result = f"https://songmeanings.com{link['href']}"
-            lyrics_page = requests.get(result, proxies=Config.PROXY)
-            soup = BeautifulSoup(lyrics_page.text, 'html.parser')
-            url = lyrics_page.url
-            break
-    lis = soup.find_all('ul', attrs={'data-inset': True})
-    if len(lis) > 1:
-        lyrics = lis[1].find_all('li')[1].getText()
-        # lyrics = lyrics.encode('cp437', errors='replace').decode('utf-8', errors='replace')
-        if "We are currently missing these lyrics." not in lyrics:
-            return lyrics, url, service_name
-
-
-@lyrics_service
-def _songlyrics(song):
-    service_name = "Songlyrics"
-    artistm = song.artist.replace(" ", "-")
-    songm = song.name.replace(" ", "-")
-    url = f"https://www.songlyrics.com/{artistm}/{songm}-lyrics"
-    lyrics_page = requests.get(url, proxies=Config.PROXY)
-    soup = BeautifulSoup(lyrics_page.text, 'html.parser')
-    lyrics_container = soup.find(id="songLyricsDiv")
-    if lyrics_container:
-        lyrics = lyrics_container.get_text()
-        if "Sorry, we have no" not in lyrics and "We do not have" not in lyrics:
-            title = soup.find("div", class_="pagetitle")
-            if title:
-                for info in title.find_all("p"):
-                    if "Album:" in info.get_text():
-                        song.album = info.find("a").get_text()
-                        break
-            return lyrics, lyrics_page.url, service_name
-
-
-@lyrics_service
-def _genius(song):
-    service_name = "Genius"
-    url = "https://genius.com/%s-%s-lyrics" % (song.artist.replace(' ', '-'), song.name.replace(' ', '-'))
-    lyrics_page = requests.get(url, proxies=Config.PROXY)
-    soup = BeautifulSoup(lyrics_page.text, 'html.parser')
-    lyrics_container = soup.find("div", {"class": "lyrics"})
-    if lyrics_container:
-        lyrics = lyrics_container.get_text()
-        if song.artist.lower().replace(" ", "") in soup.text.lower().replace(" ", ""):
-            return lyrics, lyrics_page.url, service_name
-
-
-@lyrics_service
-def _versuri(song):
-    service_name = "Versuri"
-    search_url = "https://www.versuri.ro/q/%s+%s/" % \
-                 (song.artist.replace(" ", "+").lower(), song.name.replace(" ", "+").lower())
-    search_results = requests.get(search_url, proxies=Config.PROXY)
-    soup = BeautifulSoup(search_results.text, 'html.parser')
-    for search_results in soup.findAll('a'):
-        if "/versuri/" in search_results['href']:
-            link_text = search_results.getText().lower()
-            if song.artist.lower() in link_text and song.name.lower() in link_text:
-                url = "https://www.versuri.ro" + search_results['href']
-                lyrics_page = requests.get(url, proxies=Config.PROXY)
-                soup = BeautifulSoup(lyrics_page.text, 'html.parser')
-                content = soup.find_all('div', {'id': 'pagecontent'})[0]
-                lyrics = str(content)[str(content).find("</script><br/>") + 14:str(content).find("<br/><br/><center>")]
-                lyrics = lyrics.replace("<br/>", "")
-                if "nu există" not in lyrics:
-                    return lyrics, lyrics_page.url, service_name
-
-
-@lyrics_service
-def _azapi(song):
-    service = "Azapi"
-
-    api = azapi.AZlyrics('duckduckgo', accuracy=0.5, proxies=Config.PROXY)
-
-    if song.artist:
-        api.artist = song.artist
-        api.title = song.name
-
-        try:
-            songs = api.getSongs()
-        except requests.exceptions.RequestException:
-            api.search_engine = 'google'
-            songs = api.getSongs()
-
-        if song.name in songs:
-            result_song = songs[song.name]
-
-            song.album = result_song["album"]
-            if result_song["year"]:
-                song.year = int(result_song["year"])
-
-            lyrics = api.getLyrics(url=result_song["url"])
-
-            if isinstance(lyrics, str):
-                return lyrics, result_song["url"], service
-
-
 # tab/chord services
 
 def _ultimateguitar(song):
+    import unidecode  # to remove accents
+
     artist = unidecode.unidecode(song.artist)
     title = unidecode.unidecode(song.name)
     url_pt1 = 'https://www.ultimate-guitar.com/search.php?view_state=advanced&band_name='
@@ -359,10 +750,10 @@ def _ultimateguitar(song):
     # song = song.replace('-', '+')
     # artist = artist.replace('-', '+')
     url = url_pt1 + artist + url_pt2 + title + url_pt3
-    page = requests.get(url)
+    page = SESSIONS.get(url)
 
     if page.status_code == 200:
-        soup = BeautifulSoup(page.content, 'html.parser')
+        soup = parse_html(page.content, "div", {"class": "js-store"})
 
         search_results_element = soup.find_all('div', {'class': 'js-store'})[0]
         search_results_data = json.loads(search_results_element["data-content"])
@@ -378,12 +769,14 @@ def _ultimateguitar(song):
 
 
 def _cifraclub(song):
+    import unidecode  # to remove accents
+
     artist = unidecode.unidecode(song.artist)
     title = unidecode.unidecode(song.name)
     url = 'https://www.cifraclub.com.br/{}/{}'.format(artist.replace(" ", "-").lower(), title.replace(" ", "-").lower())
 
     try:
-        result = requests.get(url, proxies=Config.PROXY)
+        result = SESSIONS.get(url)
     except requests.exceptions.RequestException as error:
         print(f"cifraclub: {error}")
         return []
@@ -397,49 +790,81 @@ def _cifraclub(song):
 # don't even get to this point, but it's an option for source
 # just got to change services_list3 list order
 def _songsterr(song):
+    import unidecode  # to remove accents
+
     artist = unidecode.unidecode(song.artist)
     title = unidecode.unidecode(song.name)
     url = 'https://www.songsterr.com/a/wa/bestMatchForQueryString?s={}&a={}'.format(title, artist)
     return [url]
 
 
-def _tanzmusikonline(song):
+# info services, which complete the album, year, genre, tempo and dances of a song
+
+page_executor = None
+woelbing_interpreters = None
+woelbing_lock = threading.Lock()
+
+
+def get_page_executor() -> ThreadPoolExecutor:
+    global page_executor
+    if page_executor is None:
+        page_executor = ThreadPoolExecutor(max_workers=Config.INFO_PAGE_WORKERS, thread_name_prefix="page")
+    return page_executor
+
+
+def map_pages(function, items, cancel: threading.Event = None) -> list:
+    """Calls the function for all items at once, calls which didn't start before cancel is set return None."""
+
+    def call(item):
+        if cancel is not None and cancel.is_set():
+            return None
+        return function(item)
+
+    return list(get_page_executor().map(call, items))
+
+
+def _tanzmusikonline(song, cancel: threading.Event = None) -> bool:
+    base_result_url = 'https://www.tanzmusik-online.de/search/result'
+
     try:
-        token_request = requests.get('https://www.tanzmusik-online.de/search', timeout=30)
-        search = BeautifulSoup(token_request.content, 'html.parser').find(id="page-wrapper")
+        token_request = SESSIONS.get('https://www.tanzmusik-online.de/search', timeout=30)
+        search = parse_html(token_request.content, id="page-wrapper").find(id="page-wrapper")
         if search:
             token = ""
             for input_field in search.find("form").find_all("input"):
                 if input_field.get("name") == "_token":
                     token = input_field.get("value")
                     break
-            page = 1
-            highest_page = 2
-            song_urls = []
-            base_result_url = 'https://www.tanzmusik-online.de/search/result'
-            while page < highest_page:
-                search_results = requests.post(base_result_url + "?page=" + str(page), proxies=Config.PROXY,
+
+            def search_page(page: int):
+                search_results = SESSIONS.post(base_result_url + "?page=" + str(page),
                                                cookies=token_request.cookies,
                                                data={"artist": song.artist, "song": song.name, "_token": token,
                                                      "searchMode": "extended", "genre": 0, "submit": "Suchen"},
                                                timeout=30)
-                search_soup = BeautifulSoup(search_results.content, 'html.parser')
+                return parse_html(search_results.content, class_=["song", "pagination"])
+
+            # The first page tells how many there are, the others are fetched at once
+            search_soups = [search_page(1)]
+            highest_page = 2
+            pagination = search_soups[0].find(class_="pagination")
+            if pagination:
+                for page_number_element in pagination.find_all("a"):
+                    page_number = page_number_element.getText()
+                    if page_number.isdigit():
+                        highest_page = int(page_number) + 1
+            search_soups.extend(map_pages(search_page, range(2, highest_page), cancel))
+
+            song_urls = []
+            for search_soup in filter(None, search_soups):
                 for song_result in search_soup.find_all(class_="song"):
                     song_urls.append(song_result.find(class_="songTitle").a.get("href"))
-                if page == 1:
-                    pagination = search_soup.find(class_="pagination")
-                    if pagination:
-                        for page_number_element in pagination.find_all("a"):
-                            page_number = page_number_element.getText()
-                            if page_number.isdigit():
-                                highest_page = int(page_number) + 1
-                page += 1
 
-            language = requests.get("https://www.tanzmusik-online.de/locale/en", proxies=Config.PROXY, timeout=30)
-            for song_url in song_urls:
-                page = requests.get(song_url, proxies=Config.PROXY, cookies=language.cookies, timeout=30)
-
-                soup = BeautifulSoup(page.content, 'html.parser')
+            language = SESSIONS.get("https://www.tanzmusik-online.de/locale/en", timeout=30)
+            pages = map_pages(lambda song_url: SESSIONS.get(song_url, cookies=language.cookies, timeout=30).content,
+                              song_urls, cancel)
+            for page in filter(None, pages):
+                soup = parse_html(page, class_=["dances", "songDetails"])
 
                 for dance in soup.find(class_="dances").find_all("div"):
                     dance_name = dance.a.getText().strip().replace("Disco Fox", "Discofox")
@@ -462,24 +887,35 @@ def _tanzmusikonline(song):
                             song.cycles_per_minute = int(text)
                         elif "fa-tachometer" in classes:
                             song.beats_per_minute = int(text)
+        return True
     except requests.exceptions.RequestException as error:
         print("%s: %s" % ("Tanzmusik Online", error))
     except Exception as e:
         capture_exception(e)
+    return False
+
+
+def get_woelbing_interpreters() -> list:
+    """The names and links of all interpreters on tanzschule-woelbing.de, downloaded once a day."""
+    global woelbing_interpreters
+    with woelbing_lock:
+        if woelbing_interpreters is None or time.time() - woelbing_interpreters[0] > Config.INFO_INDEX_EXPIRE:
+            interpreter_request = SESSIONS.get("https://tanzschule-woelbing.de/charts/interpreten/")
+            interpreter_soup = parse_html(interpreter_request.content, "a", class_="btn-dfeault")
+            interpreters = [(interpreter.getText(), interpreter.get("href"))
+                            for interpreter in interpreter_soup.find_all("a", class_="btn-dfeault")
+                            if "/charts/interpreten/?artist-hash=" in interpreter.get("href", "")]
+            woelbing_interpreters = time.time(), interpreters
+        return woelbing_interpreters[1]
 
 
-def _welchertanz(song):
+def _welchertanz(song, cancel: threading.Event = None) -> bool:
     try:
-        interpreter_request = requests.get("https://tanzschule-woelbing.de/charts/interpreten/", proxies=Config.PROXY)
-        interpreter_soup = BeautifulSoup(interpreter_request.content, 'html.parser')
-        interpreter_links = []
-        for interpreter in interpreter_soup.find_all("a", class_="btn-dfeault"):
-            if "/charts/interpreten/?artist-hash=" in interpreter.get("href") \
-                    and song.artist.lower() in interpreter.getText().lower():
-                interpreter_links.append(interpreter.get("href"))
-        for interpreter_link in interpreter_links:
-            interpreter_songs = requests.get("https://tanzschule-woelbing.de" + interpreter_link, proxies=Config.PROXY)
-            interpreter_songs_soup = BeautifulSoup(interpreter_songs.content, 'html.parser')
+        interpreter_links = [link for name, link in get_woelbing_interpreters() if song.artist.lower() in name.lower()]
+        pages = map_pages(lambda link: SESSIONS.get("https://tanzschule-woelbing.de" + link).content,
+                          interpreter_links, cancel)
+        for page in filter(None, pages):
+            interpreter_songs_soup = parse_html(page, "table", class_="table")
             for interpreter_song in interpreter_songs_soup.find("table", class_="table").find_all("tr"):
                 infos = interpreter_song.find_all("td")
                 if infos and song.name.lower() in infos[1].getText().strip().lower():
@@ -492,7 +928,9 @@ def _welchertanz(song):
                             .replace("Foxtrott", "Foxtrot")
                         if dance_name != "---" and dance_name not in song.dances:
                             song.dances.append(dance_name)
+        return True
     except requests.exceptions.RequestException as error:
         print("%s: %s" % ("Tanzschule Woelbing", error))
     except Exception as e:
         capture_exception(e)
+    return False
@@ -0,0 +1,224 @@
+"""
+Benchmarks of the lyrics lookup which run without network access. The lyrics services are
+timed against a stand-in server which plays back recorded responses with an injected latency.
+The committed recordings are synthetic pages from recordings_gen.py, --record replaces them.
+
+    python benchmark.py --record              record the responses of all services once
+    python benchmark.py --latency 0.05        run all benchmarks with 50 ms per response
+    python benchmark.py services render       run only some of the benchmarks
+    python benchmark.py imports               only profile how long the imports at startup take
+"""
+import argparse
+import glob
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import backend
+import replay
+import services
+
+SONGS = [
+    ("Queen", "We Will Rock You"),
+    ("Michael Jackson", "Thriller"),
+]
+
+
+def get_services() -> list:
+    return [service for service in services.SERVICES_LIST1 + services.SERVICES_LIST2 if service.cached]
+
+
+def get_songs() -> list:
+    # A new song every time, so no lookups of an earlier run are reused
+    return [backend.Song(artist, name) for artist, name in SONGS]
+
+
+def measure(func, repeat: int, before=None) -> list:
+    times = []
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def report(name: str, times: list, unit: str = "ms"):
+    factor = {"ms": 1000, "us": 1000000}[unit]
+    print("  %-40s median %9.2f %s   min %9.2f %s" % (name, statistics.median(times) * factor, unit,
+                                                       min(times) * factor, unit))
+
+
+def record():
+    for service in get_services():
+        for song in get_songs():
+            with replay.record(replay.get_recording_path(service, song)) as recording:
+                service(song)
+            print("Recorded %d responses of %s for %s - %s" % (len(recording.exchanges), service.__name__,
+                                                                song.artist, song.name))
+
+
+def benchmark_services(server: replay.StandInServer, repeat: int):
+    print("Services (latency %.0f ms per response)" % (server.latency * 1000))
+    for service in get_services():
+        for song in get_songs():
+            path = replay.get_recording_path(service, song)
+            if not os.path.exists(path):
+                print("  %-40s no recording" % ("%s %s - %s" % (service.__name__, song.artist, song.name)))
+                continue
+            server.recording = replay.Recording.load(path)
+            times = measure(lambda: service(song), repeat, server.recording.rewind)
+            report("%s %s - %s" % (service.__name__, song.artist, song.name), times)
+
+
+def benchmark_load_lyrics(server: replay.StandInServer, repeat: int):
+    print("load_lyrics (latency %.0f ms per response, %s)" % (
+        server.latency * 1000, "parallel" if services.Config.PARALLEL_LOOKUPS else "sequential"))
+    for artist, name in SONGS:
+        paths = glob.glob(os.path.join(replay.RECORDINGS_DIR, "* - %s - %s.pickle" % (artist.lower(), name.lower())))
+        server.recording = replay.Recording.load(*paths)
+
+        def clear_cache():
+            server.recording.rewind()
+            backend.cache.clear_memory()
+            backend.cache.disk.clear()
+
+        times = measure(lambda: backend.get_lyrics(backend.Song(artist, name), sync=True), repeat, clear_cache)
+        report("uncached %s - %s" % (artist, name), times)
+
+        times = measure(lambda: backend.get_lyrics(backend.Song(artist, name), sync=True), repeat)
+        report("memory cache %s - %s" % (artist, name), times)
+
+        times = measure(lambda: backend.get_lyrics(backend.Song(artist, name), sync=True), repeat,
+                        backend.cache.clear_memory)
+        report("disk cache %s - %s" % (artist, name), times)
+
+
+def benchmark_cache(repeat: int, items: int = 1000):
+    print("Cache tiers (%d entries)" % items)
+    lyrics_metadata = backend.LyricsMetadata("la la la\n" * 50, "https://example.com", "Example", False)
+    keys = ["Artist %d-Song %d" % (i, i) for i in range(items)]
+
+    def set_all():
+        for key in keys:
+            backend.cache.set(key, lyrics_metadata)
+
+    def get_all():
+        for key in keys:
+            backend.cache.get(key)
+
+    report("set", [t / items for t in measure(set_all, repeat)], "us")
+    get_all()
+    report("memory hit", [t / items for t in measure(get_all, repeat)], "us")
+    report("disk hit", [t / items for t in measure(get_all, repeat, backend.cache.clear_memory)], "us")
+    backend.cache.disk.clear()
+    report("miss", [t / items for t in measure(get_all, repeat, backend.cache.clear_memory)], "us")
+
+
+def benchmark_render_loop(repeat: int, lines: int = 400, tick: float = 0.2):
+    print("Synced lyrics render loop (%d lines)" % lines)
+    lrc_text = "\n".join("[%02d:%02d.%02d]Line number %d" % (i * 3 // 60, i * 3 % 60, i % 100, i)
+                         for i in range(lines))
+    lrc = backend.pylrc.parse(lrc_text)
+    report("parse", measure(lambda: backend.pylrc.parse(lrc_text), repeat))
+    report("timeline", measure(lambda: backend.LyricsTimeline(lrc), repeat))
+
+    timeline = backend.LyricsTimeline(lrc)
+    clock = backend.PlaybackClock(0.0)
+    ticks = int(lines * 3 / tick)
+
+    def play():
+        index = -1
+        for i in range(ticks):
+            clock.update(position=i * tick)
+            new_index = timeline.get_index(clock.get_position())
+            if new_index != index:
+                index = new_index
+
+    report("tick", [t / ticks for t in measure(play, repeat)], "us")
+
+
+def profile_imports(module: str) -> dict:
+    """Cumulative import time in seconds of the module and of everything it imports directly, from -X importtime."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import %s" % module], cwd=root, env=env,
+                            stderr=subprocess.PIPE, universal_newlines=True, check=True).stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self_time, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0 and name.strip() == module:
+            times[module] = int(cumulative) / 1000000
+        elif depth == 1:
+            times[name.strip()] = int(cumulative) / 1000000
+    return times
+
+
+def benchmark_imports(repeat: int, modules=("backend", "services"), top: int = 8):
+    print("Imports at startup (-X importtime)")
+    for module in modules:
+        runs = [profile_imports(module) for _ in range(repeat)]
+        report("import %s" % module, [run[module] for run in runs])
+        children = {name for run in runs for name in run if name != module}
+        medians = {name: statistics.median(run.get(name, 0) for run in runs) for name in children}
+        for name in sorted(medians, key=medians.get, reverse=True)[:top]:
+            print("    %-38s median %9.2f ms" % (name, medians[name] * 1000))
+
+
+BENCHMARKS = ("services", "load_lyrics", "cache", "render", "imports")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmarks", nargs="*", help="some of %s, all by default" % ", ".join(BENCHMARKS))
+    parser.add_argument("--record", action="store_true", help="record the responses of the services first")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds until the stand-in server answers")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sequential", action="store_true", help="query the services one after another")
+    args = parser.parse_args()
+    for benchmark in args.benchmarks:
+        if benchmark not in BENCHMARKS:
+            parser.error("unknown benchmark %s" % benchmark)
+    args.benchmarks = args.benchmarks or BENCHMARKS
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Keep the real cache, the saved lyrics and the statistics of the services out of the measurements
+        services.Config.LYRICS_DIR = os.path.join(directory, "lyrics")
+        services.LIBRARY = services.LocalLibrary(os.path.join(directory, "library.json"))
+        services.STATS = services.ServiceStats(os.path.join(directory, "service_stats.json"))
+        backend.cache = backend.TieredCache(os.path.join(directory, "cache"), services.Config.MEMORY_CACHE_ITEMS,
+                                            services.Config.MEMORY_CACHE_SIZE)
+        try:
+            if args.record:
+                record()
+
+            services.Config.PARALLEL_LOOKUPS = not args.sequential
+            # The stand-in server answers for every host, so pacing per host would only measure the limiter
+            services.Config.HTTP_HOST_RATE = None
+            services.Config.HTTP_HOST_RATES = {}
+            with replay.StandInServer(latency=args.latency) as server, server.redirect():
+                if "services" in args.benchmarks:
+                    benchmark_services(server, args.repeat)
+                if "load_lyrics" in args.benchmarks:
+                    benchmark_load_lyrics(server, args.repeat)
+            if "cache" in args.benchmarks:
+                benchmark_cache(args.repeat)
+            if "render" in args.benchmarks:
+                benchmark_render_loop(args.repeat)
+            if "imports" in args.benchmarks:
+                benchmark_imports(args.repeat)
+        finally:
+            backend.cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import backend
+import helpers
+import services
+
+EVENTS = []
+RELEASE = threading.Event()
+
+
+@services.lyrics_service
+def _slow(song):
+    EVENTS.append(("slow start", time.time()))
+    time.sleep(0.5)
+    EVENTS.append(("slow end", time.time()))
+    return "Slow lyrics", "https://example.com/slow", "Slow"
+
+
+@services.lyrics_service
+def _fast(song):
+    EVENTS.append(("fast start", time.time()))
+    return "Fast lyrics", "https://example.com/fast", "Fast"
+
+
+@services.lyrics_service
+def _blocking(song):
+    RELEASE.wait(5)
+    return "Blocking lyrics", "https://example.com/blocking", "Blocking"
+
+
+@services.lyrics_service
+def _blocking_miss(song):
+    RELEASE.wait(5)
+    return None
+
+
+class LookupTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.old = (services.SERVICES_LIST1[:], services.SERVICES_LIST2[:],
+                    services.Config.PARALLEL_LOOKUPS, services.Config.LYRICS_DIR)
+        helpers.use_temp_cache(self)
+        helpers.use_temp_stats(self)
+        services.Config.LYRICS_DIR = os.path.join(self.directory.name, "lyrics")
+        services.SERVICES_LIST1[:] = []
+        services.SERVICES_LIST2[:] = [_slow, _fast]
+        EVENTS.clear()
+
+    def tearDown(self):
+        (services.SERVICES_LIST1[:], services.SERVICES_LIST2[:],
+         services.Config.PARALLEL_LOOKUPS, services.Config.LYRICS_DIR) = self.old
+        self.directory.cleanup()
+
+
+class DeadlineTest(LookupTestCase):
+    def test_hedged(self):
+        services.Config.PARALLEL_LOOKUPS = False
+        for _ in range(20):
+            services.STATS.record("_slow", services.HIT, 0.05)
+
+        results = list(backend.lookup_services(backend.Song("Queen", "We Will Rock You"), [_slow, _fast]))
+
+        self.assertEqual(["Slow", "Fast"], [result[2] for result in results])
+        events = dict(EVENTS)
+        self.assertLess(events["fast start"], events["slow end"])
+
+    def test_deadline(self):
+        song = backend.Song("Queen", "We Will Rock You")
+        start = time.time()
+        lyrics_metadata = backend.get_lyrics(song, deadline=0.2)
+
+        self.assertLess(time.time() - start, 0.4)
+        self.assertEqual("Fast", lyrics_metadata.service_name)
+
+        # The slow service finishes in the background and its better lyrics get cached
+        time.sleep(0.6)
+        # without taking "Next Lyric" back from the fast service the fallback showed
+        self.assertEqual(1, backend.CURRENT_SERVICE)
+        self.assertEqual("Slow", backend.get_lyrics(backend.Song("Queen", "We Will Rock You")).service_name)
+
+    def test_late_lyrics_delivered(self):
+        late = []
+        lyrics_metadata = backend.get_lyrics(backend.Song("Queen", "We Will Rock You"), deadline=0.2,
+                                             late=late.append)
+        self.assertEqual("Fast", lyrics_metadata.service_name)
+
+        time.sleep(0.6)
+        self.assertEqual(["Slow"], [late_metadata.service_name for late_metadata in late])
+        # "Next Lyric" continues after the service of the lyrics shown now
+        self.assertEqual(0, backend.CURRENT_SERVICE)
+
+
+class SharedLookupsTest(LookupTestCase):
+    def setUp(self):
+        super().setUp()
+        RELEASE.clear()
+        # One worker, so the lookup after the blocking one stays queued
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        patcher = mock.patch.object(backend, "lookup_executor", self.executor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.resolve_executor = ThreadPoolExecutor(max_workers=2)
+        patcher = mock.patch.object(backend, "resolve_executor", self.resolve_executor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.song = backend.Song("Queen", "We Will Rock You")
+
+    def tearDown(self):
+        RELEASE.set()
+        self.resolve_executor.shutdown()
+        self.executor.shutdown()
+        super().tearDown()
+
+    def test_released_by_one_caller(self):
+        first = backend.submit_lookups(self.song, [_blocking, _fast])
+        second = backend.submit_lookups(self.song, [_blocking, _fast])
+        backend.release_lookups(first)
+
+        self.assertFalse(second[1].cancelled())
+        RELEASE.set()
+        self.assertEqual("Fast", backend.get_lookup_result(self.song, _fast, second[1])[2])
+        backend.release_lookups(second)
+
+    def test_released_by_all_callers(self):
+        futures = backend.submit_lookups(self.song, [_blocking, _fast])
+        backend.release_lookups(futures)
+
+        self.assertTrue(futures[1].cancelled())
+
+    def test_cancelled_by_song_change(self):
+        futures = backend.submit_lookups(self.song, [_blocking, _fast])
+        backend.submit_lookups(backend.Song("Michael Jackson", "Thriller"), [])
+
+        self.assertTrue(futures[1].cancelled())
+        with self.assertRaises(backend.LookupCancelled):
+            backend.get_lookup_result(self.song, _fast, futures[1])
+
+    def test_skipped_song_stops_looking_up(self):
+        services.SERVICES_LIST2[:] = [_blocking_miss, _fast]
+        late = []
+        backend.get_lyrics(self.song, deadline=0.1, late=late.append)
+        next_song = backend.Song("Michael Jackson", "Thriller")
+        backend.get_lyrics(next_song, deadline=0.1)
+        RELEASE.set()
+        self.resolve_executor.shutdown()
+
+        # Only the current song asked the fast service, the skipped one neither cached nor delivered anything
+        self.assertEqual(["fast start"], [event for event, _time in EVENTS])
+        self.assertFalse(backend.is_cached(self.song))
+        self.assertTrue(backend.is_cached(next_song))
+        self.assertEqual([], late)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+"""Fixtures shared by the tests."""
+import os
+import tempfile
+from unittest import mock
+
+from diskcache import Cache
+
+import backend
+import services
+
+
+def create_temp_cache(test_case, max_items: int = 8, max_size: int = 4096) -> backend.TieredCache:
+    """An empty cache in a temporary directory, closed and deleted when the test is over."""
+    directory = tempfile.TemporaryDirectory()
+    test_case.addCleanup(directory.cleanup)
+    cache = backend.TieredCache(Cache(directory.name), max_items=max_items, max_size=max_size)
+    test_case.addCleanup(cache.close)
+    return cache
+
+
+def use_temp_cache(test_case, max_items: int = 8, max_size: int = 4096) -> backend.TieredCache:
+    """Swaps backend.cache for an empty cache in a temporary directory until the test is over."""
+    cache = create_temp_cache(test_case, max_items, max_size)
+    patcher = mock.patch.object(backend, "cache", cache)
+    patcher.start()
+    test_case.addCleanup(patcher.stop)
+    return cache
+
+
+def use_temp_stats(test_case) -> services.ServiceStats:
+    """Swaps services.STATS for empty statistics in a temporary directory until the test is over."""
+    directory = tempfile.TemporaryDirectory()
+    test_case.addCleanup(directory.cleanup)
+    stats = services.ServiceStats(os.path.join(directory.name, "service_stats.json"))
+    patcher = mock.patch.object(services, "STATS", stats)
+    patcher.start()
+    test_case.addCleanup(patcher.stop)
+    return stats
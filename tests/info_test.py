@@ -0,0 +1,97 @@
+import threading
+import time
+import unittest
+from concurrent.futures import wait
+from unittest import mock
+
+import backend
+import helpers
+import services
+
+
+def _dances(song, cancel=None):
+    song.dances.append("Cha Cha Cha")
+    song.beats_per_minute = 120
+    return True
+
+
+def _slow(song, cancel=None):
+    for _ in range(50):
+        if cancel.is_set():
+            return False
+        time.sleep(0.01)
+    song.album = "Slow"
+    return True
+
+
+class InfoLoaderTest(unittest.TestCase):
+    def setUp(self):
+        helpers.use_temp_cache(self)
+
+    def test_load_and_cache(self):
+        loader = backend.InfoLoader([_dances, _slow])
+        song = backend.Song("Queen", "We Will Rock You")
+        callbacks = []
+        wait(loader.load(song, lambda: callbacks.append(1)).result())
+        # The callbacks run right after the futures finished
+        for _ in range(100):
+            if len(callbacks) == 2:
+                break
+            time.sleep(0.01)
+        self.assertEqual(["Cha Cha Cha"], song.dances)
+        self.assertEqual("Slow", song.album)
+        self.assertEqual(2, len(callbacks))
+
+        song = backend.Song("Queen", "We Will Rock You")
+        threads = []
+        cache_get = backend.cache.get
+
+        def get(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return cache_get(*args, **kwargs)
+
+        with mock.patch.object(backend.cache, "get", side_effect=get):
+            self.assertEqual([], backend.InfoLoader([]).load(song).result())
+        # Read by the executor, not by the GUI thread which called load
+        self.assertEqual(1, len(threads))
+        self.assertIsNot(threading.current_thread(), threads[0])
+        self.assertEqual(["Cha Cha Cha"], song.dances)
+        self.assertEqual(120, song.beats_per_minute)
+        self.assertEqual("Slow", song.album)
+
+    def test_cancelled_on_song_change(self):
+        loader = backend.InfoLoader([_slow])
+        old_song = backend.Song("Queen", "We Will Rock You")
+        callbacks = []
+        futures = loader.load(old_song, lambda: callbacks.append(old_song)).result()
+        time.sleep(0.05)
+        new_futures = loader.load(backend.Song("Michael Jackson", "Thriller")).result()
+        wait(futures + new_futures)
+
+        self.assertFalse(futures[0].result())
+        self.assertEqual("UNKNOWN", old_song.album)
+        self.assertEqual([], callbacks)
+        self.assertIsNone(backend.cache.get("info:%s" % backend.get_song_key(old_song)))
+
+    def test_set_song_info(self):
+        song = backend.Song("Queen", "We Will Rock You")
+        song.album = "News of the World"
+        song.dances = ["Rumba"]
+        backend.set_song_info(song, {"album": "Other", "year": 1977, "dances": ["Rumba", "Jive"]})
+        self.assertEqual("News of the World", song.album)
+        self.assertEqual(1977, song.year)
+        self.assertEqual(["Rumba", "Jive"], song.dances)
+
+
+class MapPagesTest(unittest.TestCase):
+    def test_order(self):
+        self.assertEqual([3, 2, 1], services.map_pages(lambda i: time.sleep(i / 100) or i, [3, 2, 1]))
+
+    def test_cancelled(self):
+        cancel = threading.Event()
+        cancel.set()
+        self.assertEqual([None, None], services.map_pages(lambda i: i, [1, 2], cancel))
+
+
+if __name__ == '__main__':
+    unittest.main()
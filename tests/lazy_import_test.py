@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import backend
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LazyImportTest(unittest.TestCase):
+    def test_heavy_modules_not_imported(self):
+        # A fresh interpreter, because other tests already imported everything
+        code = "import sys, backend; print(' '.join(m for m in %r if m in sys.modules))" % (
+            ("azapi", "bs4", "diskcache", "sentry_sdk", "unidecode", "lxml"),)
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+        output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, stdout=subprocess.PIPE,
+                                universal_newlines=True, check=True).stdout
+        self.assertEqual("", output.strip())
+
+    def test_cache_opened_on_demand(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = backend.TieredCache(os.path.join(directory, "cache"), 8, 4096)
+            self.assertIsNone(cache._disk)
+            self.assertFalse(os.path.exists(os.path.join(directory, "cache")))
+
+            cache.set("key", "value")
+            self.assertEqual("value", cache.disk.get("key"))
+            cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
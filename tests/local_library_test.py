@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import services
+
+
+class LocalLibraryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.lyrics_dir = os.path.join(self.directory.name, "lyrics")
+        os.makedirs(self.lyrics_dir)
+        self.old_lyrics_dir = services.Config.LYRICS_DIR
+        services.Config.LYRICS_DIR = self.lyrics_dir
+        self.library = services.LocalLibrary(os.path.join(self.directory.name, "library.json"))
+
+    def tearDown(self):
+        services.Config.LYRICS_DIR = self.old_lyrics_dir
+        self.directory.cleanup()
+
+    def write(self, file_name):
+        path = os.path.join(self.lyrics_dir, file_name)
+        with open(path, "w", encoding="UTF-8") as lyrics_file:
+            lyrics_file.write("lyrics")
+        return path
+
+    def test_find(self):
+        self.write("Queen - We Will Rock You.txt")
+        lrc = self.write("Queen - We Will Rock You.lrc")
+        self.write("notes.md")
+
+        self.assertEqual(lrc, self.library.find("queen", "we will rock you"))
+        self.assertIsNone(self.library.find("Queen", "Thriller"))
+
+    def test_find_partial_name(self):
+        path = self.write("01 Michael Jackson - Thriller (Remastered).txt")
+
+        self.assertEqual(path, self.library.find("Michael Jackson", "Thriller"))
+        self.assertIsNone(self.library.find("Jackson", "Thriller"))
+
+    def test_miss_doesnt_scan(self):
+        for i in range(100):
+            self.write("Artist %d - Song %d.txt" % (i, i))
+        self.library.refresh()
+
+        with mock.patch.object(self.library, "index", wraps=self.library.index) as index:
+            self.assertIsNone(self.library.find("Queen", "Thriller"))
+        index.items.assert_not_called()
+
+    def test_refresh_on_change(self):
+        self.assertIsNone(self.library.find("Queen", "We Will Rock You"))
+        path = self.write("Queen - We Will Rock You.txt")
+        self.library.add(path)
+
+        self.assertEqual(path, self.library.find("Queen", "We Will Rock You"))
+
+        os.remove(path)
+        os.utime(self.lyrics_dir, (0, 0))
+        self.assertIsNone(self.library.find("Queen", "We Will Rock You"))
+
+    def test_written_in_same_mtime_tick(self):
+        self.write("Queen - We Will Rock You.txt")
+        self.library.refresh()
+        mtime = os.stat(self.lyrics_dir).st_mtime
+        path = self.write("Michael Jackson - Thriller.txt")
+        os.utime(self.lyrics_dir, (mtime, mtime))
+
+        self.assertEqual(path, self.library.find("Michael Jackson", "Thriller"))
+
+    def test_old_directory_not_rescanned(self):
+        self.write("Queen - We Will Rock You.txt")
+        os.utime(self.lyrics_dir, (0, 0))
+        self.library.refresh()
+
+        with mock.patch("os.scandir", wraps=os.scandir) as scandir:
+            self.library.refresh()
+        scandir.assert_not_called()
+
+    def test_persisted(self):
+        path = self.write("Queen - We Will Rock You.txt")
+        self.library.refresh()
+
+        library = services.LocalLibrary(self.library.index_file)
+        library.load()
+        self.assertEqual(self.library.files, library.files)
+        self.assertEqual(path, library.find("Queen", "We Will Rock You"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+import pylrc
+
+import backend
+
+LRC = """[ti:Thriller]
+[00:01.00]It's close to midnight
+[00:05.50]And something evil's lurking in the dark
+[00:10.00]Under the moonlight
+[00:14.25]You see a sight that almost stops your heart
+[00:20.00]Thriller & chiller
+"""
+
+
+class LyricsTimelineTest(unittest.TestCase):
+    timeline = backend.LyricsTimeline(pylrc.parse(LRC))
+
+    def test_get_index(self):
+        self.assertEqual(5, len(self.timeline))
+        self.assertEqual(0, self.timeline.get_index(0))
+        self.assertEqual(0, self.timeline.get_index(5.49))
+        self.assertEqual(1, self.timeline.get_index(5.5))
+        self.assertEqual(3, self.timeline.get_index(19))
+        self.assertEqual(4, self.timeline.get_index(500))
+
+    def test_get_next_time(self):
+        self.assertEqual(10, self.timeline.get_next_time(1))
+        self.assertEqual(float("inf"), self.timeline.get_next_time(4))
+
+    def test_lines(self):
+        self.assertEqual("It's close to midnight", self.timeline.lines[0])
+        self.assertEqual("Thriller & chiller", self.timeline.lines[4])
+
+if __name__ == '__main__':
+    unittest.main()
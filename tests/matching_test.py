@@ -0,0 +1,65 @@
+import unittest
+from unittest import mock
+
+import backend
+import helpers
+import matching
+import services
+
+SONG = backend.Song("Beyoncé", "Déjà Vu")
+
+SEARCH_PAGE = """<html><body><div id="list_entity_container">
+<a class="entity_name" href="/lrc/maker/karaoke">Beyonce - Deja Vu (Karaoke Version)</a>
+<a class="entity_name" href="/lrc/maker/live">Beyonce - Deja Vu (Live)</a>
+<a class="entity_name" href="/lrc/maker/other">Beyonce - Halo</a>
+<a class="entity_name" href="/lrc/maker/studio">Beyoncé – Déjà Vu</a>
+</div></body></html>"""
+
+LYRICS_PAGE = """<html><body><div class="lyrics_details"><span>[00:01.00]Baby seems like everywhere I go</span>
+</div></body></html>"""
+
+
+class MatchingTest(unittest.TestCase):
+    def test_normalize(self):
+        self.assertEqual("beyonce deja vu", matching.normalize("Beyoncé – Déjà Vu!"))
+        self.assertEqual("dont stop me now", matching.normalize("Don't Stop Me Now"))
+        self.assertEqual("simon and garfunkel", matching.normalize("Simon & Garfunkel"))
+
+    def test_score(self):
+        self.assertAlmostEqual(1.0, matching.score(SONG, "Beyonce - Deja Vu"))
+        self.assertLess(matching.score(SONG, "Beyonce - Deja Vu (Live)"), matching.MIN_SCORE)
+        self.assertLess(matching.score(SONG, "Beyonce - Halo"), matching.MIN_SCORE)
+        # Similar words still count, but less than the same words
+        colour = matching.score(backend.Song("Coldplay", "Colour Spectrum"), "Coldplay - Color Spectrum")
+        self.assertGreater(colour, matching.MIN_SCORE)
+        self.assertLess(colour, 1.0)
+
+    def test_versions_of_the_song_are_not_penalized(self):
+        song = backend.Song("Queen", "We Will Rock You (Live)")
+        self.assertEqual("Queen - We Will Rock You - Live", matching.best(song, [
+            "Queen - We Will Rock You", "Queen - We Will Rock You - Live"]))
+
+    def test_best(self):
+        titles = ["Beyonce - Deja Vu (Karaoke)", "Beyonce feat. Jay-Z - Deja Vu", "Beyonce - Deja Vu"]
+        self.assertEqual("Beyonce - Deja Vu", matching.best(SONG, titles))
+        self.assertEqual(titles[1:][::-1], matching.rank(SONG, titles))
+        self.assertIsNone(matching.best(SONG, ["Rihanna - Umbrella"]))
+        self.assertIsNone(matching.best(SONG, []))
+
+    def test_only_best_result_is_fetched(self):
+        helpers.use_temp_stats(self)
+        responses = {"https://www.megalobiz.com/lrc/maker/studio": LYRICS_PAGE}
+
+        def get(url, *args, **kwargs):
+            return mock.Mock(text=responses.get(url, SEARCH_PAGE), url=url)
+
+        with mock.patch.object(services.SESSIONS, "get", side_effect=get) as session_get:
+            result = services._megalobiz(SONG)
+
+        self.assertEqual("https://www.megalobiz.com/lrc/maker/studio", result[1])
+        self.assertIn("everywhere I go", result[0])
+        self.assertEqual(2, session_get.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
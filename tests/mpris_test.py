@@ -0,0 +1,148 @@
+import subprocess
+import sys
+import time
+import unittest
+
+import backend
+
+if sys.platform == "linux" and backend.GLib is not None:
+    import dbus
+    import dbus.service
+
+    class FakePlayer(dbus.service.Object):
+        """ Stand-in for a MPRIS player like Spotify """
+
+        def __init__(self, bus):
+            super().__init__(bus, backend.MprisListener.PATH)
+            self.bus_name = dbus.service.BusName("org.mpris.MediaPlayer2.fake", bus)
+            self.properties = {
+                "Metadata": self.get_metadata("Queen", "We Will Rock You"),
+                "PlaybackStatus": "Playing",
+                "Position": dbus.Int64(30000000),
+                "Rate": 1.0,
+            }
+
+        @staticmethod
+        def get_metadata(artist, title):
+            return dbus.Dictionary({
+                "xesam:artist": dbus.Array([artist], signature="s"),
+                "xesam:title": title,
+            }, signature="sv")
+
+        def play(self, artist, title):
+            self.properties["Metadata"] = self.get_metadata(artist, title)
+            self.PropertiesChanged(backend.MprisListener.PLAYER_INTERFACE,
+                                   {"Metadata": self.properties["Metadata"]}, [])
+
+        def seek(self, position):
+            self.properties["Position"] = dbus.Int64(position)
+            self.Seeked(position)
+
+        def pause(self):
+            self.properties["PlaybackStatus"] = "Paused"
+            self.PropertiesChanged(backend.MprisListener.PLAYER_INTERFACE, {"PlaybackStatus": "Paused"}, [])
+
+        @dbus.service.method(backend.MprisListener.PROPERTIES_INTERFACE, in_signature="ss", out_signature="v")
+        def Get(self, interface, prop):
+            return self.properties[prop]
+
+        @dbus.service.method(backend.MprisListener.PROPERTIES_INTERFACE, in_signature="s", out_signature="a{sv}")
+        def GetAll(self, interface):
+            return self.properties
+
+        @dbus.service.signal(backend.MprisListener.PROPERTIES_INTERFACE, signature="sa{sv}as")
+        def PropertiesChanged(self, interface, changed, invalidated):
+            pass
+
+        @dbus.service.signal(backend.MprisListener.PLAYER_INTERFACE, signature="x")
+        def Seeked(self, position):
+            pass
+
+
+class PlaybackClockTest(unittest.TestCase):
+    def test_position(self):
+        clock = backend.PlaybackClock(10)
+        clock.updated -= 2
+        self.assertAlmostEqual(12, clock.get_position(), places=1)
+
+        clock.update(playing=False)
+        position = clock.get_position()
+        clock.updated -= 2
+        self.assertEqual(position, clock.get_position())
+
+        clock.update(position=60, rate=2.0, playing=True)
+        clock.updated -= 1
+        self.assertAlmostEqual(62, clock.get_position(), places=1)
+
+
+@unittest.skipUnless(sys.platform == "linux" and backend.GLib is not None, "MPRIS is only used on linux")
+class MprisListenerTest(unittest.TestCase):
+    def setUp(self):
+        self.daemon = subprocess.Popen(["dbus-daemon", "--session", "--nofork", "--print-address"],
+                                       stdout=subprocess.PIPE, universal_newlines=True)
+        self.address = self.daemon.stdout.readline().strip()
+
+        self.listener = backend.MprisListener("fake", self.address)
+        self.listener.start()
+
+        mainloop = dbus.mainloop.glib.DBusGMainLoop()
+        self.player_bus = dbus.bus.BusConnection(self.address, mainloop=mainloop)
+
+    def tearDown(self):
+        self.listener.stop()
+        self.player_bus.close()
+        self.daemon.terminate()
+        self.daemon.wait()
+
+    def wait_for_title(self, title):
+        deadline = time.time() + 5
+        while self.listener.title != title and time.time() < deadline:
+            self.listener.wait_for_change(0.1)
+        self.assertEqual(title, self.listener.title)
+
+    def test_player_appears(self):
+        self.assertEqual("", self.listener.title)
+        self.player = FakePlayer(self.player_bus)
+        self.wait_for_title("Queen - We Will Rock You")
+
+    def test_track_change(self):
+        titles = []
+        self.listener.add_callback(titles.append)
+        self.player = FakePlayer(self.player_bus)
+        self.wait_for_title("Queen - We Will Rock You")
+
+        self.player.play("Michael Jackson", "Thriller")
+        self.wait_for_title("Michael Jackson - Thriller")
+        self.assertEqual(["Queen - We Will Rock You", "Michael Jackson - Thriller"], titles)
+
+    def test_player_quits(self):
+        self.player = FakePlayer(self.player_bus)
+        self.wait_for_title("Queen - We Will Rock You")
+
+        self.player_bus.release_name(self.player.bus_name.get_name())
+        self.wait_for_title("")
+
+    def wait_for_position(self, position):
+        deadline = time.time() + 5
+        while abs(self.listener.clock.get_position() - position) > 0.5 and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertAlmostEqual(position, self.listener.clock.get_position(), delta=0.5)
+
+    def test_playback_clock(self):
+        self.player = FakePlayer(self.player_bus)
+        self.wait_for_position(30)
+
+        self.player.seek(90000000)
+        self.wait_for_position(90)
+
+        self.player.pause()
+        deadline = time.time() + 5
+        while self.listener.clock.playing and time.time() < deadline:
+            time.sleep(0.05)
+        position = self.listener.clock.get_position()
+        time.sleep(0.2)
+        self.assertEqual(position, self.listener.clock.get_position())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Compares the time the lyrics services spend parsing their pages with the old full html.parser
+parse and with services.parse_html. Both runs replay the pages recorded in res/recordings,
+so the network isn't part of the measurement. The committed recordings are synthetic pages from
+recordings_gen.py, --record replaces them with the pages of the real sites.
+
+    python parse_benchmark.py
+    python parse_benchmark.py --record
+"""
+import argparse
+import os
+import time
+from unittest import mock
+
+from bs4 import BeautifulSoup
+
+import backend
+import replay
+import services
+
+SONGS = [
+    backend.Song("Queen", "We Will Rock You"),
+    backend.Song("Michael Jackson", "Thriller"),
+]
+
+
+def get_services() -> list:
+    return [service for service in services.SERVICES_LIST1 + services.SERVICES_LIST2 if service.cached]
+
+
+def record():
+    for service in get_services():
+        for song in SONGS:
+            with replay.record(replay.get_recording_path(service, song)) as recording:
+                service(song)
+            print("Recorded %d pages of %s" % (len(recording.exchanges), service.__name__))
+
+
+def full_parse(markup, *args, **kwargs) -> BeautifulSoup:
+    return BeautifulSoup(markup, "html.parser")
+
+
+def full_parse_find_script(markup, marker):
+    BeautifulSoup(markup, "html.parser")
+    return find_script(markup, marker)
+
+
+find_script = services.find_script
+
+
+def measure(service, song, recording: replay.Recording, repeat: int) -> float:
+    start = time.perf_counter()
+    with replay.replay(recording):
+        for _ in range(repeat):
+            recording.rewind()
+            service(song)
+    return (time.perf_counter() - start) / repeat
+
+
+def benchmark(repeat: int):
+    print("Parser: %s" % services.HTML_PARSER)
+    print("%-16s %12s %12s %8s" % ("Service", "Full (ms)", "Parsed (ms)", "Gain"))
+    for service in get_services():
+        full_time = parsed_time = 0.0
+        for song in SONGS:
+            path = replay.get_recording_path(service, song)
+            if not os.path.exists(path):
+                print("%-16s no recording for %s - %s" % (service.__name__.strip("_"), song.artist, song.name))
+                continue
+            recording = replay.Recording.load(path)
+            with mock.patch.object(services, "parse_html", full_parse), \
+                    mock.patch.object(services, "find_script", full_parse_find_script):
+                full_time += measure(service, song, recording, repeat)
+            parsed_time += measure(service, song, recording, repeat)
+        if full_time:
+            print("%-16s %12.1f %12.1f %7.1fx" % (service.__name__.strip("_"), full_time * 1000, parsed_time * 1000,
+                                                 full_time / max(parsed_time, 1e-9)))
+
+
+if __name__ == "__main__":
+    PARSER = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    PARSER.add_argument("--record", action="store_true", help="download and record the pages first")
+    PARSER.add_argument("--repeat", type=int, default=5)
+    ARGS = PARSER.parse_args()
+
+    if ARGS.record:
+        record()
+    benchmark(ARGS.repeat)
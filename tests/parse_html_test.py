@@ -0,0 +1,38 @@
+import unittest
+
+import services
+
+PAGE = """<html><head><title>Queen - We Will Rock You</title>
+<script>var analytics = true;</script>
+<script>window.__mxmProps = {"body":"We will rock you"};</script></head>
+<body><div id="header"><a href="/">Home</a></div>
+<div id="songLyricsDiv">Buddy, you're a boy, make a big noise</div>
+<div class="pagetitle"><p>Album: <a href="/news">News of the World</a></p></div></body></html>"""
+
+
+class ParseHtmlTest(unittest.TestCase):
+    def test_only_matching_elements(self):
+        soup = services.parse_html(PAGE, id="songLyricsDiv")
+
+        self.assertEqual("Buddy, you're a boy, make a big noise", soup.find(id="songLyricsDiv").get_text())
+        self.assertIsNone(soup.find(id="header"))
+        self.assertIsNone(soup.find("title"))
+
+    def test_children_are_kept(self):
+        soup = services.parse_html(PAGE, "div", class_="pagetitle")
+
+        self.assertEqual("News of the World", soup.find("div", class_="pagetitle").find("a").get_text())
+
+    def test_full_page(self):
+        soup = services.parse_html(PAGE)
+
+        self.assertEqual(2, len(soup.find_all("a")))
+
+    def test_find_script(self):
+        self.assertEqual('window.__mxmProps = {"body":"We will rock you"};', services.find_script(PAGE, "__mxmProps"))
+        self.assertIsNone(services.find_script(PAGE, "__missing"))
+        self.assertIsNone(services.find_script("<p>__mxmProps</p><script>var a;</script>", "__mxmProps"))
+
+
+if __name__ == '__main__':
+    unittest.main()
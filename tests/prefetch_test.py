@@ -0,0 +1,162 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import backend
+import helpers
+import prefetch
+import providers
+import services
+
+
+@services.lyrics_service
+def _synced(song):
+    if song.artist == "Queen":
+        return "[00:01.00]We will, we will rock you", "https://example.com/queen", "Synced", True
+    return None
+
+
+@services.lyrics_service
+def _plain(song):
+    if song.artist == "Michael Jackson":
+        return "It's close to midnight", "https://example.com/thriller", "Plain"
+    return None
+
+
+class FakeServicesTestCase(unittest.TestCase):
+    def setUp(self):
+        helpers.use_temp_cache(self)
+        # Keep the lookups of the fake services out of the statistics of the real services
+        helpers.use_temp_stats(self)
+        self.old_services = services.SERVICES_LIST1[:], services.SERVICES_LIST2[:]
+        services.SERVICES_LIST1[:] = [_synced]
+        services.SERVICES_LIST2[:] = [_plain]
+        self.songs = [backend.Song.get_from_string(line) for line in
+                      ("Queen - We Will Rock You", "Michael Jackson - Thriller", "Nobody - Nothing")]
+
+    def tearDown(self):
+        services.SERVICES_LIST1[:], services.SERVICES_LIST2[:] = self.old_services
+
+
+class PrefetchTest(FakeServicesTestCase):
+    def test_prefetch(self):
+        lines = []
+        counts = backend.prefetch_lyrics(self.songs, workers=2, report=lines.append)
+
+        self.assertEqual({"found": 2, "not found": 1, "skipped": 0, "error": 0}, counts)
+        self.assertEqual(3, len(lines))
+        self.assertEqual("Synced", backend.cache.get(backend.get_song_key(self.songs[0])).service_name)
+        self.assertEqual("Plain", backend.cache.get(backend.get_song_key(self.songs[1])).service_name)
+
+    def test_resume(self):
+        backend.prefetch_lyrics(self.songs[:1], report=lambda line: None)
+
+        counts = backend.prefetch_lyrics(self.songs, report=lambda line: None)
+        self.assertEqual({"found": 1, "not found": 1, "skipped": 1, "error": 0}, counts)
+
+    def test_error_doesnt_stop_batch(self):
+        def save_lyrics_file(song, lyrics_metadata):
+            if song is self.songs[0]:
+                raise OSError("Read-only file system")
+
+        lines = []
+        with mock.patch.object(backend, "save_lyrics_file", side_effect=save_lyrics_file):
+            counts = backend.prefetch_lyrics(self.songs, save=True, report=lines.append)
+
+        self.assertEqual({"found": 1, "not found": 1, "skipped": 0, "error": 1}, counts)
+        self.assertEqual(3, len(lines))
+        self.assertTrue(any("Read-only file system" in line for line in lines))
+
+
+class PlayHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.history = backend.PlayHistory(os.path.join(self.directory.name, "history.json"), max_items=3)
+
+    def tearDown(self):
+        self.history.flush()
+        self.directory.cleanup()
+
+    def test_get_next(self):
+        for title in ("A - 1", "A - 2", "A - 3", "B - 1"):
+            self.history.played(title)
+
+        self.assertEqual(["A - 2", "A - 3"], self.history.get_next("A - 1", 2))
+        self.assertEqual([], self.history.get_next("B - 1", 2))
+
+        self.history.played("A - 2")
+        self.history.played("C - 1")
+        self.assertEqual(["C - 1"], self.history.get_next("A - 2", 2))
+
+    def test_persisted(self):
+        for title in ("A - 1", "A - 2", "A - 1", "A - 2", "A - 3"):
+            self.history.played(title)
+        self.history.flush()
+
+        history = backend.PlayHistory(self.history.history_file, max_items=3)
+        self.assertEqual(["A - 2", "A - 3"], history.get_next("A - 1", 5))
+
+    def test_saved_after_delay(self):
+        with mock.patch.object(services.Config, "SETTINGS_SAVE_DELAY", 0.1):
+            for title in ("A - 1", "A - 2", "A - 3"):
+                self.history.played(title)
+            self.assertFalse(os.path.exists(self.history.history_file))
+            time.sleep(0.3)
+        self.assertTrue(os.path.exists(self.history.history_file))
+        self.assertFalse(self.history.dirty)
+
+
+class LyricsPrefetcherTest(FakeServicesTestCase):
+    @staticmethod
+    def wait_until_idle(prefetcher):
+        deadline = time.time() + 5
+        while not prefetcher.is_idle() and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_in_flight_limit(self):
+        prefetcher = backend.LyricsPrefetcher(max_in_flight=1, bandwidth=None)
+
+        started = prefetcher.prefetch(self.songs)
+        self.assertEqual(self.songs[:1], started)
+        self.wait_until_idle(prefetcher)
+
+        started = prefetcher.prefetch(self.songs)
+        self.assertEqual(self.songs[1:2], started)
+        self.wait_until_idle(prefetcher)
+        self.assertEqual("Plain", backend.cache.get(backend.get_song_key(self.songs[1])).service_name)
+
+
+class PrefetchSettingsTest(FakeServicesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.lyrics_dir = os.path.join(self.directory.name, "my lyrics")
+        with open(os.path.join(self.directory.name, "settings.ini"), "w") as settings:
+            settings.write("[settings]\nlyricspath = %s\nproviders = qq, -azapi\n" % self.lyrics_dir)
+        for name, value in (("SETTINGS_DIR", self.directory.name), ("LYRICS_DIR", services.Config.LYRICS_DIR),
+                            ("PROVIDERS", services.Config.PROVIDERS)):
+            patcher = mock.patch.object(services.Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(services, "LIBRARY",
+                                    services.LocalLibrary(os.path.join(self.directory.name, "library.json")))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_settings_used(self):
+        prefetch.load_settings()
+
+        self.assertEqual(self.lyrics_dir, services.Config.LYRICS_DIR)
+        enabled = [provider.name for provider in providers.get_enabled(services.Config.PROVIDERS)]
+        self.assertIn("qq", enabled)
+        self.assertNotIn("azapi", enabled)
+
+        backend.prefetch_lyrics(self.songs[:1], save=True, report=lambda line: None)
+        self.assertEqual(["Queen - We Will Rock You.lrc"], os.listdir(self.lyrics_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import providers
+import services
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ProvidersTest(unittest.TestCase):
+    def test_declarations(self):
+        local = providers.get_provider("local")
+        self.assertTrue(local.synced and local.unsynced and local.pinned)
+        genius = providers.get_provider("genius")
+        self.assertFalse(genius.synced)
+        self.assertTrue(genius.unsynced)
+        self.assertEqual(("genius.com",), genius.hosts)
+        self.assertIsNone(providers.get_provider("unknown"))
+
+    def test_enabled(self):
+        names = [provider.name for provider in providers.get_enabled({})]
+        self.assertEqual("local", names[0])
+        self.assertNotIn("qq", names)
+
+        names = [provider.name for provider in providers.get_enabled({"qq": True, "azapi": False})]
+        self.assertIn("qq", names)
+        self.assertNotIn("azapi", names)
+
+    def test_overrides(self):
+        overrides = providers.parse_overrides(" qq, -azapi ,")
+        self.assertEqual({"qq": True, "azapi": False}, overrides)
+        self.assertEqual("-azapi, qq", providers.format_overrides(overrides))
+
+    def test_service_attributes(self):
+        self.assertIs(services._genius, services._genius)
+        self.assertIs(providers.get_provider("genius"), services._genius.provider)
+        with self.assertRaises(AttributeError):
+            services._unknown
+
+    def test_disabled_not_imported(self):
+        # A fresh interpreter, because other tests already imported the providers
+        code = ("import sys, services; services.Config.PROVIDERS = {'azapi': False}; services.load_services(); "
+                "print(' '.join(sorted(m for m in sys.modules if m.startswith('providers.'))))")
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+        output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, stdout=subprocess.PIPE,
+                                universal_newlines=True, check=True).stdout.split()
+        self.assertIn("providers.local", output)
+        self.assertIn("providers.genius", output)
+        self.assertNotIn("providers.azapi", output)
+        self.assertNotIn("providers.qq", output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import http.server
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+import providers
+import services
+
+
+def get_response(status: int, headers: dict = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = b""
+    return response
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_then_rate(self):
+        bucket = services.TokenBucket(rate=20, burst=3)
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        # The burst goes through at once, the two requests after it wait 1/20 s each
+        self.assertAlmostEqual(0.1, time.monotonic() - start, delta=0.05)
+
+    def test_unlimited(self):
+        bucket = services.TokenBucket()
+        start = time.monotonic()
+        for _ in range(100):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - start, 0.05)
+
+    def test_throttle(self):
+        bucket = services.TokenBucket()
+        bucket.throttle(0.2)
+        start = time.monotonic()
+        bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+        bucket.throttle(services.Config.HTTP_MAX_WAIT + 10)
+        with self.assertRaises(services.Throttled):
+            bucket.acquire()
+
+    def test_backoff_without_retry_after(self):
+        bucket = services.TokenBucket()
+        with mock.patch.object(services.Config, "HTTP_THROTTLE_BACKOFF", 1):
+            bucket.throttle()
+            first = bucket.paused_until - time.monotonic()
+            bucket.throttle()
+            second = bucket.paused_until - time.monotonic()
+        self.assertAlmostEqual(1, first, delta=0.05)
+        self.assertAlmostEqual(2, second, delta=0.05)
+
+    def test_retry_after(self):
+        self.assertEqual(3, services.get_retry_after(get_response(429, {"Retry-After": "3"})))
+        self.assertIsNone(services.get_retry_after(get_response(429)))
+        date = "Wed, 21 Oct 2015 07:28:00 GMT"
+        self.assertEqual(0, services.get_retry_after(get_response(429, {"Retry-After": date})))
+
+
+class SessionsThrottleTest(unittest.TestCase):
+    def setUp(self):
+        self.sessions = services.Sessions()
+        self.session = mock.Mock()
+        self.sessions.get_session = lambda url: self.session
+
+    def test_retried_after_429(self):
+        self.session.request.side_effect = [get_response(429, {"Retry-After": "0"}), get_response(200)]
+        self.assertEqual(200, self.sessions.get("https://example.com/").status_code)
+        self.assertEqual(2, self.session.request.call_count)
+
+    def test_host_rates(self):
+        for host in providers.get_provider("azapi").hosts:
+            bucket = self.sessions.get_bucket("https://%s/search" % host)
+            self.assertLessEqual(bucket.rate, 0.3)
+            self.assertEqual(1, bucket.burst)
+        self.assertEqual(services.Config.HTTP_HOST_BURST, self.sessions.get_bucket("https://example.com/").burst)
+
+    def test_gives_up(self):
+        self.session.request.return_value = get_response(429, {"Retry-After": "0"})
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.sessions.get("https://example.com/")
+        self.assertEqual(services.Config.HTTP_RETRIES + 1, self.session.request.call_count)
+
+    def test_long_pause_fails_fast(self):
+        self.session.request.return_value = get_response(429, {"Retry-After": "3600"})
+        with self.assertRaises(services.Throttled):
+            self.sessions.get("https://example.com/")
+        with self.assertRaises(services.Throttled):
+            self.sessions.get("https://example.com/other")
+        self.assertEqual(1, self.session.request.call_count)
+        # Other hosts aren't affected
+        self.session.request.return_value = get_response(200)
+        self.assertEqual(200, self.sessions.get("https://example.org/").status_code)
+
+
+class ThrottlingHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.hits += 1
+        self.send_response(self.server.status)
+        self.send_header("Retry-After", self.server.retry_after)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ThrottlingServerTest(unittest.TestCase):
+    """Real sessions against a local server, so the retries of urllib3 are part of the test."""
+
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), ThrottlingHandler)
+        self.server.hits = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = "http://%s:%d/" % self.server.server_address
+        self.sessions = services.Sessions()
+
+    def tearDown(self):
+        self.sessions.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def get(self, status: int, retry_after: str):
+        self.server.status = status
+        self.server.retry_after = retry_after
+        start = time.monotonic()
+        with mock.patch.object(services.Config, "HTTP_MAX_WAIT", 1):
+            with self.assertRaises(requests.exceptions.RequestException) as context:
+                self.sessions.get(self.url)
+        return context.exception, time.monotonic() - start
+
+    def test_long_retry_after_fails_fast(self):
+        for status in (429, 503):
+            with self.subTest(status=status):
+                self.server.hits = 0
+                self.sessions.close()
+                error, elapsed = self.get(status, "3")
+                self.assertIsInstance(error, services.Throttled)
+                self.assertEqual(1, self.server.hits)
+                self.assertLess(elapsed, 1)
+
+    def test_short_retry_after_retried_by_sessions(self):
+        error, elapsed = self.get(429, "0")
+        self.assertIsInstance(error, requests.exceptions.HTTPError)
+        self.assertEqual(services.Config.HTTP_RETRIES + 1, self.server.hits)
+        self.assertLess(elapsed, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
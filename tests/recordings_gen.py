@@ -0,0 +1,130 @@
+"""
+Writes synthetic recordings of all lyrics services to res/recordings, so services_test.py and the
+benchmarks run without network access. The pages only contain what the services read from them.
+Run it again after a service changes its requests, benchmark.py --record replaces them with the real sites.
+"""
+import os
+from unittest import mock
+
+import requests
+
+import backend
+import replay
+import services
+
+# Album and first lines of the songs, as their pages show them
+SONGS = {
+    ("Queen", "We Will Rock You"): ("News of the World", [
+        "Buddy, you're a boy, make a big noise",
+        "Playing in the street, gonna be a big man someday",
+    ]),
+    ("Michael Jackson", "Thriller"): ("Thriller", [
+        "It's close to midnight",
+        "Something evil's lurking in the dark",
+    ]),
+}
+
+
+def get_pages(song: backend.Song, album: str, lines: list) -> dict:
+    """The pages of every service for the song as (method, part of the URL, content), the first match answers."""
+    title = "%s - %s" % (song.artist, song.name)
+    slug = title.lower().replace(" - ", "-").replace(" ", "-")
+    artist_slug = song.artist.lower().replace(" ", "")
+    name_slug = song.name.lower().replace(" ", "")
+    lrc = "\n".join("[00:%02d.00]%s" % (i * 4, line) for i, line in enumerate(lines))
+    text = "\n".join(lines)
+    script = '<script>var __mxmProps = %s;</script>'
+    return {
+        "_rentanadviser": [
+            ("GET", "subtitles4songs.aspx?", '<div id="tablecontainer"><a href="subtitles4songs.aspx">Songs</a>'
+                                             '<a href="getsubtitle.aspx?song=%s">%s</a></div>' % (slug, title)),
+            ("GET", "getsubtitle.aspx", '<form><input id="__EVENTVALIDATION" value="validation"/>'
+                                        '<input id="__VIEWSTATE" value="state"/></form>'),
+            ("POST", "getsubtitle.aspx", lrc),
+        ],
+        "_megalobiz": [
+            ("GET", "/search/all?", '<div id="list_entity_container"><a class="entity_name" href="/lrc/maker/%s">'
+                                    '%s</a></div>' % (slug, title)),
+            ("GET", "/lrc/maker/", '<div class="lyrics_details"><span>%s</span></div>' % lrc),
+        ],
+        "_lyricsify": [
+            ("GET", "/search?", '<div class="sub"><div class="li"><a href="/lyrics/%s">%s</a></div></div>'
+                                % (slug, title)),
+            ("GET", "?download", '<iframe id="iframe_download" src="https://www.lyricsify.com/lrc/%s.lrc"></iframe>'
+                                 % slug),
+            ("GET", ".lrc", lrc),
+        ],
+        "_rclyricsband": [
+            ("GET", "/?s=", '<main id="main"><article><h3 class="elementor-post__title">'
+                            '<a href="https://rclyricsband.com/%s/">%s</a></h3></article></main>' % (slug, title)),
+            ("GET", "/lrc/", lrc),
+            ("GET", "rclyricsband.com/%s/" % slug, '<a href="https://rclyricsband.com/lrc/%s.lrc">LRC Download</a>'
+                                                    % slug),
+        ],
+        "_musixmatch": [
+            ("GET", "/search/", script % '{"track_share_url":"https://www.musixmatch.com/lyrics/%s"}' % slug),
+            ("GET", "/lyrics/", script % '{"lyrics":{"body":"%s","language":"en"}}' % "\\n".join(lines)
+             + '<div class="mxm-track-footer__album"><h2 class="mui-cell__title">%s</h2></div>' % album),
+        ],
+        "_songmeanings": [
+            ("GET", "/m/query/", '<ul><li><a href="/m/songs/view/%s/">%s</a></li></ul>' % (slug, title)),
+            ("GET", "/m/songs/view/", '<ul data-inset="true"><li>%s</li></ul><ul data-inset="true"><li>%s</li>'
+                                      '<li>%s</li></ul>' % (title, song.name, text)),
+        ],
+        "_songlyrics": [
+            ("GET", "www.songlyrics.com/", '<div class="pagetitle"><p>Album: <a href="/album">%s</a></p></div>'
+                                           '<p id="songLyricsDiv">%s</p>' % (album, text)),
+        ],
+        "_genius": [
+            ("GET", "genius.com/", '<html><head><title>%s Lyrics | Genius Lyrics</title></head>'
+                                   '<body><div class="lyrics">%s</div></body></html>' % (title, text)),
+        ],
+        "_versuri": [
+            ("GET", "/q/", '<a href="/versuri/%s/">%s</a>' % (slug, title)),
+            ("GET", "/versuri/", '<div id="pagecontent"><script></script><br/>%s<br/><br/><center></center></div>'
+                                 % "<br/>\n".join(lines)),
+        ],
+        "_azapi": [
+            ("GET", "duckduckgo.com/", '<a href="https://www.azlyrics.com/%s/%s.html">%s</a>'
+                                       % (artist_slug[0], artist_slug, song.artist)),
+            ("GET", "azlyrics.com/%s/" % artist_slug[0], '<div id="listAlbum"><div class="album">album: "%s" (1977)'
+                                                         '</div><a href="/lyrics/%s/%s.html">%s</a></div>'
+                                                         % (album, artist_slug, name_slug, song.name)),
+            ("GET", "azlyrics.com/lyrics/", '<b>"%s Lyrics"</b><b>"%s"</b><div>%s</div>'
+                                            % (song.artist, song.name, text)),
+        ],
+    }
+
+
+def answer(pages: list, method: str, url: str, **kwargs) -> requests.Response:
+    url = replay.get_request_url(method, url, kwargs.get("params"))
+    response = requests.Response()
+    response.status_code = 404
+    response._content = b""
+    response.url = url
+    for page_method, part, content in pages:
+        if page_method == method.upper() and part in url:
+            response.status_code = 200
+            response.headers["Content-Type"] = "text/html; charset=utf-8"
+            response._content = content.encode("utf-8")
+            break
+    response.encoding = "utf-8"
+    return response
+
+
+def record(directory: str = replay.RECORDINGS_DIR):
+    for (artist, name), (album, lines) in SONGS.items():
+        for service_name, pages in get_pages(backend.Song(artist, name), album, lines).items():
+            song = backend.Song(artist, name)
+            service = getattr(services, service_name)
+            path = replay.get_recording_path(service, song, directory)
+            with mock.patch.object(services.SESSIONS, "request", lambda *args, **kwargs: answer(pages, *args,
+                                                                                                **kwargs)), \
+                    replay.record(path) as recording:
+                result = service(song)
+            print("%s: %d responses for %s - %s, %s" % (os.path.basename(path), len(recording.exchanges), artist,
+                                                        name, "found" if result else "NOT FOUND"))
+
+
+if __name__ == "__main__":
+    record()
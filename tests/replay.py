@@ -0,0 +1,201 @@
+"""
+Records the HTTP requests which the lyrics services make through services.SESSIONS and plays
+them back, so the services can be tested and measured without network access.
+
+Recordings are stored in res/recordings, one file per service and song. They are played back
+either directly in place of the session or by a stand-in HTTP server on localhost, which also
+exercises the sessions and can delay its responses to simulate a slow network.
+"""
+import contextlib
+import http.server
+import os
+import pickle
+import threading
+import time
+from urllib import parse
+from unittest import mock
+
+import requests
+
+import services
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "res", "recordings")
+
+# Headers which don't apply anymore, because requests already decoded the content
+SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+def get_recording_path(service, song, directory: str = RECORDINGS_DIR) -> str:
+    return os.path.join(directory, "%s - %s - %s.pickle" % (service.__name__.strip("_"), song.artist.lower(),
+                                                           song.name.lower()))
+
+
+def get_request_url(method: str, url: str, params=None) -> str:
+    return requests.Request(method, url, params=params).prepare().url
+
+
+class Recording:
+    """
+    The responses of a run of a service. The responses to the same request are played back in
+    the recorded order, the last one is repeated if the request is made more often.
+    """
+
+    def __init__(self, exchanges: list = None):
+        self.exchanges = exchanges or []
+        self.positions = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, *paths):
+        exchanges = []
+        for path in paths:
+            with open(path, "rb") as recording_file:
+                exchanges.extend(pickle.load(recording_file))
+        return cls(exchanges)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as recording_file:
+            pickle.dump(self.exchanges, recording_file)
+
+    def add(self, method: str, url: str, response: requests.Response):
+        headers = {key: value for key, value in response.headers.items() if key.lower() not in SKIPPED_HEADERS}
+        with self.lock:
+            self.exchanges.append({"method": method.upper(), "url": url, "status": response.status_code,
+                                   "headers": headers, "content": response.content, "final_url": response.url})
+
+    def find(self, method: str, url: str):
+        with self.lock:
+            matches = [exchange for exchange in self.exchanges
+                       if exchange["method"] == method.upper() and exchange["url"] == url]
+            if not matches:
+                return None
+            position = self.positions.get((method.upper(), url), 0)
+            self.positions[(method.upper(), url)] = position + 1
+            return matches[min(position, len(matches) - 1)]
+
+    def rewind(self):
+        with self.lock:
+            self.positions = {}
+
+
+def to_response(exchange: dict) -> requests.Response:
+    response = requests.Response()
+    response.status_code = exchange["status"]
+    response.headers.update(exchange["headers"])
+    response._content = exchange["content"]
+    response.url = exchange["final_url"]
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers) or "utf-8"
+    return response
+
+
+@contextlib.contextmanager
+def record(path: str):
+    """Passes the requests through to the network and saves the responses at the end."""
+    recording = Recording()
+    request = services.SESSIONS.request
+
+    def recording_request(method, url, **kwargs):
+        response = request(method, url, **kwargs)
+        recording.add(method, get_request_url(method, url, kwargs.get("params")), response)
+        return response
+
+    with mock.patch.object(services.SESSIONS, "request", recording_request):
+        yield recording
+    recording.save(path)
+
+
+@contextlib.contextmanager
+def replay(recording: Recording, latency: float = 0.0):
+    """Answers the requests from the recording without a network, unknown requests fail like offline."""
+
+    def replaying_request(method, url, **kwargs):
+        request_url = get_request_url(method, url, kwargs.get("params"))
+        exchange = recording.find(method, request_url)
+        if exchange is None:
+            raise requests.exceptions.ConnectionError("Not recorded: %s %s" % (method, request_url))
+        if latency:
+            time.sleep(latency)
+        return to_response(exchange)
+
+    with mock.patch.object(services.SESSIONS, "request", replaying_request):
+        yield recording
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    def answer(self):
+        stand_in = self.server.stand_in
+        url = parse.parse_qs(parse.urlsplit(self.path).query).get("url", [""])[0]
+        length = int(self.headers.get("Content-Length", 0))
+        if length:
+            self.rfile.read(length)
+        exchange = stand_in.recording.find(self.command, url) if stand_in.recording else None
+        if stand_in.latency:
+            time.sleep(stand_in.latency)
+
+        if exchange is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.send_header("X-Recorded-Url", url)
+            self.end_headers()
+            return
+        self.send_response(exchange["status"])
+        for key, value in exchange["headers"].items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(exchange["content"])))
+        self.send_header("X-Recorded-Url", exchange["final_url"])
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(exchange["content"])
+
+    do_GET = do_POST = do_HEAD = answer
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer:
+    """
+    Serves a recording on localhost with the given latency per response. While redirecting,
+    every request of services.SESSIONS goes to it, through the real sessions and connection pools.
+    """
+
+    def __init__(self, recording: Recording = None, latency: float = 0.0):
+        self.recording = recording
+        self.latency = latency
+        self.server = None
+
+    @property
+    def url(self) -> str:
+        return "http://%s:%d/" % self.server.server_address
+
+    def start(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        self.server.daemon_threads = True
+        self.server.stand_in = self
+        threading.Thread(target=self.server.serve_forever, name="stand-in", daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @contextlib.contextmanager
+    def redirect(self):
+        request = services.SESSIONS.request
+
+        def redirected_request(method, url, **kwargs):
+            request_url = get_request_url(method, url, kwargs.pop("params", None))
+            kwargs["proxies"] = {"http": None, "https": None}
+            response = request(method, self.url + "?" + parse.urlencode({"url": request_url}), **kwargs)
+            response.url = response.headers.get("X-Recorded-Url", request_url)
+            return response
+
+        with mock.patch.object(services.SESSIONS, "request", redirected_request):
+            yield self
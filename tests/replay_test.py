@@ -0,0 +1,77 @@
+import time
+import unittest
+
+import requests
+
+import backend
+import helpers
+import replay
+import services
+
+PAGE = b"""<html><body><div class="pagetitle"><p>Album: <a href="/news">News of the World</a></p></div>
+<div id="songLyricsDiv">Buddy, you're a boy, make a big noise</div></body></html>"""
+URL = "https://www.songlyrics.com/Queen/We-Will-Rock-You-lyrics"
+
+
+def get_recording():
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = "text/html; charset=utf-8"
+    response._content = PAGE
+    response.url = URL
+    recording = replay.Recording()
+    recording.add("GET", URL, response)
+    return recording
+
+
+class ReplayTest(unittest.TestCase):
+    def setUp(self):
+        helpers.use_temp_stats(self)
+
+    def test_replay(self):
+        song = backend.Song("Queen", "We Will Rock You")
+        with replay.replay(get_recording()):
+            lyrics, url, service_name = services._songlyrics(song)
+
+        self.assertEqual("Buddy, you're a boy, make a big noise", lyrics)
+        self.assertEqual(URL, url)
+        self.assertEqual("News of the World", song.album)
+
+    def test_not_recorded(self):
+        with replay.replay(get_recording()):
+            self.assertRaises(requests.exceptions.ConnectionError, services.SESSIONS.get, "https://genius.com/")
+            self.assertIsNone(services._genius(backend.Song("Queen", "We Will Rock You")))
+
+    def test_order(self):
+        recording = get_recording()
+        response = requests.Response()
+        response.status_code = 404
+        response._content = b""
+        response.url = URL
+        recording.add("GET", URL, response)
+
+        self.assertEqual(200, recording.find("GET", URL)["status"])
+        self.assertEqual(404, recording.find("GET", URL)["status"])
+        self.assertEqual(404, recording.find("GET", URL)["status"])
+        recording.rewind()
+        self.assertEqual(200, recording.find("GET", URL)["status"])
+
+
+class StandInServerTest(unittest.TestCase):
+    def setUp(self):
+        helpers.use_temp_stats(self)
+
+    def test_latency(self):
+        song = backend.Song("Queen", "We Will Rock You")
+        with replay.StandInServer(get_recording(), latency=0.2) as server, server.redirect():
+            start = time.time()
+            lyrics, url, service_name = services._songlyrics(song)
+
+            self.assertGreaterEqual(time.time() - start, 0.2)
+            self.assertEqual("Buddy, you're a boy, make a big noise", lyrics)
+            self.assertEqual(URL, url)
+            self.assertEqual(404, services.SESSIONS.get("https://genius.com/").status_code)
+
+
+if __name__ == '__main__':
+    unittest.main()
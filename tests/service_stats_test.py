@@ -0,0 +1,161 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+
+import helpers
+import services
+
+
+class ServiceStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.stats = services.ServiceStats(os.path.join(self.directory.name, "service_stats.json"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_record(self):
+        self.stats.record("_fast", services.HIT, 0.2)
+        self.stats.record("_fast", services.MISS, 0.3)
+        self.stats.record("_fast", services.ERROR, 5)
+
+        self.assertEqual(3, self.stats.get_count("_fast"))
+        self.assertAlmostEqual(0.4, self.stats.get_hit_rate("_fast"))
+        self.assertAlmostEqual(5.5 / 3, self.stats.get_mean_latency("_fast"))
+        self.assertEqual(0.5, self.stats.get_percentile("_fast", 0.5))
+        self.assertEqual(8, self.stats.get_percentile("_fast", 0.95))
+
+    def test_unknown_service(self):
+        self.assertEqual(0.5, self.stats.get_hit_rate("_new"))
+        self.assertEqual(services.ServiceStats.DEFAULT_LATENCY, self.stats.get_mean_latency("_new"))
+
+    def test_persisted(self):
+        self.stats.record("_fast", services.HIT, 0.2)
+        self.stats.save()
+
+        stats = services.ServiceStats(self.stats.stats_file)
+        self.assertEqual(1, stats.get_count("_fast"))
+
+    def test_order_services(self):
+        old_services = services.SERVICES_LIST1[:], services.SERVICES_LIST2[:], services.STATS
+
+        @services.lyrics_service
+        def _slow(song):
+            return None
+
+        @services.lyrics_service
+        def _fast(song):
+            return None
+
+        try:
+            services.STATS = self.stats
+            services.SERVICES_LIST2[:] = [_slow, services._local, _fast]
+            for _ in range(5):
+                self.stats.record("_slow", services.HIT, 10)
+                self.stats.record("_fast", services.HIT, 0.2)
+
+            services.order_services()
+            self.assertEqual([services._local, _fast, _slow], services.SERVICES_LIST2)
+        finally:
+            services.SERVICES_LIST1[:], services.SERVICES_LIST2[:], services.STATS = old_services
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_open_after_failures(self):
+        breaker = services.CircuitBreaker()
+        for _ in range(services.Config.BREAKER_THRESHOLD - 1):
+            breaker.record(services.ERROR)
+        self.assertTrue(breaker.allow())
+
+        breaker.record(services.ERROR)
+        self.assertEqual(services.CircuitBreaker.OPEN, breaker.state)
+        self.assertFalse(breaker.allow())
+
+    def test_half_open(self):
+        breaker = services.CircuitBreaker()
+        breaker.open(60)
+        breaker.opened -= 60
+
+        self.assertTrue(breaker.allow())
+        self.assertEqual(services.CircuitBreaker.HALF_OPEN, breaker.state)
+        self.assertFalse(breaker.allow())
+
+        breaker.record(services.ERROR)
+        self.assertEqual(services.CircuitBreaker.OPEN, breaker.state)
+        self.assertEqual(120, breaker.cool_down)
+
+        breaker.opened -= 120
+        self.assertTrue(breaker.allow())
+        breaker.record(services.MISS)
+        self.assertEqual(services.CircuitBreaker.CLOSED, breaker.state)
+        self.assertTrue(breaker.allow())
+
+    def test_skipped_service(self):
+        old_stats = services.STATS
+        calls = []
+
+        @services.lyrics_service
+        def _broken(song):
+            calls.append(song)
+            raise requests.exceptions.ConnectionError("Connection refused")
+
+        with tempfile.TemporaryDirectory() as directory:
+            try:
+                services.STATS = services.ServiceStats(os.path.join(directory, "service_stats.json"))
+                results = [_broken.lookup("song") for _ in range(services.Config.BREAKER_THRESHOLD + 2)]
+                self.assertEqual(services.Config.BREAKER_THRESHOLD, len(calls))
+                self.assertEqual((services.SKIPPED, None), results[-1])
+
+                services.STATS.save()
+                stats = services.ServiceStats(services.STATS.stats_file)
+                self.assertFalse(stats.allow("_broken"))
+                self.assertIn("open", stats.format_status())
+            finally:
+                services.STATS = old_stats
+
+
+class LookupStatusTest(unittest.TestCase):
+    def setUp(self):
+        helpers.use_temp_stats(self)
+        self.session = mock.Mock()
+        patcher = mock.patch.object(services.SESSIONS, "get_session", lambda url: self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        @services.lyrics_service
+        def _search(song):
+            page = services.SESSIONS.get("https://example.com/search")
+            # Raises on a page without results, like the providers do
+            return page.json()["results"][0]
+
+        self.service = _search
+
+    def get_response(self, status: int, content: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response._content = content
+        return response
+
+    def test_page_without_results_is_miss(self):
+        for content in (b'{"results": []}', b"<html>No results</html>"):
+            self.session.request.return_value = self.get_response(200, content)
+            with mock.patch.object(services, "capture_exception"):
+                for _ in range(services.Config.BREAKER_THRESHOLD + 1):
+                    self.assertEqual((services.MISS, None), self.service.lookup("song"))
+        self.assertTrue(services.STATS.allow("_search"))
+
+    def test_error_page_is_error(self):
+        self.session.request.return_value = self.get_response(502, b"<html>Bad Gateway</html>")
+        with mock.patch.object(services, "capture_exception"):
+            self.assertEqual((services.ERROR, None), self.service.lookup("song"))
+
+    def test_network_error_is_error(self):
+        self.session.request.side_effect = requests.exceptions.ConnectionError("Connection refused")
+        self.assertEqual((services.ERROR, None), self.service.lookup("song"))
+
+
+if __name__ == '__main__':
+    unittest.main()
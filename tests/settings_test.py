@@ -0,0 +1,69 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import backend
+import services
+
+
+class SettingsStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings_file = os.path.join(self.directory.name, "settings", "settings.ini")
+        self.store = backend.SettingsStore(self.settings_file)
+
+    def tearDown(self):
+        self.store.flush()
+        self.directory.cleanup()
+
+    def test_debounced(self):
+        with mock.patch.object(services.Config, "SETTINGS_SAVE_DELAY", 0.2):
+            for x in range(50):
+                self.store.set({"X": x, "Y": 10})
+            self.assertFalse(os.path.exists(self.settings_file))
+            time.sleep(0.4)
+        self.assertTrue(os.path.exists(self.settings_file))
+
+        config = backend.SettingsStore(self.settings_file).load()
+        self.assertEqual(49, config.getint("settings", "x"))
+        self.assertEqual(["settings.ini"], os.listdir(os.path.dirname(self.settings_file)))
+
+    def test_one_thread(self):
+        threads = threading.active_count()
+        for x in range(50):
+            self.store.set({"X": x})
+        self.assertLessEqual(threading.active_count(), threads + 1)
+
+    def test_flush(self):
+        self.store.set({"DarkTheme": True})
+        self.store.flush()
+        self.assertTrue(backend.SettingsStore(self.settings_file).load().getboolean("settings", "darktheme"))
+
+        mtime = os.stat(self.settings_file).st_mtime_ns
+        self.store.set({"DarkTheme": True})
+        self.assertFalse(self.store.dirty)
+        self.store.flush()
+        self.assertEqual(mtime, os.stat(self.settings_file).st_mtime_ns)
+
+    def test_failed_write_keeps_file(self):
+        self.store.set({"FontSize": 10})
+        self.store.flush()
+        self.store.set({"FontSize": 12})
+        with mock.patch.object(self.store.config, "write", side_effect=OSError("Disk full")):
+            self.store.flush()
+        self.assertEqual(10, backend.SettingsStore(self.settings_file).load().getint("settings", "fontsize"))
+        self.assertEqual(["settings.ini"], os.listdir(os.path.dirname(self.settings_file)))
+
+    def test_broken_file(self):
+        os.makedirs(os.path.dirname(self.settings_file))
+        with open(self.settings_file, "w") as settings_file:
+            settings_file.write("no section header")
+        config = self.store.load()
+        self.assertFalse(config.getboolean("settings", "info", fallback=False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from collections import OrderedDict
+from unittest import mock
+
+import backend
+import services
+
+
+def get_key(artist, name):
+    return backend.get_song_key(backend.Song(artist, name))
+
+
+class SongKeyTest(unittest.TestCase):
+    def test_variants_share_key(self):
+        titles = ["We Will Rock You", "We Will Rock You - 2011 Remaster", "WE WILL ROCK YOU (Live)",
+                  "We Will Rock You – Radio Edit", "We Will Rock You feat. Someone", "We Will Rock You [Explicit]"]
+        self.assertEqual({"queen-we will rock you"}, {get_key("Queen", title) for title in titles})
+        self.assertEqual("beyonce-deja vu", get_key("Beyoncé", "Déjà Vu ft. Jay-Z"))
+
+    def test_other_songs_keep_their_key(self):
+        self.assertEqual("queen-we will rock you remix", get_key("Queen", "We Will Rock You - Remix"))
+        self.assertEqual("queen-we are the champions", get_key("Queen", "We Are the Champions"))
+        # Nothing left after the rules
+        self.assertEqual("tool-intro", get_key("Tool", "(Intro)"))
+
+    def test_feat_in_name(self):
+        self.assertEqual("little feat-dixie chicken", get_key("Little Feat", "Dixie Chicken"))
+        self.assertEqual("little feat-dixie chicken", get_key("Little Feat featuring Bonnie Raitt", "Dixie Chicken"))
+        self.assertNotEqual(get_key("Little", "Dixie Chicken"), get_key("Little Feat", "Dixie Chicken"))
+
+    def test_aliases(self):
+        with mock.patch.object(backend, "song_key_aliases", OrderedDict()), \
+                mock.patch.object(services.Config, "SONG_KEY_ALIASES", 2):
+            get_key("Queen", "We Will Rock You - 2011 Remaster")
+            get_key("Queen", "We Are the Champions")
+            with mock.patch.object(backend, "canonicalize") as canonicalize:
+                self.assertEqual("queen-we will rock you", get_key("Queen", "We Will Rock You - 2011 Remaster"))
+            canonicalize.assert_not_called()
+
+            get_key("Queen", "Bohemian Rhapsody")
+            self.assertEqual(["Queen-We Will Rock You - 2011 Remaster", "Queen-Bohemian Rhapsody"],
+                             list(backend.song_key_aliases))
+
+    def test_get_from_string(self):
+        song = backend.Song.get_from_string("Queen — We Will Rock You (Remastered) [2011]")
+        self.assertEqual("Queen", song.artist)
+        self.assertEqual("We Will Rock You", song.name)
+
+    def test_variants_hit_cache(self):
+        lyrics_metadata = backend.LyricsMetadata("Buddy, you're a boy", "https://example.com", "Example", False)
+        with mock.patch.object(backend, "cache") as cache:
+            cache.get.side_effect = {"queen-we will rock you": lyrics_metadata}.get
+            self.assertTrue(backend.is_cached(backend.Song("Queen", "We Will Rock You - 2011 Remaster")))
+            self.assertFalse(backend.is_cached(backend.Song("Queen", "We Are the Champions")))
+
+
+if __name__ == '__main__':
+    unittest.main()
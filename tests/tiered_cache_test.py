@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+import zlib
+from unittest import mock
+
+from diskcache import Cache, Timeout
+
+import backend
+import helpers
+import services
+
+
+class TieredCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = helpers.create_temp_cache(self, max_items=2, max_size=1024)
+
+    def test_write_through(self):
+        self.cache.set("a", "lyrics")
+
+        self.assertEqual("lyrics", self.cache.disk.get("a"))
+        self.assertEqual("lyrics", self.cache.get("a"))
+        self.assertEqual({"hits": 1, "misses": 0}, self.cache.stats["memory"])
+
+    def test_promotion(self):
+        self.cache.disk.set("a", "lyrics")
+
+        self.assertEqual("lyrics", self.cache.get("a"))
+        self.assertEqual("lyrics", self.cache.get("a"))
+        self.assertEqual({"hits": 1, "misses": 1}, self.cache.stats["memory"])
+        self.assertEqual({"hits": 1, "misses": 0}, self.cache.stats["disk"])
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual({"hits": 0, "misses": 1}, self.cache.stats["disk"])
+
+    def test_eviction(self):
+        self.cache.set("a", "1")
+        self.cache.set("b", "2")
+        self.cache.get("a")
+        self.cache.set("c", "3")
+
+        self.assertEqual(["a", "c"], list(self.cache.memory))
+        self.cache.set("d", "x" * 2048)
+        self.assertNotIn("d", self.cache.memory)
+        self.assertEqual("x" * 2048, self.cache.get("d"))
+
+    def test_expire(self):
+        self.cache.set("a", "lyrics", expire=-1)
+
+        self.assertIsNone(self.cache.get("a"))
+
+
+class CompressedCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.directory.name, "cache")
+        self.cache = backend.TieredCache(self.cache_dir, max_items=2, max_size=1024)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_compressed(self):
+        lyrics_metadata = backend.LyricsMetadata("la la la\n" * 500, "https://example.com", "Example", False)
+        self.cache.set("a", lyrics_metadata)
+        self.cache.clear_memory()
+
+        self.assertEqual(lyrics_metadata, self.cache.get("a"))
+        with sqlite3.connect(os.path.join(self.cache_dir, "cache.db")) as database:
+            (stored_size,), = database.execute("SELECT length(value) FROM Cache").fetchall()
+        self.assertLess(stored_size, len(lyrics_metadata.lyrics) / 10)
+        self.assertEqual(services.Config.DISK_CACHE_SIZE, self.cache.disk.size_limit)
+        self.assertEqual(services.Config.DISK_CACHE_EVICTION, self.cache.disk.eviction_policy)
+
+    def test_uncompressed_entries_are_read(self):
+        Cache(self.cache_dir).set("a", ("lyrics", 1))
+
+        self.assertEqual(("lyrics", 1), self.cache.get("a"))
+
+    def test_corrupt_entry_dropped(self):
+        self.cache.set("a", "lyrics")
+        with Cache(self.cache_dir) as plain:
+            plain.set("b", b"not compressed")
+        self.cache.clear_memory()
+
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(1, self.cache.dropped)
+        self.assertNotIn("b", self.cache.disk)
+        self.assertEqual("lyrics", self.cache.get("a"))
+
+    def test_unreadable_entry_kept(self):
+        # A pickle of a class which doesn't exist, like one which was moved
+        with Cache(self.cache_dir) as plain:
+            plain.set("b", zlib.compress(b"cbuiltins\nno_such_class\n."))
+
+        with self.assertRaises(AttributeError):
+            self.cache.get("b")
+        self.assertEqual(0, self.cache.repair())
+        self.assertIn("b", self.cache.disk)
+
+    def test_repair(self):
+        self.cache.set("a", "lyrics")
+        self.cache.disk.set("b", "lyrics")
+        with Cache(self.cache_dir) as plain:
+            plain.set("c", b"not compressed")
+
+        self.assertEqual(1, self.cache.repair())
+        self.assertEqual(["a", "b"], sorted(self.cache.disk.iterkeys()))
+        self.assertEqual({}, dict(self.cache.memory))
+
+    def test_broken_database_recreated(self):
+        self.cache.set("a", "lyrics")
+        self.cache.close()
+        with open(os.path.join(self.cache_dir, "cache.db"), "wb") as database:
+            database.write(b"not a database" * 1000)
+
+        self.cache.disk = None
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.set("a", "lyrics")
+        self.cache.clear_memory()
+        self.assertEqual("lyrics", self.cache.get("a"))
+
+    def test_busy_disk(self):
+        self.cache.set("a", "lyrics")
+        self.cache.clear_memory()
+        with mock.patch.object(self.cache.disk, "get", side_effect=Timeout), \
+                mock.patch.object(self.cache.disk, "set", side_effect=Timeout):
+            self.assertIsNone(self.cache.get("a"))
+            self.cache.set("b", "lyrics")
+        self.assertEqual(0, self.cache.dropped)
+        self.assertEqual("lyrics", self.cache.get("a"))
+        self.assertEqual("lyrics", self.cache.get("b"))
+
+
+if __name__ == '__main__':
+    unittest.main()